@@ -4,6 +4,8 @@ import numpy as np
 import os
 import csv
 from datetime import datetime
+from core.gaps import break_flags, duplicate_rows, max_gap_for
+from core.intervals import sample_mask
 
 try:
     from sklearn.neighbors import KNeighborsClassifier
@@ -20,9 +22,12 @@ class CerveauIA:
         # --- PARAMETRE EXPERT PAC ---
         # On ne garde que ce qui dure plus de 15 minutes (900s)
         self.duree_min_emergence = 900 
+        # Écart de résiduel (dB) au-delà duquel le suivi temps réel rescanne les émergences
+        self.tolerance_suivi = 0.1
         
         self.residuel_jour = None
         self.residuel_nuit = None
+        self.detail_residuels = None
         
         self.memory_file = "ai_brain/ia_knowledge.csv"
         self.model = None
@@ -82,8 +87,8 @@ class CerveauIA:
     def _somme_energetique(self, valeurs_db):
         if not valeurs_db: return 0
         try:
-            puissances = [10**(v/10) for v in valeurs_db]
-            return 10 * math.log10(sum(puissances)) if sum(puissances) > 0 else 0
+            total = float(np.sum(10.0 ** (np.asarray(valeurs_db, dtype=float) / 10.0)))
+            return 10 * math.log10(total) if total > 0 else 0
         except: return 0
 
     def analyser_spectre(self, spectre_dict):
@@ -106,68 +111,193 @@ class CerveauIA:
         return f"{val:.1f} dB"
 
     # --- NOUVEAU CALCUL RESIDUEL V7.5 (Split Jour/Nuit) ---
-    def calculer_residuels_jour_nuit(self, timestamps, valeurs):
-        vals_jour = []
-        vals_nuit = []
-        
-        for ts, val in zip(timestamps, valeurs):
-            if math.isnan(val): continue
-            h = datetime.fromtimestamp(ts).hour
-            if 7 <= h < 22:
-                vals_jour.append(val)
-            else:
-                vals_nuit.append(val)
-        
-        # Calcul L90 Jour
-        res_j = np.percentile(vals_jour, 10) if vals_jour else 0
-        # Calcul L90 Nuit
-        res_n = np.percentile(vals_nuit, 10) if vals_nuit else 0
-        
+    def _masque_jour(self, timestamps):
+        """Jour (7h-22h, heure locale) pour chaque ts. L'heure est résolue une fois par quart d'heure."""
+        ts = np.asarray(timestamps, dtype=float)
+        jour = np.zeros(len(ts), dtype=bool)
+        ok = ~np.isnan(ts)
+        if not ok.any(): return jour
+        quarts, inv = np.unique(np.floor(ts[ok] / 900.0), return_inverse=True)
+        heures = np.array([datetime.fromtimestamp(q * 900.0).hour for q in quarts])
+        jour[ok] = ((heures >= 7) & (heures < 22))[inv]
+        return jour
+
+    def calculer_residuels_jour_nuit(self, timestamps, valeurs, inclure=None, exclure=None, zones_residuel=None):
+        """
+        L90 jour / nuit. inclure / exclure (IntervalSet, optionnels) : plages prises en compte / écartées (zones Autre).
+        zones_residuel (IntervalSet des zones Résiduel de l'expert) : dans chaque période couverte par ces zones,
+        le résiduel est calculé sur leurs seules mesures ; sinon il reste le L90 de toute la période.
+        Détail par période (Leq énergétique, L90, nombre de mesures, source) dans self.detail_residuels.
+        """
+        ts = np.asarray(timestamps, dtype=float)
+        vals = np.asarray(valeurs, dtype=float)
+        # ts dupliqués (redémarrage du logger) comptés une seule fois
+        ok = ~np.isnan(vals) & ~np.isnan(ts) & ~duplicate_rows(ts) & sample_mask(ts, inclure, exclure)
+        jour = self._masque_jour(ts)
+        dans_zones = zones_residuel.mask(ts) if zones_residuel is not None and len(zones_residuel) else None
+
+        detail = {}
+        for periode, masque in (("jour", ok & jour), ("nuit", ok & ~jour)):
+            source = "global"
+            if dans_zones is not None and (masque & dans_zones).any():
+                masque = masque & dans_zones
+                source = "zones"
+            v = vals[masque]
+            # L90 (niveau dépassé 90% du temps) et Leq énergétique de la période
+            detail[periode] = {
+                "l90": np.percentile(v, 10) if len(v) else 0,
+                "leq": 10 * np.log10(np.mean(10 ** (v / 10.0))) if len(v) else 0,
+                "n": len(v),
+                "source": source,
+            }
+        res_j = detail["jour"]["l90"]
+        res_n = detail["nuit"]["l90"]
+
         self.residuel_jour = res_j
         self.residuel_nuit = res_n
-        
+        self.detail_residuels = detail
+
         return res_j, res_n
 
-    def scanner_emergences(self, timestamps, valeurs):
-        # 1. Calcul des 2 résiduels
-        res_j, res_n = self.calculer_residuels_jour_nuit(timestamps, valeurs)
+    def _valider_bloc(self, bloc, evenements):
+        # FILTRE PAC : > 15 minutes (900s)
+        if bloc and (bloc[-1][0] - bloc[0][0]) >= self.duree_min_emergence:
+            evenements.extend(bloc)
+
+    def _parcourir(self, timestamps, valeurs, res_j, res_n, bloc, evenements, ecart_max=np.inf):
+        """
+        Découpe les points en blocs au-dessus du seuil (jour : résiduel + 5, nuit : + 3).
+        Un bloc ne traverse jamais un trou de plus de `ecart_max` secondes ni un ts dupliqué.
+        `bloc` est le bloc encore ouvert avant ces points ; retourne celui resté ouvert après.
+        """
+        ts = np.asarray(timestamps, dtype=float)
+        vals = np.asarray(valeurs, dtype=float)
+        ok = ~np.isnan(vals) & ~np.isnan(ts)
+        ts, vals = ts[ok], vals[ok]
+        n = len(vals)
+        if n == 0: return bloc
+
+        seuils = np.where(self._masque_jour(ts), res_j + 5, res_n + 3)
+        dessus = vals > seuils
+        # Coupures : avant le point i (trou ou discontinuité depuis le point précédent)
+        coupure = np.r_[True, break_flags(ts, ecart_max)]
+        suite = np.r_[coupure[1:], True]
+        debuts = np.flatnonzero(dessus & (np.r_[True, ~dessus[:-1]] | coupure))
+        fins = np.flatnonzero(dessus & (np.r_[~dessus[1:], True] | suite)) + 1
+
+        if bloc:
+            # Le bloc ouvert n'est prolongé que par un premier point contigu et au-dessus du seuil
+            contigu = not break_flags([bloc[-1][0], ts[0]], ecart_max)[0]
+            if not (len(debuts) and debuts[0] == 0 and contigu):
+                self._valider_bloc(bloc, evenements)
+                bloc = []
+        for d, f in zip(debuts, fins):
+            run = list(zip(ts[d:f].tolist(), vals[d:f].tolist(), seuils[d:f].tolist()))
+            if d == 0 and bloc: run = bloc + run
+            if f == n: return run
+            self._valider_bloc(run, evenements)
+        return []
+
+    def scanner_emergences(self, timestamps, valeurs, inclure=None, exclure=None, zones_residuel=None):
+        # 1. Calcul des 2 résiduels (sur les plages retenues, zones Résiduel de l'expert en priorité)
+        res_j, res_n = self.calculer_residuels_jour_nuit(timestamps, valeurs, inclure, exclure, zones_residuel)
         
+        # 2. Blocs au-dessus du seuil jour/nuit, coupés aux trous, filtrés par durée
+        ts = np.asarray(timestamps, dtype=float)
+        vals = np.where(duplicate_rows(ts), np.nan, np.asarray(valeurs, dtype=float))
         evenements_valides = []
-        bloc_courant = [] 
-        
-        for ts, val in zip(timestamps, valeurs):
-            if math.isnan(val): continue
-            
-            # 2. Choix du bon seuil
-            dt = datetime.fromtimestamp(ts)
-            is_jour = (7 <= dt.hour < 22)
-            
-            if is_jour:
-                seuil = res_j + 5
-            else:
-                seuil = res_n + 3
-            
-            if val > seuil:
-                bloc_courant.append((ts, val, seuil))
-            else:
-                if bloc_courant:
-                    debut = bloc_courant[0][0]
-                    fin = bloc_courant[-1][0]
-                    duree = fin - debut
-                    
-                    # 3. FILTRE PAC : > 15 minutes (900s)
-                    if duree >= self.duree_min_emergence:
-                        evenements_valides.extend(bloc_courant)
-                    
-                    bloc_courant = []
+        bloc_courant = self._parcourir(ts, vals, res_j, res_n, [], evenements_valides, max_gap_for(ts))
         
         # Check fin de fichier
-        if bloc_courant:
-            if (bloc_courant[-1][0] - bloc_courant[0][0]) >= self.duree_min_emergence:
-                evenements_valides.extend(bloc_courant)
+        self._valider_bloc(bloc_courant, evenements_valides)
 
         return (res_j, res_n), evenements_valides
 
+    # --- SUIVI TEMPS RÉEL (fichier en cours d'écriture) ---
+    def demarrer_suivi(self, timestamps, valeurs, inclure=None, exclure=None, zones_residuel=None):
+        """Initialise l'état incrémental sur les données déjà chargées (mêmes plages que le scan)."""
+        self._plages_suivi = (inclure, exclure)
+        # Périodes dont le résiduel vient des zones Résiduel : seules les mesures de ces zones alimentent l'histogramme
+        self.calculer_residuels_jour_nuit(timestamps, valeurs, inclure, exclure, zones_residuel)
+        self._zones_suivi = tuple(zones_residuel if self.detail_residuels[p]["source"] == "zones" else None
+                                  for p in ("jour", "nuit"))
+        self._hist_jour = HistogrammeNiveaux()
+        self._hist_nuit = HistogrammeNiveaux()
+        self._seuils_suivi = None
+        self._bloc_suivi = []
+        self._evenements_suivi = []
+        self._ecart_max_suivi = max_gap_for(np.asarray(timestamps, dtype=float))
+        return self.suivre(timestamps, valeurs, 0)
+
+    def suivre(self, timestamps, valeurs, debut):
+        """
+        Intègre les points [debut:] ajoutés depuis le dernier appel.
+        Les résiduels sont mis à jour par histogramme (sans retrier l'historique) ; les émergences
+        ne sont rescannées entièrement que si un résiduel a bougé de plus de `tolerance_suivi` dB,
+        sinon seuls les nouveaux points prolongent le bloc en cours.
+        """
+        ts = np.asarray(timestamps[debut:], dtype=float)
+        vals = np.asarray(valeurs[debut:], dtype=float)
+        dup = duplicate_rows(np.asarray(timestamps[max(0, debut - 1):], dtype=float))
+        if debut > 0: dup = dup[1:]
+        vals = np.where(dup, np.nan, vals)
+        ok = ~np.isnan(vals) & ~np.isnan(ts) & sample_mask(ts, *self._plages_suivi)
+        jour = self._masque_jour(ts)
+        ok_jour, ok_nuit = ok & jour, ok & ~jour
+        zones_j, zones_n = self._zones_suivi
+        if zones_j is not None: ok_jour &= zones_j.mask(ts)
+        if zones_n is not None: ok_nuit &= zones_n.mask(ts)
+        self._hist_jour.ajouter(vals[ok_jour])
+        self._hist_nuit.ajouter(vals[ok_nuit])
+
+        res_j = self._hist_jour.percentile(10)
+        res_n = self._hist_nuit.percentile(10)
+        self.residuel_jour = res_j
+        self.residuel_nuit = res_n
+
+        if self._seuils_suivi is None or max(abs(res_j - self._seuils_suivi[0]), abs(res_n - self._seuils_suivi[1])) > self.tolerance_suivi:
+            # Résiduel déplacé : les seuils changent, on rescanne tout l'historique
+            self._seuils_suivi = (res_j, res_n)
+            self._evenements_suivi = []
+            tous_ts = np.asarray(timestamps, dtype=float)
+            tous_vals = np.where(duplicate_rows(tous_ts), np.nan, np.asarray(valeurs, dtype=float))
+            self._bloc_suivi = self._parcourir(tous_ts, tous_vals, res_j, res_n, [], self._evenements_suivi, self._ecart_max_suivi)
+        else:
+            s_j, s_n = self._seuils_suivi
+            self._bloc_suivi = self._parcourir(ts, vals, s_j, s_n, self._bloc_suivi, self._evenements_suivi, self._ecart_max_suivi)
+
+        points = list(self._evenements_suivi)
+        self._valider_bloc(self._bloc_suivi, points)
+        return (res_j, res_n), points
+
+
+class HistogrammeNiveaux:
+    """
+    Histogramme des niveaux au pas de 0.01 dB (résolution des niveaux PRISM) : le percentile
+    obtenu est celui de np.percentile (interpolation linéaire), mis à jour en O(nouveaux points).
+    """
+    PAS = 0.01
+    DECALAGE = 32768
+
+    def __init__(self):
+        self.compte = np.zeros(2 * self.DECALAGE, dtype=np.int64)
+        self.total = 0
+
+    def ajouter(self, valeurs):
+        if not len(valeurs): return
+        codes = np.clip(np.round(np.asarray(valeurs, dtype=float) / self.PAS), -self.DECALAGE, self.DECALAGE - 1)
+        self.compte += np.bincount((codes + self.DECALAGE).astype(np.int64), minlength=len(self.compte))
+        self.total += len(valeurs)
+
+    def percentile(self, q):
+        if self.total == 0: return 0
+        cumul = np.cumsum(self.compte)
+        rang = q / 100.0 * (self.total - 1)
+        bas, frac = int(np.floor(rang)), rang - np.floor(rang)
+        v_bas = (np.searchsorted(cumul, bas, side='right') - self.DECALAGE) * self.PAS
+        v_haut = (np.searchsorted(cumul, min(bas + 1, self.total - 1), side='right') - self.DECALAGE) * self.PAS
+        return v_bas + (v_haut - v_bas) * frac
+
 if __name__ == "__main__":
     ia = CerveauIA()
     print(ia.demarrer())
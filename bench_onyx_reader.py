@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from core.onyx_reader import read_onyx_csv
+
+BANDS = ["20Hz", "25Hz", "31.5Hz", "40Hz", "50Hz", "63Hz", "80Hz", "100Hz", "125Hz", "160Hz", "200Hz", "250Hz", "315Hz", "400Hz"]
+
+
+def write_fake_onyx(path, n_rows):
+    """Génère un export ONYX synthétique (métadonnées '#', sep ';', décimale ',')."""
+    rng = np.random.default_rng(0)
+    ts = 1766178000.0 + np.arange(n_rows, dtype=float)
+    levels = rng.normal(40, 5, size=(n_rows, len(BANDS) + 2)).round(1)
+    df = pd.DataFrame(levels, columns=["dBA", "dBC"] + BANDS)
+    df.insert(0, "h", "22:00:00")
+    df.insert(0, "ts", [f"{t:.3f}" for t in ts])
+    df["note"] = ""
+    df["Audio_Ref"] = [f"2025-12-19_{i // 3600:02d}h00_Audio.flac" for i in range(n_rows)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# ONYX export synthétique\n")
+        df.to_csv(f, sep=';', decimal=',', index=False)
+
+
+def legacy_read(path):
+    """Ancien chemin du Dashboard (moteur python)."""
+    df = pd.read_csv(path, sep=';', decimal=',', header=1, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def run_bench(n_rows=200000):
+    print(f"--- BENCHMARK LECTEUR ONYX ({n_rows} lignes) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_PRISM.csv")
+        write_fake_onyx(path, n_rows)
+        size_mb = os.path.getsize(path) / 1e6
+
+        t0 = time.perf_counter()
+        legacy_read(path)
+        t_legacy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        table = read_onyx_csv(path)
+        t_new = time.perf_counter() - t0
+
+    print(f"Fichier : {size_mb:.1f} Mo")
+    print(f"Ancien (moteur python) : {t_legacy:.2f}s  ({n_rows / t_legacy:,.0f} lignes/s)")
+    print(f"Lecteur ONYX (moteur C) : {t_new:.2f}s  ({n_rows / t_new:,.0f} lignes/s)")
+    print(f"Gain : x{t_legacy / t_new:.1f}  | ts typé : {table.frame['ts'].dtype}")
+
+
+if __name__ == "__main__":
+    run_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
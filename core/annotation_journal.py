@@ -0,0 +1,99 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path_for(prism_path):
+    return prism_path + JOURNAL_SUFFIX
+
+
+class AnnotationJournal:
+    """
+    Journal append-only des éditions de zones d'un segment (une ligne JSON par opération).
+    Les éditions s'accumulent d'abord en mémoire (buffer) ; le thread de sauvegarde les écrit
+    par lots (write). Le journal est rejoué au chargement puis vidé au compactage du CSV _PRISM.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.buffer = []
+        # Éditions du dernier rejeu dont l'échantillon (ts) est introuvable dans le segment
+        self.unmatched = []
+
+    def __len__(self):
+        return len(self.entries())
+
+    @property
+    def pending(self):
+        if self.buffer: return True
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def append(self, ts, note, row=None):
+        """Ajoute une note (None ou NaN = suppression) pour l'échantillon ts. Aucun accès disque."""
+        if note is None or (isinstance(note, float) and np.isnan(note)):
+            entry = {"op": "del", "ts": float(ts)}
+        else:
+            entry = {"op": "set", "ts": float(ts), "note": str(note)}
+        if row is not None: entry["row"] = int(row)
+        self.buffer.append(entry)
+
+    def write(self, entries):
+        """Écrit un lot d'éditions à la fin du fichier et force leur passage sur disque."""
+        if not entries: return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def entries(self):
+        """Éditions du fichier suivies de celles encore en mémoire."""
+        out = []
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        out.append(json.loads(line))
+                    except ValueError:
+                        # Dernière ligne tronquée par un arrêt brutal : ignorée
+                        continue
+        return out + list(self.buffer)
+
+    def replay(self, table):
+        """
+        Applique le journal au DataFrame du segment. Retourne le nombre d'opérations rejouées ;
+        celles dont l'échantillon n'existe plus sont gardées dans `self.unmatched`.
+        """
+        self.unmatched = []
+        entries = self.entries()
+        if not entries or not table.ts_col: return 0
+        df = table.frame
+        note_col = table.note_col or 'note'
+        if note_col not in df.columns:
+            df[note_col] = pd.Series(np.nan, index=df.index, dtype=object)
+        elif df[note_col].dtype != object:
+            df[note_col] = df[note_col].astype(object)
+        ts = pd.to_numeric(df[table.ts_col], errors='coerce').to_numpy()
+        col = df.columns.get_loc(note_col)
+
+        applied = 0
+        for e in entries:
+            row = e.get("row")
+            if row is None or not (0 <= row < len(ts)) or ts[row] != e["ts"]:
+                # Ligne déplacée (fichier réécrit) : on retrouve l'échantillon par son ts exact,
+                # sans supposer les ts triés (doublons, horloge du logger qui recule)
+                hits = np.flatnonzero(ts == e["ts"])
+                if not len(hits):
+                    self.unmatched.append(e)
+                    continue
+                row = int(hits[np.argmin(np.abs(hits - (row or 0)))])
+            df.iat[row, col] = e["note"] if e["op"] == "set" else np.nan
+            applied += 1
+        return applied
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import getpass
+import hashlib
+from contextlib import closing, contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+
+from core.onyx_reader import read_onyx_csv, sniff_layout
+from core.zones import parse_zone_note, zone_class
+
+# Base partagée entre tous les projets (comme la mémoire de l'IA)
+DEFAULT_DB_PATH = "ai_brain/prism_annotations.db"
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS zones (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    ts REAL NOT NULL,
+    t_start REAL NOT NULL,
+    t_end REAL NOT NULL,
+    label TEXT NOT NULL,
+    class TEXT NOT NULL,
+    author TEXT,
+    created REAL,
+    updated REAL,
+    UNIQUE (project, ts)
+);
+CREATE INDEX IF NOT EXISTS idx_zones_time ON zones (t_start, t_end);
+CREATE INDEX IF NOT EXISTS idx_zones_class ON zones (class, t_start);
+"""
+
+
+def project_name(folder):
+    """
+    Identifiant d'un projet : nom du dossier de campagne suivi d'une empreinte courte de son
+    chemin absolu (deux sites aux dossiers homonymes, ex: siteA/2025-01 et siteB/2025-01,
+    ne partagent pas leurs zones).
+    """
+    path = os.path.realpath(os.path.abspath(folder))
+    digest = hashlib.sha1(os.path.normcase(path).encode("utf-8")).hexdigest()[:8]
+    return f"{os.path.basename(path)}#{digest}"
+
+
+def _current_user():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return None
+
+
+class AnnotationStore:
+    """
+    Base SQLite des zones de tous les projets (projet, début, fin, classe, auteur, dates),
+    indexée sur le temps et la classe : les requêtes inter-projets ne chargent aucune mesure.
+    Alimentée par les éditions du Dashboard (thread de sauvegarde) et par import des _PRISM.csv.
+    Une connexion est ouverte par opération : utilisable depuis n'importe quel thread.
+    """
+    def __init__(self, path=DEFAULT_DB_PATH, author=None):
+        self.path = path
+        self.author = author or _current_user()
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(SCHEMA)
+
+    @staticmethod
+    def open_default():
+        """Base partagée, ou None si SQLite est indisponible (la base reste optionnelle)."""
+        if not SQLITE_AVAILABLE: return None
+        try:
+            return AnnotationStore()
+        except Exception:
+            return None
+
+    @contextmanager
+    def _connect(self):
+        """Connexion d'une opération : transaction validée (ou annulée), puis connexion fermée."""
+        with closing(sqlite3.connect(self.path, timeout=10)) as con:
+            con.row_factory = sqlite3.Row
+            with con:
+                yield con
+
+    def _rows(self, project, ts, notes, now):
+        for t, note in zip(ts, notes):
+            label, duration = parse_zone_note(note)
+            half = duration / 2.0
+            yield (project, float(t), float(t) - half, float(t) + half, label, zone_class(label),
+                   self.author, now, now)
+
+    def _upsert(self, con, rows):
+        con.executemany("""
+            INSERT INTO zones (project, ts, t_start, t_end, label, class, author, created, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (project, ts) DO UPDATE SET
+                t_start = excluded.t_start, t_end = excluded.t_end, label = excluded.label,
+                class = excluded.class, author = excluded.author, updated = excluded.updated
+            WHERE zones.label != excluded.label OR zones.t_start != excluded.t_start
+                OR zones.t_end != excluded.t_end
+        """, rows)
+
+    # --- ALIMENTATION ---
+    def apply(self, project, entries):
+        """Applique des éditions au format du journal ({"op": "set"|"del", "ts", "note"})."""
+        if not entries: return 0
+        now = time.time()
+        with self._connect() as con:
+            for e in entries:
+                if e["op"] == "set":
+                    self._upsert(con, self._rows(project, [e["ts"]], [e["note"]], now))
+                else:
+                    con.execute("DELETE FROM zones WHERE project = ? AND ts = ?", (project, float(e["ts"])))
+        return len(entries)
+
+    def sync_notes(self, project, ts, notes):
+        """
+        Remplace les zones du projet sur la plage [min(ts), max(ts)] par celles de la colonne note
+        (la table est la référence : les zones absentes sont supprimées).
+        """
+        ts = np.asarray(ts, dtype=float)
+        ok = ~np.isnan(ts)
+        if not ok.any(): return 0
+        notes = pd.Series(notes).to_numpy()
+        keep = ok & pd.notna(notes)
+        keep &= np.array([str(n).strip() != "" for n in notes], dtype=bool)
+        now = time.time()
+        with self._connect() as con:
+            known = con.execute("SELECT ts FROM zones WHERE project = ? AND ts BETWEEN ? AND ?",
+                                (project, float(ts[ok].min()), float(ts[ok].max()))).fetchall()
+            gone = set(r[0] for r in known) - set(ts[keep].tolist())
+            con.executemany("DELETE FROM zones WHERE project = ? AND ts = ?", [(project, t) for t in gone])
+            # Zones inchangées : auteur et dates conservés
+            self._upsert(con, self._rows(project, ts[keep], notes[keep], now))
+        return int(keep.sum())
+
+    def sync_table(self, project, table):
+        if not table.ts_col or not table.note_col: return 0
+        df = table.frame
+        return self.sync_notes(project, pd.to_numeric(df[table.ts_col], errors='coerce'), df[table.note_col])
+
+    def import_prism_csv(self, csv_path, project=None):
+        """Importe les zones d'un _PRISM.csv existant (seules les colonnes ts et note sont lues)."""
+        project = project or project_name(os.path.dirname(os.path.abspath(csv_path)))
+        cols = [c for c in sniff_layout(csv_path)["columns"] if c.lower() in ("ts", "note")]
+        table = read_onyx_csv(csv_path, usecols=cols)
+        return self.sync_table(project, table)
+
+    def import_folder(self, folder):
+        """Importe tous les _PRISM.csv d'un dossier de campagne. Retourne le nombre de zones."""
+        total = 0
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith("_prism.csv"):
+                total += self.import_prism_csv(os.path.join(folder, name), project_name(folder))
+        return total
+
+    # --- REQUÊTES ---
+    def query(self, cls=None, t0=None, t1=None, project=None, label=None):
+        """Zones (DataFrame) filtrées par classe, chevauchement de [t0, t1], projet, libellé."""
+        where, args = [], []
+        if cls is not None:
+            where.append("class = ?"); args.append(cls)
+        if t0 is not None:
+            where.append("t_end >= ?"); args.append(float(t0))
+        if t1 is not None:
+            where.append("t_start <= ?"); args.append(float(t1))
+        if project is not None:
+            where.append("project = ?"); args.append(project)
+        if label is not None:
+            where.append("label LIKE ?"); args.append(f"%{label}%")
+        sql = "SELECT project, ts, t_start, t_end, label, class, author, created, updated FROM zones"
+        if where: sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY t_start"
+        with self._connect() as con:
+            return pd.read_sql_query(sql, con, params=args)
+
+    def summary(self):
+        """Nombre de zones et durée cumulée par projet et par classe."""
+        with self._connect() as con:
+            return pd.read_sql_query("""
+                SELECT project, class, COUNT(*) AS n, SUM(t_end - t_start) AS duration
+                FROM zones GROUP BY project, class ORDER BY project, class
+            """, con)
+
+    def projects(self):
+        with self._connect() as con:
+            return [r[0] for r in con.execute("SELECT DISTINCT project FROM zones ORDER BY project")]
+
+
+if __name__ == "__main__":
+    # Import en lot : python -m core.annotation_store <dossier> [<dossier> ...]
+    store = AnnotationStore()
+    for folder in sys.argv[1:]:
+        print(f"{project_name(folder)} : {store.import_folder(folder)} zones importées")
+    print(store.summary().to_string(index=False))
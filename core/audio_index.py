@@ -0,0 +1,122 @@
+import os
+import bisect
+import numpy as np
+import pandas as pd
+
+try:
+    import soundfile as sf
+    SF_AVAILABLE = True
+except ImportError:
+    SF_AVAILABLE = False
+
+
+class AudioSegment:
+    """Un fichier audio de la campagne et la plage temporelle qu'il couvre."""
+    def __init__(self, name, path, t_start, t_end, exists, samplerate=None, duration=None):
+        self.name = name
+        self.path = path
+        self.t_start = t_start
+        self.t_end = t_end
+        self.exists = exists
+        self.samplerate = samplerate
+        self.duration = duration
+
+    @property
+    def t_stop(self):
+        # Fin réelle : durée du fichier si connue, sinon dernier échantillon CSV
+        if self.duration is not None:
+            return max(self.t_end, self.t_start + self.duration)
+        return self.t_end
+
+
+def _probe_audio(path):
+    """(samplerate, durée en s) lus dans l'entête du fichier, ou (None, None)."""
+    if not SF_AVAILABLE: return None, None
+    try:
+        info = sf.info(path)
+        return int(info.samplerate), float(info.frames) / info.samplerate
+    except Exception:
+        return None, None
+
+
+class AudioIndex:
+    """
+    Table des fichiers audio (un enregistrement par fichier : début, fin, samplerate,
+    durée, chemin résolu, existence), construite une fois au chargement.
+    Un clic se résout en (fichier, offset) par recherche binaire sur les débuts.
+    """
+    def __init__(self, segments):
+        self.segments = sorted(segments, key=lambda s: s.t_start)
+        self._starts = [s.t_start for s in self.segments]
+        self._by_name = {s.name: s for s in self.segments}
+
+    def __len__(self):
+        return len(self.segments)
+
+    @staticmethod
+    def from_session(session, folder, probe=True):
+        n_files = len(session.audio_files)
+        ends = np.full(n_files, -np.inf)
+        ok = (session.audio_codes >= 0) & ~np.isnan(session.ts)
+        np.maximum.at(ends, session.audio_codes[ok], session.ts[ok])
+
+        segments = []
+        for code, name in enumerate(session.audio_files):
+            t_start = float(session.audio_start[code])
+            if not np.isfinite(t_start): continue
+            path = os.path.join(folder, name) if folder else name
+            exists = os.path.exists(path)
+            samplerate, duration = _probe_audio(path) if (probe and exists) else (None, None)
+            segments.append(AudioSegment(name, path, t_start, float(ends[code]), exists, samplerate, duration))
+        return AudioIndex(segments)
+
+    def segment_for_file(self, name):
+        return self._by_name.get(name)
+
+    def locate(self, ts):
+        """
+        (segment, offset en s) pour le temps ts. Entre deux fichiers, le plus proche est
+        retenu (comme l'échantillon le plus proche). (None, None) si l'index est vide.
+        """
+        if not self.segments: return None, None
+        i = bisect.bisect_right(self._starts, ts) - 1
+        if i < 0:
+            return self.segments[0], 0.0
+        seg = self.segments[i]
+        if ts > seg.t_stop and i + 1 < len(self.segments):
+            nxt = self.segments[i + 1]
+            if nxt.t_start - ts < ts - seg.t_stop:
+                return nxt, 0.0
+        offset = min(ts - seg.t_start, seg.t_stop - seg.t_start)
+        return seg, max(0.0, offset)
+
+    def update(self, session, rows, folder, probe=True):
+        """Mode suivi : étend la table avec les lignes `rows` ajoutées à la session."""
+        codes, ts = session.audio_codes[rows], session.ts[rows]
+        added = False
+        for code in np.unique(codes[codes >= 0]):
+            name = session.audio_files[code]
+            sel = ts[(codes == code) & ~np.isnan(ts)]
+            if not len(sel): continue
+            seg = self._by_name.get(name)
+            if seg is None:
+                path = os.path.join(folder, name) if folder else name
+                seg = AudioSegment(name, path, float(session.audio_start[code]), float(sel.max()), False)
+                self.segments.append(seg)
+                self._by_name[name] = seg
+                added = True
+            seg.t_end = max(seg.t_end, float(sel.max()))
+            # Fichier audio potentiellement encore en cours d'écriture : entête relu
+            seg.exists = os.path.exists(seg.path)
+            if probe and seg.exists:
+                seg.samplerate, seg.duration = _probe_audio(seg.path)
+        if added:
+            self.segments.sort(key=lambda s: s.t_start)
+            self._starts = [s.t_start for s in self.segments]
+
+    def to_frame(self):
+        """Table des segments audio pour les outils batch."""
+        return pd.DataFrame([{
+            "name": s.name, "path": s.path, "t_start": s.t_start, "t_end": s.t_end,
+            "samplerate": s.samplerate, "duration": s.duration, "exists": s.exists,
+        } for s in self.segments])
@@ -0,0 +1,341 @@
+import os
+import pandas as pd
+from core.onyx_reader import OnyxTable, parse_ts_token, read_onyx_csv, sniff_layout, write_onyx_csv
+from core.project_cache import store_frame_cache
+from core.level_store import LevelStore, save_level_store
+from core.lod import LodPyramid
+from core.annotation_journal import AnnotationJournal, journal_path_for
+
+# Budget mémoire par défaut pour les segments résidents (Mo)
+DEFAULT_RAM_BUDGET_MB = 1500
+
+
+def _probe_time_range(csv_path):
+    """
+    Lit uniquement la première et la dernière ligne de données pour connaître
+    la plage temporelle d'un fichier, sans le parser entièrement.
+    """
+    layout = sniff_layout(csv_path)
+    cols = [c.lower() for c in layout["columns"]]
+    if 'ts' not in cols: return None
+    ts_idx, sep = cols.index('ts'), layout["sep"]
+
+    with open(csv_path, 'rb') as f:
+        lines = f.read(64 * 1024).splitlines()
+        first = None
+        for raw in lines[layout["header_row"] + 1:]:
+            tokens = raw.decode(layout["encoding"], errors='ignore').split(sep)
+            if len(tokens) > ts_idx:
+                first = parse_ts_token(tokens[ts_idx])
+                if first is not None: break
+
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 64 * 1024))
+        last = None
+        for raw in reversed(f.read().splitlines()):
+            tokens = raw.decode(layout["encoding"], errors='ignore').split(sep)
+            if len(tokens) > ts_idx:
+                last = parse_ts_token(tokens[ts_idx])
+                if last is not None: break
+
+    if first is None or last is None: return None
+    return min(first, last), max(first, last)
+
+
+class CampaignSegment:
+    """Un fichier CSV de la campagne (un jour / un redémarrage du logger)."""
+    def __init__(self, base_name, original_path, prism_path, t_start, t_end):
+        self.base_name = base_name
+        self.original_path = original_path
+        self.prism_path = prism_path
+        self.t_start = t_start
+        self.t_end = t_end
+        self.table = None
+        # Éditions de zones en attente dans le journal (non encore compactées dans le CSV)
+        self.journal = AnnotationJournal(journal_path_for(prism_path))
+        self.dirty = self.journal.pending
+        # Table en retard sur la table combinée (lignes du mode suivi, notes de la session)
+        self.stale = False
+        # Incrémenté à chaque modification : une sauvegarde basée sur une révision plus ancienne
+        # ne remplace pas la table du segment
+        self.revision = 0
+
+    @property
+    def path(self):
+        # Copie de travail _PRISM si elle existe, sinon l'original (jamais modifié)
+        if os.path.exists(self.prism_path) or not self.original_path:
+            return self.prism_path
+        return self.original_path
+
+    @property
+    def is_resident(self):
+        return self.table is not None
+
+    @property
+    def nbytes(self):
+        if self.table is not None:
+            levels = self.table.levels.nbytes if self.table.levels is not None else 0
+            return int(self.table.frame.memory_usage(index=True, deep=False).sum()) + levels
+        # Estimation avant chargement : taille du fichier sur disque
+        return os.path.getsize(self.path)
+
+    def intersects(self, t0, t1):
+        return self.t_end >= t0 and self.t_start <= t1
+
+    def distance_to(self, t):
+        if self.t_start <= t <= self.t_end: return 0.0
+        return min(abs(self.t_start - t), abs(self.t_end - t))
+
+
+def index_campaign_folder(folder_path):
+    """Indexe tous les CSV du dossier par plage temporelle (un segment par fichier source)."""
+    all_csvs = [f for f in os.listdir(folder_path) if f.lower().endswith('.csv')]
+    data_csvs = [f for f in all_csvs if "knowledge" not in f.lower()]
+
+    groups = {}
+    for name in data_csvs:
+        base = name.replace("_PRISM", "")
+        entry = groups.setdefault(base, {"original": None, "prism": None})
+        entry["prism" if "_PRISM" in name else "original"] = name
+
+    segments = []
+    for base, entry in groups.items():
+        original = os.path.join(folder_path, entry["original"]) if entry["original"] else None
+        prism_name = entry["prism"] or base[:-4] + "_PRISM.csv"
+        prism = os.path.join(folder_path, prism_name)
+        probe_path = prism if entry["prism"] else original
+        try:
+            rng = _probe_time_range(probe_path)
+        except OSError:
+            rng = None
+        if rng is None: continue
+        segments.append(CampaignSegment(base, original, prism, rng[0], rng[1]))
+
+    segments.sort(key=lambda s: s.t_start)
+    return segments
+
+
+class Campaign:
+    """
+    Dossier ONYX vu comme une campagne : tous les CSV sont indexés à l'ouverture,
+    seuls les segments couvrant la vue courante sont chargés, dans un budget RAM fixe.
+    """
+    def __init__(self, folder_path, ram_budget_mb=DEFAULT_RAM_BUDGET_MB):
+        self.folder = folder_path
+        self.segments = index_campaign_folder(folder_path)
+        self.ram_budget = ram_budget_mb * 1024 * 1024
+        self.slices = []
+        self.generation = 0
+
+    def __len__(self):
+        return len(self.segments)
+
+    @property
+    def t_start(self):
+        return self.segments[0].t_start if self.segments else None
+
+    @property
+    def t_end(self):
+        return max(s.t_end for s in self.segments) if self.segments else None
+
+    @property
+    def resident_bytes(self):
+        return sum(s.nbytes for s in self.segments if s.is_resident)
+
+    def resident_segments(self):
+        return [s for s in self.segments if s.is_resident]
+
+    def wanted_segments(self, t0, t1):
+        """Segments à garder en mémoire pour la vue [t0, t1], les plus proches du centre d'abord."""
+        centre = (t0 + t1) / 2.0
+        candidates = sorted((s for s in self.segments if s.intersects(t0, t1)), key=lambda s: s.distance_to(centre))
+        wanted, budget = [], 0
+        for seg in candidates:
+            budget += seg.nbytes
+            if wanted and budget > self.ram_budget: break
+            wanted.append(seg)
+        return wanted
+
+    def missing_segments(self, t0, t1):
+        return [s for s in self.wanted_segments(t0, t1) if not s.is_resident]
+
+    def attach(self, segment, table):
+        segment.table = table
+
+    def evict_for_view(self, t0, t1, incoming=()):
+        """
+        Libère les segments les plus éloignés de la vue tant que le budget est dépassé,
+        en tenant compte des segments sur le point d'être chargés.
+        """
+        wanted = set(id(s) for s in self.wanted_segments(t0, t1))
+        incoming_bytes = sum(s.nbytes for s in incoming)
+        centre = (t0 + t1) / 2.0
+        evicted = []
+        for seg in sorted(self.resident_segments(), key=lambda s: -s.distance_to(centre)):
+            if self.resident_bytes + incoming_bytes <= self.ram_budget: break
+            # Un segment modifié peut être libéré : son journal sera rejoué au rechargement
+            if id(seg) in wanted or seg.stale: continue
+            seg.table = None
+            evicted.append(seg)
+        return evicted
+
+    # --- VUE COMBINÉE (DataFrame unique utilisé par le Dashboard) ---
+    def combine(self, tables):
+        """
+        Concatène les tables résidentes dans l'ordre temporel.
+        Retourne (OnyxTable combinée, slices [(segment, début, fin)]).
+        """
+        parts, slices, row = [], [], 0
+        for seg, table in sorted(tables, key=lambda p: p[0].t_start):
+            n = len(table.frame)
+            parts.append(table.frame)
+            slices.append((seg, row, row + n))
+            row += n
+        if not parts: return None, []
+        frame = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+        ordered = sorted(tables, key=lambda p: p[0].t_start)
+        levels = LevelStore.concat([t.levels for _, t in ordered])
+        combined = OnyxTable(frame, ordered[0][1].layout, levels)
+        # Pyramides des segments mises bout à bout (reconstruites si le segment a grandi en mode suivi)
+        combined.lod = LodPyramid.concat([t.lod if t.lod is not None and t.lod.covers(t) else LodPyramid.from_table(t)
+                                          for _, t in ordered])
+        return combined, slices
+
+    def set_slices(self, slices):
+        self.slices = slices
+
+    def segment_for_row(self, idx):
+        for seg, start, stop in self.slices:
+            if start <= idx < stop: return seg
+        return None
+
+    def extend_segment(self, segment, n_rows, t_end):
+        """
+        Mode suivi : n_rows lignes ont été ajoutées en fin de table combinée pour ce segment
+        (forcément la dernière tranche). Un chargement en cours devient obsolète.
+        """
+        seg, start, stop = self.slices[-1]
+        if seg is not segment: return False
+        self.slices[-1] = (seg, start, stop + n_rows)
+        if t_end is not None: seg.t_end = max(seg.t_end, t_end)
+        seg.stale = True
+        seg.revision += 1
+        self.generation += 1
+        return True
+
+    def refresh_tables(self, table):
+        """Recopie depuis la table combinée les segments étendus en mode suivi."""
+        for seg, start, stop in self.slices:
+            if not seg.stale: continue
+            levels = table.levels.slice_rows(start, stop) if table.levels is not None else None
+            layout = seg.table.layout if seg.table is not None else table.layout
+            lod = seg.table.lod if seg.table is not None else None
+            seg.table = OnyxTable(table.frame.iloc[start:stop].reset_index(drop=True), layout, levels)
+            seg.table.lod = lod
+            seg.stale = False
+
+    def record_note(self, idx, ts, note):
+        """Ajoute une édition de zone au journal du segment (en mémoire, écrite par la sauvegarde)."""
+        for seg, start, stop in self.slices:
+            if start <= idx < stop:
+                seg.journal.append(ts, note, idx - start)
+                seg.dirty = True
+                seg.stale = True
+                seg.revision += 1
+                self.generation += 1
+                return seg
+        return None
+
+    # --- SAUVEGARDE (instantané dans le thread graphique, écriture dans n'importe quel thread) ---
+    def snapshot_save(self, table, compact=False):
+        """
+        Prépare une sauvegarde : éditions en attente de chaque journal et, si compact,
+        copies des tranches modifiées de la table combinée (notes déjà reportées dans la table).
+        """
+        job = SaveJob(compact)
+        for seg in self.segments:
+            if seg.journal.buffer:
+                job.journals.append((seg, list(seg.journal.buffer)))
+        if not compact: return job
+        in_view = set(id(seg) for seg, _, _ in self.slices)
+        job.offline = [seg for seg in self.segments if seg.dirty and id(seg) not in in_view]
+        for seg, start, stop in self.slices:
+            if not seg.dirty: continue
+            frame = table.frame.iloc[start:stop].reset_index(drop=True).copy()
+            levels = table.levels.slice_rows(start, stop) if table.levels is not None else None
+            layout = seg.table.layout if seg.table is not None else table.layout
+            sub = OnyxTable(frame, layout, levels)
+            sub.lod = seg.table.lod if seg.table is not None else None
+            job.segments.append((seg, sub, seg.revision))
+        job.created = [seg for seg in job.offline + [s for s, _, _ in job.segments] if not os.path.exists(seg.prism_path)]
+        return job
+
+    def run_save(self, job):
+        """
+        Écritures disque d'une sauvegarde (thread de sauvegarde) : journaux complétés,
+        puis compactage des segments dans leur copie _PRISM (écriture atomique) et journaux vidés.
+        """
+        for seg, entries in job.journals:
+            seg.journal.write(entries)
+        for seg in job.offline:
+            # Segment libéré : relu et rejoué depuis le disque
+            sub = read_onyx_csv(seg.path)
+            seg.journal.replay(sub)
+            job.unmatched += len(seg.journal.unmatched)
+            write_onyx_csv(seg.prism_path, sub.frame, sub.metadata_header)
+            seg.journal.clear()
+        for seg, sub, _ in job.segments:
+            write_onyx_csv(seg.prism_path, sub.materialize(), sub.metadata_header)
+            levels = save_level_store(seg.prism_path, sub.levels) if sub.levels is not None else None
+            store_frame_cache(seg.prism_path, sub.frame, sub.metadata_header, sub.columns)
+            job.tables[id(seg)] = OnyxTable(sub.frame, sub.layout, levels)
+            if sub.lod is not None and sub.lod.covers(sub):
+                sub.lod.save(seg.prism_path)
+                job.tables[id(seg)].lod = sub.lod
+            seg.journal.clear()
+
+    def commit_save(self, job):
+        """Applique le résultat d'une sauvegarde réussie (thread graphique). Retourne les segments compactés."""
+        for seg, entries in job.journals:
+            del seg.journal.buffer[:len(entries)]
+        saved = []
+        for seg in job.offline:
+            seg.dirty = seg.journal.pending
+            saved.append(seg)
+        for seg, _, revision in job.segments:
+            # Éditions arrivées pendant l'écriture : elles restent dans le buffer du journal
+            seg.dirty = seg.journal.pending
+            if seg.revision == revision:
+                seg.table = job.tables[id(seg)]
+                seg.stale = False
+            saved.append(seg)
+        return saved
+
+    def write_back(self, table):
+        """Compactage synchrone (fermeture) : réécrit les segments modifiés et vide leurs journaux."""
+        job = self.snapshot_save(table, compact=True)
+        self.run_save(job)
+        return self.commit_save(job)
+
+
+class SaveJob:
+    """Instantané d'une sauvegarde : ce qui doit être écrit, indépendamment de l'état courant de l'UI."""
+    def __init__(self, compact):
+        self.compact = compact
+        self.journals = []
+        self.offline = []
+        self.segments = []
+        self.tables = {}
+        self.created = []
+        self.unmatched = 0
+        self.elapsed_ms = None
+        self.error = None
+
+    @property
+    def empty(self):
+        return not (self.journals or self.offline or self.segments)
+
+    @property
+    def n_edits(self):
+        return sum(len(entries) for _, entries in self.journals)
@@ -0,0 +1,145 @@
+import numpy as np
+
+# Sommes cumulées ré-ancrées tous les ENERGY_BLOCK échantillons : une fenêtre courte se calcule
+# dans son bloc (petites valeurs, pas de soustraction de deux grands cumuls), ce qui permet de
+# stocker les cumuls locaux en float32
+ENERGY_BLOCK = 1024
+# Construction par tranches de lignes : temporaires float64 bornés quelle que soit la taille
+BUILD_ROWS = 64 * ENERGY_BLOCK
+
+
+def leq_from_energy(energy, count):
+    """Leq (dB) d'une énergie cumulée sur `count` mesures ; NaN si la fenêtre est vide."""
+    energy = np.asarray(energy, dtype=np.float64)
+    count = np.asarray(count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 10.0 * np.log10(energy / count)
+    return np.where(count > 0, out, np.nan)
+
+
+def _reserve(buf, n, extra):
+    """Buffer pouvant contenir n + extra lignes (capacité doublée : ajout en O(1) amorti)."""
+    if len(buf) >= n + extra: return buf
+    new = np.empty((max(2 * (n + extra), 1024),) + buf.shape[1:], dtype=buf.dtype)
+    new[:n] = buf[:n]
+    return new
+
+
+class EnergyPrefix:
+    """
+    Énergie cumulée 10^(L/10) d'une série de niveaux, en blocs ré-ancrés :
+    local[r] = somme du début du bloc de r jusqu'à r inclus (float32), blocks[b] = somme des
+    blocs < b (float64). La somme (et le Leq) de n'importe quelle plage de lignes [i, j) est
+    alors en O(1). Les mesures invalides (NaN, ts dupliqués) ont une énergie nulle et ne sont
+    pas comptées. Une matrice [lignes x bandes] donne un cumul par colonne (spectre d'une
+    fenêtre en une requête) ; le nombre de mesures reste commun à toutes les bandes tant
+    qu'elles sont valides sur les mêmes lignes. Les tableaux sont alloués avec une capacité
+    doublée : le mode suivi n'ajoute que les nouvelles lignes.
+    """
+    def __init__(self, width=None):
+        self.width = width
+        shape = () if width is None else (width,)
+        self._n = 0
+        self._n_blocks = 1
+        self._local = np.zeros((0,) + shape, dtype=np.float32)
+        self._blocks = np.zeros((1,) + shape)
+        self._counts = np.zeros(1, dtype=np.int32)
+
+    @staticmethod
+    def from_levels(levels, valid=None):
+        levels = np.asarray(levels)
+        prefix = EnergyPrefix(levels.shape[1] if levels.ndim == 2 else None)
+        n = len(levels)
+        # Taille exacte : la capacité ne double qu'aux ajouts du mode suivi
+        prefix._local = np.empty((n,) + prefix._local.shape[1:], dtype=np.float32)
+        prefix._counts = np.zeros(n + 1, dtype=np.int32)
+        for s in range(0, n, BUILD_ROWS):
+            prefix.extend(levels[s:s + BUILD_ROWS], None if valid is None else valid[s:s + BUILD_ROWS])
+        return prefix
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def local(self):
+        return self._local[:self._n]
+
+    @property
+    def blocks(self):
+        return self._blocks[:self._n_blocks]
+
+    @property
+    def counts(self):
+        return self._counts[:self._n + 1]
+
+    def _rows(self, mask):
+        """Masque par ligne diffusé sur les colonnes (cumul matriciel)."""
+        return mask[..., None] if self.width is not None else mask
+
+    def extend(self, levels, valid=None):
+        """Ajoute des lignes en fin (mode suivi) : seules les nouvelles lignes sont calculées."""
+        levels = np.asarray(levels, dtype=np.float64)
+        k, n_old = len(levels), self._n
+        if k == 0: return
+        ok = ~np.isnan(levels)
+        if valid is not None: ok &= self._rows(np.asarray(valid, dtype=bool))
+        # 10^(L/10) = exp(L ln10 / 10), sensiblement plus rapide sur de grandes matrices
+        energy = np.exp(np.where(ok, levels, 0.0) * (np.log(10.0) / 10.0))
+        energy[~ok] = 0.0
+
+        # Nombre de mesures : un compteur par ligne tant que les bandes ont la même validité
+        if self.width is not None and self._counts.ndim == 1:
+            if (ok == ok[:, :1]).all():
+                ok = ok[:, 0]
+            else:
+                self._counts = np.repeat(self._counts[:, None], self.width, axis=1)
+        self._counts = _reserve(self._counts, n_old + 1, k)
+        self._counts[n_old + 1:n_old + 1 + k] = self._counts[n_old] + np.cumsum(ok, axis=0, dtype=np.int32)
+
+        # Cumuls locaux : le bloc partiel reprend depuis son dernier cumul
+        offset = n_old % ENERGY_BLOCK
+        n_blocks = -(-(offset + k) // ENERGY_BLOCK)
+        padded = np.zeros((n_blocks * ENERGY_BLOCK,) + energy.shape[1:])
+        padded[offset:offset + k] = energy
+        local = np.cumsum(padded.reshape((n_blocks, ENERGY_BLOCK) + energy.shape[1:]), axis=1)
+        if offset: local[0] += self._local[n_old - 1]
+        self._local = _reserve(self._local, n_old, k)
+        self._local[n_old:n_old + k] = local.reshape((-1,) + energy.shape[1:])[offset:offset + k]
+        self._n = n_old + k
+
+        first_block = n_old // ENERGY_BLOCK
+        self._blocks = _reserve(self._blocks, first_block + 1, n_blocks)
+        self._blocks[first_block + 1:first_block + 1 + n_blocks] = self._blocks[first_block] + np.cumsum(local[:, -1], axis=0)
+        self._n_blocks = first_block + 1 + n_blocks
+
+    def _before(self, r):
+        """Énergie des lignes du bloc de r situées avant r."""
+        r = np.asarray(r, dtype=np.int64)
+        if not self._n: return np.zeros(r.shape + self._local.shape[1:])
+        prev = np.minimum(np.maximum(r - 1, 0), self._n - 1)
+        return np.where(self._rows(r % ENERGY_BLOCK > 0), self._local[prev].astype(np.float64), 0.0)
+
+    def energy(self, i, j):
+        """Énergie totale des lignes [i, j) (scalaires ou tableaux d'indices)."""
+        i = np.clip(np.asarray(i, dtype=np.int64), 0, len(self))
+        j = np.clip(np.asarray(j, dtype=np.int64), i, len(self))
+        bi, bj = i // ENERGY_BLOCK, j // ENERGY_BLOCK
+        inside = self._before(j) - self._before(i)
+        if not self._n: return inside
+        # Fenêtre sur plusieurs blocs : fin du bloc de i + blocs entiers intermédiaires + début du bloc de j
+        last_of_bi = np.minimum((bi + 1) * ENERGY_BLOCK, len(self)) - 1
+        tail_i = self._local[np.maximum(last_of_bi, 0)].astype(np.float64) - self._before(i)
+        full = self.blocks[np.minimum(bj, self._n_blocks - 1)] - self.blocks[np.minimum(bi + 1, self._n_blocks - 1)]
+        return np.where(self._rows(bi == bj), inside, tail_i + np.maximum(full, 0.0) + self._before(j))
+
+    def count(self, i, j):
+        i = np.clip(np.asarray(i, dtype=np.int64), 0, len(self))
+        j = np.clip(np.asarray(j, dtype=np.int64), i, len(self))
+        return self.counts[j] - self.counts[i]
+
+    def leq(self, i, j):
+        """Leq énergétique des lignes [i, j) ; NaN si aucune mesure valide."""
+        count = self.count(i, j)
+        if self.width is not None and self._counts.ndim == 1:
+            count = count[..., None]
+        return leq_from_energy(self.energy(i, j), count)
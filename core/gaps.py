@@ -0,0 +1,84 @@
+import numpy as np
+from core.time_grid import detect_step
+
+# Un écart de plus de GAP_FACTOR pas d'échantillonnage coupe la série (trou, redémarrage)
+GAP_FACTOR = 3.0
+
+
+def max_gap_for(ts, step=None):
+    step = step or detect_step(ts)
+    return GAP_FACTOR * step if step else np.inf
+
+
+def break_flags(ts, max_gap):
+    """
+    breaks[i] = True si les lignes i et i+1 ne sont pas contiguës : trou plus long que max_gap,
+    ts dupliqué ou qui recule (redémarrage du logger), ts manquant.
+    """
+    d = np.diff(np.asarray(ts, dtype=float))
+    return ~((d > 0) & (d <= max_gap))
+
+
+def duplicate_rows(ts):
+    """Lignes dont le ts est identique à celui de la ligne précédente (à exclure des statistiques)."""
+    ts = np.asarray(ts, dtype=float)
+    return np.r_[False, ts[1:] == ts[:-1]]
+
+
+class GapIndex:
+    """
+    Index des séquences contiguës d'une session, calculé une fois au chargement :
+    runs [starts[k], stops[k]) de lignes sans trou ni discontinuité.
+    Sert aux coupures de tracé (connect) et aux statistiques qui ne doivent pas enjamber un trou.
+    """
+    def __init__(self, starts, stops, max_gap):
+        self.starts = starts
+        self.stops = stops
+        self.max_gap = max_gap
+
+    @staticmethod
+    def from_ts(ts, step=None):
+        ts = np.asarray(ts, dtype=float)
+        max_gap = max_gap_for(ts, step)
+        if not len(ts):
+            return GapIndex(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), max_gap)
+        cuts = np.flatnonzero(break_flags(ts, max_gap)) + 1
+        return GapIndex(np.r_[0, cuts], np.r_[cuts, len(ts)], max_gap)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def n_rows(self):
+        return int(self.stops[-1]) if len(self.stops) else 0
+
+    def run_ids(self):
+        """Numéro de séquence de chaque ligne."""
+        return np.repeat(np.arange(len(self.starts)), self.stops - self.starts)
+
+    def connect(self, mask=None):
+        """
+        Tableau 'connect' pour pyqtgraph : True si le point tracé i est relié au suivant.
+        `mask` = lignes effectivement tracées (ex: niveaux valides).
+        """
+        ids = self.run_ids()
+        if mask is not None: ids = ids[mask]
+        if not len(ids): return np.zeros(0, dtype=bool)
+        return np.r_[ids[1:] == ids[:-1], False]
+
+    def gaps(self, ts):
+        """[(fin de séquence, début de la suivante)] en secondes."""
+        return [(float(ts[stop - 1]), float(ts[stop])) for stop in self.stops[:-1]]
+
+    def extend(self, ts):
+        """Mode suivi : ts contient les anciennes lignes suivies des nouvelles."""
+        n_old = self.n_rows
+        if len(ts) <= n_old: return
+        if not n_old:
+            fresh = GapIndex.from_ts(ts)
+            self.starts, self.stops, self.max_gap = fresh.starts, fresh.stops, fresh.max_gap
+            return
+        flags = break_flags(np.asarray(ts[n_old - 1:], dtype=float), self.max_gap)
+        cuts = np.flatnonzero(flags) + n_old
+        self.starts = np.r_[self.starts, cuts]
+        self.stops = np.r_[self.stops[:-1], cuts, len(ts)]
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class IntervalSet:
+    """
+    Ensemble d'intervalles fermés [début, fin] normalisé : débuts triés, intervalles disjoints
+    (les intervalles qui se chevauchent ou se touchent sont fusionnés). Union, intersection et
+    soustraction se font par balayage vectorisé des bornes ; mask() donne en une passe
+    (recherche binaire) les échantillons couverts.
+    """
+    def __init__(self, starts=(), ends=()):
+        starts = np.asarray(starts, dtype=float).ravel()
+        ends = np.asarray(ends, dtype=float).ravel()
+        keep = ~np.isnan(starts) & ~np.isnan(ends) & (ends >= starts)
+        starts, ends = starts[keep], ends[keep]
+        if len(starts) > 1:
+            order = np.argsort(starts, kind='stable')
+            starts, ends = starts[order], ends[order]
+            # Nouveau groupe quand un début dépasse la fin des précédents
+            reach = np.maximum.accumulate(ends)
+            first = np.r_[0, np.flatnonzero(starts[1:] > reach[:-1]) + 1]
+            last = np.r_[first[1:] - 1, len(starts) - 1]
+            starts, ends = starts[first], reach[last]
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self):
+        return len(self.starts)
+
+    def total(self):
+        """Durée totale couverte (s)."""
+        return float(np.sum(self.ends - self.starts))
+
+    def union(self, other):
+        return IntervalSet(np.r_[self.starts, other.starts], np.r_[self.ends, other.ends])
+
+    def intersect(self, other):
+        return self._combine(other, lambda a, b: a & b)
+
+    def subtract(self, other):
+        return self._combine(other, lambda a, b: a & ~b)
+
+    def _combine(self, other, op):
+        """Balayage des bornes des deux ensembles : segments élémentaires retenus selon op(dans A, dans B)."""
+        pos = np.r_[self.starts, self.ends, other.starts, other.ends]
+        if not len(pos): return IntervalSet()
+        na, nb = len(self), len(other)
+        da = np.r_[np.ones(na), -np.ones(na), np.zeros(2 * nb)]
+        db = np.r_[np.zeros(2 * na), np.ones(nb), -np.ones(nb)]
+        order = np.argsort(pos, kind='stable')
+        pos = pos[order]
+        inside = op(np.cumsum(da[order]) > 0, np.cumsum(db[order]) > 0)
+        # Segment k = [pos[k], pos[k+1]] ; les segments de longueur nulle (bornes égales) sont ignorés
+        seg = np.flatnonzero(inside[:-1] & (pos[1:] > pos[:-1]))
+        return IntervalSet(pos[seg], pos[seg + 1])
+
+    def mask(self, ts):
+        """mask[i] = True si ts[i] est dans un des intervalles (bornes incluses ; ts NaN -> False)."""
+        ts = np.asarray(ts, dtype=float)
+        if not len(self.starts): return np.zeros(ts.shape, dtype=bool)
+        k = np.searchsorted(self.starts, ts, side='right') - 1
+        return (k >= 0) & (ts <= self.ends[np.maximum(k, 0)])
+
+
+def sample_mask(ts, include=None, exclude=None):
+    """
+    Échantillons retenus pour un indicateur : dans `include` (tous si None) et hors de `exclude`.
+    """
+    ts = np.asarray(ts, dtype=float)
+    keep = include.mask(ts) if include is not None else np.ones(ts.shape, dtype=bool)
+    if exclude is not None and len(exclude):
+        keep &= ~exclude.mask(ts)
+    return keep
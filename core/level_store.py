@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from core.onyx_reader import OnyxTable
+
+# Niveaux stockés en centi-dB sur int16 : 0.01 dB de résolution, plage ±327 dB
+QUANT_SCALE = 100.0
+NAN_CODE = np.int16(-32768)
+STORE_VERSION = 1
+STORE_SUFFIX = ".levels.npy"
+META_SUFFIX = ".levels.json"
+
+_RE_LEVEL_COL = re.compile(r'(hz$|^db|leq|^l\d+$|^lmax|^lmin)', re.IGNORECASE)
+
+
+def level_columns(columns, frame=None):
+    """Colonnes de niveaux acoustiques (global + bandes) à stocker quantifiées."""
+    cols = [c for c in columns if _RE_LEVEL_COL.search(str(c).strip())]
+    if frame is not None:
+        cols = [c for c in cols if pd.api.types.is_numeric_dtype(frame[c])]
+    return cols
+
+
+def quantize(values):
+    vals = np.asarray(values, dtype=np.float64)
+    codes = np.round(np.clip(vals, -327.67, 327.67) * QUANT_SCALE)
+    codes = np.where(np.isnan(vals), NAN_CODE, codes)
+    return codes.astype(np.int16)
+
+
+def dequantize(codes, dtype=np.float32):
+    codes = np.asarray(codes)
+    out = np.array(codes, dtype=dtype, ndmin=1)
+    out /= dtype(QUANT_SCALE)
+    out[np.atleast_1d(codes == NAN_CODE)] = np.nan
+    return out if codes.ndim else out[0]
+
+
+def _signature(csv_path):
+    st = os.stat(csv_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "version": STORE_VERSION}
+
+
+class LevelStore:
+    """
+    Matrice des niveaux [lignes x colonnes] en int16 centi-dB, mappée en mémoire.
+    Les consommateurs reçoivent des vues numpy (codes) ou des tranches déquantifiées.
+    """
+    def __init__(self, columns, codes):
+        self.columns = list(columns)
+        self.codes = codes
+        self._index = {c: i for i, c in enumerate(self.columns)}
+        self._buf = None
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def nbytes(self):
+        # Un memmap n'est pas résident : seules les pages lues comptent réellement
+        return 0 if isinstance(self.codes, np.memmap) else self.codes.nbytes
+
+    def view(self, name):
+        """Vue int16 (sans copie) d'une colonne."""
+        return self.codes[:, self._index[name]]
+
+    def column(self, name, rows=slice(None)):
+        """Colonne déquantifiée (float32, NaN pour les valeurs absentes)."""
+        return dequantize(self.codes[rows, self._index[name]])
+
+    def matrix(self, names, rows=slice(None)):
+        """Sous-matrice déquantifiée ; les colonnes absentes valent NaN."""
+        block = self.codes[rows]
+        n = block.shape[0] if block.ndim == 2 else 1
+        out = np.full((n, len(names)), np.nan, dtype=np.float32)
+        for j, name in enumerate(names):
+            if name in self._index:
+                out[:, j] = dequantize(block[..., self._index[name]])
+        return out
+
+    def slice_rows(self, start, stop):
+        return LevelStore(self.columns, self.codes[start:stop])
+
+    @staticmethod
+    def from_frame(frame, columns):
+        codes = np.empty((len(frame), len(columns)), dtype=np.int16)
+        for j, name in enumerate(columns):
+            codes[:, j] = quantize(frame[name].to_numpy(dtype=np.float64, na_value=np.nan))
+        return LevelStore(columns, codes)
+
+    @staticmethod
+    def concat(stores):
+        """Concatène les stores de plusieurs segments (colonnes alignées par nom)."""
+        stores = [s for s in stores if s is not None]
+        if not stores: return None
+        if len(stores) == 1: return stores[0]
+        columns = list(stores[0].columns)
+        for s in stores[1:]:
+            columns += [c for c in s.columns if c not in columns]
+        parts = []
+        for s in stores:
+            if s.columns == columns:
+                parts.append(np.asarray(s.codes))
+            else:
+                block = np.full((len(s), len(columns)), NAN_CODE, dtype=np.int16)
+                for j, name in enumerate(columns):
+                    if name in s: block[:, j] = s.view(name)
+                parts.append(block)
+        return LevelStore(columns, np.concatenate(parts, axis=0))
+
+    def append(self, store):
+        """
+        Ajoute les lignes d'un autre store (mode suivi), colonnes alignées par nom.
+        Le store passe en mémoire avec une capacité doublée : coût amorti constant par ligne.
+        """
+        block = np.full((len(store), len(self.columns)), NAN_CODE, dtype=np.int16)
+        for j, name in enumerate(self.columns):
+            if name in store: block[:, j] = store.view(name)
+        n, k = len(self), len(block)
+        if self._buf is None or self._buf.shape[0] < n + k:
+            buf = np.empty((max(2 * (n + k), 1024), len(self.columns)), dtype=np.int16)
+            buf[:n] = self.codes
+            self._buf = buf
+        self._buf[n:n + k] = block
+        self.codes = self._buf[:n + k]
+
+    def materialize(self):
+        """Colonnes float64 arrondies à 0.01 dB, pour la réécriture du CSV."""
+        return {name: np.round(dequantize(self.codes[:, j], np.float64), 2) for j, name in enumerate(self.columns)}
+
+
+def split_levels(table):
+    """Déporte les colonnes de niveaux d'un OnyxTable dans un LevelStore (en mémoire)."""
+    cols = level_columns(table.frame.columns, table.frame)
+    levels = LevelStore.from_frame(table.frame, cols)
+    layout = dict(table.layout)
+    layout.setdefault("columns", list(table.frame.columns))
+    return OnyxTable(table.frame.drop(columns=cols), layout, levels)
+
+
+def store_path_for(csv_path):
+    return csv_path + STORE_SUFFIX
+
+
+def save_level_store(csv_path, store):
+    """Écrit le store à côté du CSV (.levels.npy + .levels.json) et le rouvre en memmap."""
+    path, meta_path = store_path_for(csv_path), csv_path + META_SUFFIX
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(store.codes))
+        os.replace(tmp, path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"signature": _signature(csv_path), "columns": store.columns}, f)
+        return open_level_store(csv_path) or store
+    except Exception:
+        return store
+
+
+def open_level_store(csv_path):
+    """Ouvre le store mappé en mémoire, ou None s'il est absent ou périmé."""
+    path, meta_path = store_path_for(csv_path), csv_path + META_SUFFIX
+    if not (os.path.exists(path) and os.path.exists(meta_path) and os.path.exists(csv_path)):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("signature") != _signature(csv_path):
+            return None
+        return LevelStore(meta["columns"], np.load(path, mmap_mode='r'))
+    except Exception:
+        return None
@@ -2,12 +2,15 @@ import os
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from core.onyx_reader import read_onyx_csv
+from core.time_grid import TimeGrid
 
 class EvidenceLoader:
     def __init__(self):
         self.csv_data = None
         self.audio_path = None
         self.sampling_step = 3.0
+        self.grid = None
         self.start_time_audio = 0.0
         self.time_offset = 0.0
 
@@ -16,23 +19,9 @@ class EvidenceLoader:
             return False, "Fichier CSV introuvable."
 
         try:
-            # 1. Trouver le header
-            header_idx = 0
-            with open(csv_path, 'r', encoding='utf-8', errors='ignore') as f:
-                for i in range(50):
-                    line = f.readline()
-                    # On cherche 'ts' et 'dBA' même s'ils ont des guillemets
-                    if "ts" in line and "dBA" in line:
-                        header_idx = i
-                        break
-            
-            # 2. Chargement
-            df = pd.read_csv(csv_path, sep=';', header=header_idx, low_memory=False)
-
-            # --- CORRECTION NETTOYAGE NOMS DE COLONNES ---
-            # On force le nettoyage des guillemets doubles (") et simples (') et des espaces
-            df.columns = [str(c).strip().replace('"', '').replace("'", "") for c in df.columns]
-            # ---------------------------------------------
+            # 1-2. Lecture via le lecteur ONYX commun (entête, séparateur, décimale)
+            table = read_onyx_csv(csv_path)
+            df = table.frame
 
             # Vérification
             required_cols = ['ts', 'dBA', 'Audio_Ref']
@@ -44,15 +33,15 @@ class EvidenceLoader:
 
             # 3. Typage et Nettoyage données
             df['ts'] = pd.to_numeric(df['ts'], errors='coerce')
-            if df['dBA'].dtype == object:
-                df['dBA'] = df['dBA'].astype(str).str.replace(',', '.').astype(float)
+            df['dBA'] = pd.to_numeric(df['dBA'], errors='coerce')
             
             df = df.dropna(subset=['ts', 'dBA'])
             self.csv_data = df
 
-            # 4. Calculs
-            if len(df) > 1:
-                self.sampling_step = round(float(df['ts'].iloc[1]) - float(df['ts'].iloc[0]), 3)
+            # 4. Calculs : pas réel détecté sur tout le fichier (trous et doublons ignorés)
+            self.grid = TimeGrid.from_ts(df['ts'].to_numpy())
+            if self.grid.step is not None:
+                self.sampling_step = round(self.grid.step, 3)
             
             ref_audio_name = str(df['Audio_Ref'].iloc[0]).strip()
             project_folder = os.path.dirname(csv_path)
@@ -0,0 +1,161 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from core.gaps import GAP_FACTOR
+from core.time_grid import detect_step
+
+# Largeur des seaux du niveau k : 2**k secondes, alignés sur le temps absolu (pyramides concaténables)
+MAX_LEVEL = 17
+LOD_VERSION = 1
+LOD_SUFFIX = ".lod.npz"
+
+
+def _signature(csv_path):
+    st = os.stat(csv_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "version": LOD_VERSION}
+
+
+def _reduce(keys, t0, t1, lo, hi):
+    """Regroupe les éléments consécutifs de même clé : (clés, début, fin, min, max) par seau."""
+    starts = np.r_[0, np.flatnonzero(keys[1:] != keys[:-1]) + 1]
+    stops = np.r_[starts[1:], len(keys)]
+    return (keys[starts], t0[starts], t1[stops - 1],
+            np.minimum.reduceat(lo, starts), np.maximum.reduceat(hi, starts))
+
+
+class LodPyramid:
+    """
+    Pyramide min/max du niveau global : au niveau k, chaque seau de 2**k s garde son premier et
+    son dernier ts, le min et le max des mesures valides. Le tracé choisit le niveau dont le seau
+    vaut environ un pixel : les pics ne sont jamais perdus et le nombre de points tracés est
+    borné par la largeur de l'écran. levels : {k: (t0, t1, lo, hi)} ; n_rows : lignes de la table
+    couvertes (mesures invalides comprises), pour savoir si la pyramide est à jour.
+    """
+    def __init__(self, step, levels, n_rows=0):
+        self.step = step
+        self.levels = levels
+        self.n_rows = n_rows
+        # Maximum cumulé des fins de seau par niveau (recherche binaire malgré les ts qui reculent)
+        self._reach = {}
+
+    @staticmethod
+    def build(ts, y, step=None, n_rows=None):
+        """ts, y : mesures valides dans l'ordre des lignes."""
+        ts = np.asarray(ts, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float32)
+        step = step or detect_step(ts) or 1.0
+        # Deux points tracés par seau : le premier niveau utile regroupe au moins 4 mesures
+        k_min = max(int(np.ceil(np.log2(4.0 * step))), -MAX_LEVEL)
+        levels = {}
+        if len(ts):
+            keys = np.floor(ts / 2.0 ** k_min).astype(np.int64)
+            level = _reduce(keys, ts, ts, y, y)
+            for k in range(k_min, MAX_LEVEL + 1):
+                if k > k_min:
+                    level = _reduce(level[0] // 2, *level[1:])
+                levels[k] = level[1:]
+        else:
+            for k in range(k_min, MAX_LEVEL + 1):
+                levels[k] = (np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32))
+        return LodPyramid(step, levels, len(ts) if n_rows is None else n_rows)
+
+    @staticmethod
+    def from_table(table, start=0):
+        """Pyramide des lignes [start:] d'une table (None sans ts ni niveau global stocké)."""
+        if not table.ts_col or table.levels is None or table.level_col not in table.levels:
+            return None
+        rows = slice(start, len(table))
+        ts = pd.to_numeric(table.frame[table.ts_col].iloc[rows], errors='coerce').to_numpy(dtype=np.float64)
+        y = table.levels.column(table.level_col, rows)
+        ok = ~np.isnan(ts) & ~np.isnan(y)
+        return LodPyramid.build(ts[ok], y[ok], n_rows=len(ts))
+
+    def covers(self, table):
+        return self.n_rows == len(table)
+
+    @staticmethod
+    def concat(parts):
+        """Pyramides de segments successifs (ordre temporel) : niveaux communs mis bout à bout."""
+        if not parts or any(p is None for p in parts): return None
+        if len(parts) == 1: return parts[0]
+        common = set(parts[0].levels)
+        for p in parts[1:]: common &= set(p.levels)
+        levels = {k: tuple(np.concatenate([p.levels[k][i] for p in parts]) for i in range(4)) for k in common}
+        return LodPyramid(max(p.step for p in parts), levels, sum(p.n_rows for p in parts))
+
+    def extend(self, ts, y, n_rows):
+        """Mode suivi : pyramide des n_rows nouvelles lignes (ts, y : leurs mesures valides) ajoutée en fin."""
+        return LodPyramid.concat([self, LodPyramid.build(ts, y, self.step, n_rows)])
+
+    def level_for(self, seconds_per_pixel):
+        """Niveau le plus fin dont le seau couvre au moins un pixel ; None : tracé des mesures brutes."""
+        if not self.levels or seconds_per_pixel <= 0: return None
+        k = int(np.ceil(np.log2(seconds_per_pixel)))
+        if k < min(self.levels): return None
+        return min(k, max(self.levels))
+
+    def window(self, k, x0, x1):
+        """
+        (x, y, connect) des seaux du niveau k qui chevauchent [x0, x1] : deux points par seau
+        (min au début, max à la fin) ; pas de trait entre deux seaux séparés par un trou.
+        """
+        t0, t1, lo, hi = self.levels[k]
+        if k not in self._reach:
+            self._reach[k] = np.maximum.accumulate(t1) if len(t1) else t1
+        i0 = int(np.searchsorted(self._reach[k], x0, side='left'))
+        i1 = int(np.searchsorted(t0, x1, side='right'))
+        t0, t1, lo, hi = t0[i0:i1], t1[i0:i1], lo[i0:i1], hi[i0:i1]
+        n = len(t0)
+        x = np.empty(2 * n)
+        y = np.empty(2 * n, dtype=np.float32)
+        x[0::2], x[1::2] = t0, t1
+        y[0::2], y[1::2] = lo, hi
+        gap = t0[1:] - t1[:-1]
+        connect = np.ones(2 * n, dtype=bool)
+        connect[1:-1:2] = (gap >= 0) & (gap <= max(GAP_FACTOR * self.step, 2.0 ** k))
+        if n: connect[-1] = False
+        return x, y, connect
+
+    # --- CACHE DISQUE (à côté du CSV, comme le store de niveaux) ---
+    def save(self, csv_path):
+        path = csv_path + LOD_SUFFIX
+        tmp = path + ".tmp"
+        try:
+            meta = {"signature": _signature(csv_path), "step": self.step, "n_rows": self.n_rows}
+            arrays = {"__meta__": np.array(json.dumps(meta))}
+            for k, (t0, t1, lo, hi) in self.levels.items():
+                arrays[f"t0_{k}"], arrays[f"t1_{k}"], arrays[f"lo_{k}"], arrays[f"hi_{k}"] = t0, t1, lo, hi
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+            return True
+        except Exception:
+            if os.path.exists(tmp):
+                try: os.remove(tmp)
+                except OSError: pass
+            return False
+
+    @staticmethod
+    def open(csv_path):
+        """Pyramide en cache pour ce CSV, ou None si elle est absente ou périmée."""
+        path = csv_path + LOD_SUFFIX
+        if not (os.path.exists(path) and os.path.exists(csv_path)): return None
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                meta = json.loads(str(npz["__meta__"]))
+                if meta.get("signature") != _signature(csv_path): return None
+                ks = sorted(int(name[3:]) for name in npz.files if name.startswith("t0_"))
+                levels = {k: (npz[f"t0_{k}"], npz[f"t1_{k}"], npz[f"lo_{k}"], npz[f"hi_{k}"]) for k in ks}
+            return LodPyramid(meta["step"], levels, meta["n_rows"])
+        except Exception:
+            return None
+
+
+def table_pyramid(csv_path, table):
+    """Pyramide d'un segment : relue depuis le cache si elle est à jour, sinon construite et enregistrée."""
+    lod = LodPyramid.open(csv_path)
+    if lod is not None and lod.covers(table): return lod
+    lod = LodPyramid.from_table(table)
+    if lod is not None: lod.save(csv_path)
+    return lod
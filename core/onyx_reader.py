@@ -0,0 +1,310 @@
+import io
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# Colonnes toujours traitées comme du texte (jamais converties en nombres)
+TEXT_COLUMNS = ("note", "audio_ref", "h", "date", "heure", "comment")
+
+_RE_NUM_COMMA = re.compile(r'^-?\d+(,\d+)?$')
+_RE_NUM_DOT = re.compile(r'^-?\d+\.\d+$')
+# Part minimale de valeurs numériques dans l'échantillon pour typer une colonne en nombres
+# (le reste, ex: "OVL" de surcharge, devient NaN cellule par cellule)
+NUMERIC_MAJORITY = 0.5
+
+
+def _clean_name(name):
+    return str(name).strip().replace('"', '').replace("'", "")
+
+
+def parse_ts_token(token):
+    """Valeur 'ts' d'un champ brut (point ou virgule décimale), None si illisible."""
+    try:
+        return float(token.strip().strip('"').replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def sniff_layout(csv_path, max_lines=50):
+    """
+    Analyse les premières lignes d'un export ONYX : encodage, lignes de métadonnées,
+    ligne d'entête, séparateur, séparateur décimal et type probable de chaque colonne.
+    """
+    lines = []
+    encoding = 'utf-8-sig'
+    for enc in ('utf-8-sig', 'latin1'):
+        try:
+            with open(csv_path, 'r', encoding=enc) as f:
+                lines = [f.readline() for _ in range(max_lines)]
+            encoding = enc
+            break
+        except UnicodeDecodeError:
+            continue
+    lines = [l for l in lines if l]
+
+    # 1. Ligne d'entête = première ligne contenant une colonne 'ts'
+    header_row, sep = 0, ';'
+    for i, line in enumerate(lines):
+        if line.startswith('#'): continue
+        cand = max((';', ',', '\t'), key=line.count)
+        tokens = [_clean_name(t).lower() for t in line.rstrip('\r\n').split(cand)]
+        if 'ts' in tokens:
+            header_row, sep = i, cand
+            break
+    metadata_header = "".join(lines[:header_row])
+    header = [_clean_name(t) for t in lines[header_row].rstrip('\r\n').split(sep)] if lines else []
+
+    # 2. Échantillon de données : décimale et typage par colonne
+    samples = [l.rstrip('\r\n').split(sep) for l in lines[header_row + 1:header_row + 21]]
+    decimal = '.'
+    if sep != ',' and any(_RE_NUM_COMMA.match(t.strip()) and ',' in t for row in samples for t in row):
+        decimal = ','
+
+    kinds = {}
+    for j, name in enumerate(header):
+        if name.lower() in TEXT_COLUMNS:
+            kinds[name] = "text"
+            continue
+        vals = [row[j].strip() for row in samples if j < len(row) and row[j].strip()]
+        if not vals:
+            kinds[name] = "auto"
+        elif all(_RE_NUM_COMMA.match(v) for v in vals):
+            kinds[name] = "num" if (decimal == ',' or not any(',' in v for v in vals)) else "auto"
+        elif all(_RE_NUM_DOT.match(v) or _RE_NUM_COMMA.match(v) for v in vals):
+            # Ex: 'ts' écrit avec un point alors que les niveaux utilisent la virgule
+            kinds[name] = "num" if decimal == '.' else "dot"
+        elif sum(bool(_RE_NUM_DOT.match(v) or _RE_NUM_COMMA.match(v)) for v in vals) > NUMERIC_MAJORITY * len(vals):
+            # Quelques jetons non numériques (surcharge, capteur absent) : conversion tolérante
+            kinds[name] = "dot"
+        else:
+            kinds[name] = "text"
+
+    return {
+        "encoding": encoding,
+        "header_row": header_row,
+        "metadata_header": metadata_header,
+        "sep": sep,
+        "decimal": decimal,
+        "columns": header,
+        "kinds": kinds,
+    }
+
+
+def _read_kwargs(layout, usecols=None):
+    dtype = {}
+    for name, kind in layout["kinds"].items():
+        if usecols is not None and name not in usecols: continue
+        if kind == "num": dtype[name] = np.float64
+        elif kind in ("dot", "text"): dtype[name] = object
+    return dict(
+        sep=layout["sep"], decimal=layout["decimal"], header=layout["header_row"],
+        encoding=layout["encoding"], engine='c', usecols=usecols, dtype=dtype,
+        on_bad_lines='skip', low_memory=False,
+    )
+
+
+def _to_numeric(col):
+    """Conversion tolérante (virgule ou point décimal) : seule une cellule illisible devient NaN."""
+    if pd.api.types.is_numeric_dtype(col): return col
+    return pd.to_numeric(col.astype(str).str.replace(',', '.'), errors='coerce')
+
+
+def _relaxed(layout, kwargs):
+    """
+    Valeur aberrante dans une colonne typée : relecture sans types imposés, les colonnes
+    "num" étant converties ensuite cellule par cellule (kind "dot").
+    """
+    kwargs = dict(kwargs, dtype=None)
+    layout = dict(layout, kinds={k: ("dot" if v == "num" else v) for k, v in layout["kinds"].items()})
+    return layout, kwargs
+
+
+def _finalize(df, layout):
+    df.columns = [_clean_name(c) for c in df.columns]
+    for name in df.columns:
+        kind = layout["kinds"].get(name, "auto")
+        col = df[name]
+        if kind == "dot":
+            df[name] = _to_numeric(col)
+        elif kind == "auto" and not pd.api.types.is_numeric_dtype(col) and col.notna().any():
+            # Colonne vide dans l'échantillon : on ne convertit que si tout est numérique
+            conv = _to_numeric(col)
+            if conv.notna().sum() == col.notna().sum():
+                df[name] = conv
+    return df
+
+
+def read_onyx_csv(csv_path, usecols=None):
+    """
+    Lecteur unique des exports ONYX (moteur C, types explicites, décimale virgule).
+    Retourne un OnyxTable.
+    """
+    layout = sniff_layout(csv_path)
+    kwargs = _read_kwargs(layout, usecols)
+    try:
+        df = pd.read_csv(csv_path, **kwargs)
+    except (ValueError, TypeError):
+        # Valeur aberrante dans une colonne typée : on relit sans types imposés
+        layout, kwargs = _relaxed(layout, kwargs)
+        df = pd.read_csv(csv_path, **kwargs)
+    return OnyxTable(_finalize(df, layout), layout)
+
+
+def iter_onyx_chunks(csv_path, chunksize=200000):
+    """
+    Lecture progressive : génère (OnyxTable du bloc, fraction lue estimée).
+    La fraction est estimée d'après la taille moyenne des lignes de l'échantillon.
+    """
+    layout = sniff_layout(csv_path)
+    kwargs = _read_kwargs(layout)
+    kwargs.pop("low_memory")
+
+    with open(csv_path, 'r', encoding=layout["encoding"]) as f:
+        head = [f.readline() for _ in range(layout["header_row"] + 51)]
+    data_lines = [l for l in head[layout["header_row"] + 1:] if l]
+    avg_line = (sum(len(l) for l in data_lines) / len(data_lines)) if data_lines else 1
+    est_rows = max(1, int(os.path.getsize(csv_path) / max(avg_line, 1)))
+
+    def chunks(kw):
+        with pd.read_csv(csv_path, chunksize=chunksize, **kw) as reader:
+            yield from reader
+
+    reader, relaxed = chunks(kwargs), False
+    rows_read = done = 0
+    while True:
+        try:
+            chunk = next(reader)
+        except StopIteration:
+            break
+        except (ValueError, TypeError):
+            if relaxed: raise
+            # Valeur aberrante dans ce bloc : relecture sans types imposés à partir de ce bloc
+            # (les blocs déjà fournis sont sautés : mêmes découpes, moteur et lignes ignorées)
+            layout, kwargs = _relaxed(layout, kwargs)
+            reader, relaxed = chunks(kwargs), True
+            for _ in range(done): next(reader)
+            continue
+        done += 1
+        rows_read += len(chunk)
+        yield OnyxTable(_finalize(chunk, layout), layout), min(0.99, rows_read / est_rows)
+
+
+def read_onyx_bytes(data, layout):
+    """
+    Parse un bloc de lignes de données brutes (sans entête) avec le layout du fichier,
+    ex: les octets ajoutés en fin de CSV par le logger pendant une mesure en cours.
+    """
+    kwargs = _read_kwargs(layout)
+    kwargs.update(header=None, names=layout["columns"])
+    try:
+        df = pd.read_csv(io.BytesIO(data), **kwargs)
+    except (ValueError, TypeError):
+        layout, kwargs = _relaxed(layout, kwargs)
+        df = pd.read_csv(io.BytesIO(data), **kwargs)
+    return OnyxTable(_finalize(df, layout), layout)
+
+
+def write_onyx_csv(csv_path, frame, metadata_header=""):
+    """
+    Écrit un tableau au format ONYX (métadonnées, sep ';', décimale ',').
+    Écriture atomique : fichier temporaire, fsync puis renommage ; un arrêt brutal
+    laisse l'ancien fichier intact.
+    """
+    tmp = csv_path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8-sig') as f:
+        if metadata_header: f.write(metadata_header)
+        frame.to_csv(f, sep=';', decimal=',', index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, csv_path)
+
+
+class OnyxTable:
+    """
+    Résultat typé du lecteur ONYX, commun à tous les points d'entrée.
+    Les colonnes de niveaux peuvent être déportées dans un LevelStore (int16 mappé).
+    """
+    def __init__(self, frame, layout, levels=None):
+        self._frame = frame
+        self._pending = []
+        self.layout = layout
+        self.levels = levels
+        # Pyramide min/max du niveau global pour le tracé (core/lod.py), si elle a été calculée
+        self.lod = None
+        self.metadata_header = layout.get("metadata_header", "")
+
+    @property
+    def frame(self):
+        # Lignes ajoutées en mode suivi : concaténées seulement quand le DataFrame est lu
+        if self._pending:
+            self._frame = pd.concat([self._frame] + self._pending, ignore_index=True)
+            self._pending = []
+        return self._frame
+
+    def __len__(self):
+        return len(self._frame) + sum(len(p) for p in self._pending)
+
+    def append(self, chunk):
+        """Ajoute en fin de table les lignes d'un bloc (mode suivi)."""
+        cols = list(chunk.frame.columns)
+        if self.levels is not None:
+            cols = [c for c in cols if c not in self.levels]
+            if chunk.levels is not None:
+                self.levels.append(chunk.levels)
+        self._pending.append(chunk.frame[cols])
+
+    @property
+    def columns(self):
+        cols = list(self.frame.columns)
+        if self.levels is not None:
+            cols += [c for c in self.levels.columns if c not in cols]
+            order = self.layout.get("columns")
+            if order:
+                cols.sort(key=lambda c: order.index(c) if c in order else len(order))
+        return cols
+
+    def values(self, name):
+        """Colonne numérique (float), depuis le store de niveaux ou le DataFrame."""
+        if self.levels is not None and name in self.levels:
+            return self.levels.column(name)
+        return _to_numeric(self.frame[name]).to_numpy(dtype=float)
+
+    def materialize(self):
+        """DataFrame complet (niveaux réinsérés dans l'ordre d'origine), pour l'écriture."""
+        if self.levels is None: return self.frame
+        df = self.frame.copy()
+        for name, vals in self.levels.materialize().items():
+            df[name] = vals
+        return df[self.columns]
+
+    def find_column(self, exact=None, contains=None):
+        cols = self.columns
+        if exact:
+            col = next((c for c in cols if c.lower() == exact.lower()), None)
+            if col is not None: return col
+        if contains:
+            return next((c for c in cols if contains.lower() in c.lower()), None)
+        return None
+
+    @property
+    def ts_col(self):
+        return self.find_column(exact='ts')
+
+    @property
+    def note_col(self):
+        return self.find_column(exact='note', contains='note')
+
+    @property
+    def audio_col(self):
+        return self.find_column(exact='Audio_Ref', contains='audio')
+
+    @property
+    def level_col(self):
+        cols = self.columns
+        col = next((c for c in cols if 'leq' in c.lower() or 'dba' in c.lower()), None)
+        if col is None and len(cols) > 2: col = cols[2]
+        return col
+
+    def band_col(self, freq_label):
+        return self.find_column(exact=freq_label, contains=freq_label)
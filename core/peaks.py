@@ -0,0 +1,92 @@
+import numpy as np
+from core.level_store import NAN_CODE, dequantize
+
+# Lignes par bloc : une requête lit au plus deux bouts de bloc dans le store, quelle que soit la fenêtre
+PEAK_BLOCK = 64
+
+
+def _reserve(buf, n, extra):
+    """Buffer pouvant contenir n + extra entrées (taille exacte au premier calcul, puis capacité doublée)."""
+    if len(buf) >= n + extra: return buf
+    new = np.empty(((n + extra) * (2 if n else 1),) + buf.shape[1:], dtype=buf.dtype)
+    new[:n] = buf[:n]
+    return new
+
+
+class PeakIndex:
+    """
+    Maximum de n'importe quelle plage de lignes [i, j) en O(1), pour des colonnes du store de
+    niveaux : maximum de chaque bloc de PEAK_BLOCK lignes, puis table clairsemée sur ces maxima
+    (niveau L : max de 2**L blocs consécutifs). Une requête combine les deux bouts partiels, lus
+    dans le store, et deux entrées de la table qui se chevauchent. Calculé sur les codes int16 :
+    NAN_CODE est le plus petit code, les valeurs absentes sont donc ignorées par le max.
+    En mode suivi, seules les entrées touchant les nouveaux blocs sont recalculées.
+    """
+    def __init__(self, store, names, n_rows=None):
+        self.store = store
+        self.names = list(names)
+        self._cols = [store.columns.index(name) if name in store else None for name in self.names]
+        self.n_rows = 0
+        self._n_blocks = 0
+        # Buffers à capacité : niveau L valide sur ses n_blocks - 2**L + 1 premières entrées
+        self._table = [np.zeros((0, len(self.names)), dtype=np.int16)]
+        self.extend(n_rows)
+
+    @property
+    def table(self):
+        return [t[:self._n_blocks - 2 ** level + 1] for level, t in enumerate(self._table)]
+
+    def __len__(self):
+        return self.n_rows
+
+    def _codes(self, i, j):
+        """Codes des lignes [i, j) pour les colonnes suivies (NAN_CODE pour une colonne absente)."""
+        out = np.full((max(j - i, 0), len(self._cols)), NAN_CODE, dtype=np.int16)
+        present = [k for k, c in enumerate(self._cols) if c is not None]
+        if present and j > i:
+            out[:, present] = self.store.codes[i:j][:, [self._cols[k] for k in present]]
+        return out
+
+    def extend(self, n_rows=None):
+        """Prolonge l'index jusqu'à n_rows (fin du store par défaut) : seule la fin de chaque niveau est recalculée."""
+        n = len(self.store) if n_rows is None else n_rows
+        if n <= self.n_rows: return
+        # Le dernier bloc (éventuellement partiel) est recalculé avec les nouvelles lignes
+        first = self.n_rows // PEAK_BLOCK
+        codes = self._codes(first * PEAK_BLOCK, n)
+        pad = -len(codes) % PEAK_BLOCK
+        if pad:
+            codes = np.concatenate([codes, np.full((pad, codes.shape[1]), NAN_CODE, dtype=np.int16)])
+        blocks = codes.reshape(-1, PEAK_BLOCK, codes.shape[1]).max(axis=1)
+        n_blocks = first + len(blocks)
+        self._table[0] = _reserve(self._table[0], first, len(blocks))
+        self._table[0][first:n_blocks] = blocks
+        self.n_rows, self._n_blocks = n, n_blocks
+        # table[L][b] = max des blocs [b, b + 2**L) : seules les entrées qui couvrent un bloc >= first changent
+        level = 1
+        while 2 ** level <= n_blocks:
+            if level == len(self._table):
+                self._table.append(np.zeros((0, len(self.names)), dtype=np.int16))
+            half, size = 2 ** (level - 1), n_blocks - 2 ** level + 1
+            start = max(0, first - 2 ** level + 1)
+            prev = self._table[level - 1]
+            self._table[level] = _reserve(self._table[level], start, size - start)
+            self._table[level][start:size] = np.maximum(prev[start:size], prev[start + half:size + half])
+            level += 1
+
+    def max_codes(self, i, j):
+        i, j = max(int(i), 0), min(int(j), self.n_rows)
+        if j <= i: return np.full(len(self._cols), NAN_CODE, dtype=np.int16)
+        # Blocs entiers [bi, bj) ; le reste (moins de 2 blocs) est lu directement
+        bi, bj = -(-i // PEAK_BLOCK), j // PEAK_BLOCK
+        if bi >= bj:
+            return self._codes(i, j).max(axis=0)
+        out = np.maximum(self._codes(i, bi * PEAK_BLOCK).max(axis=0, initial=NAN_CODE),
+                         self._codes(bj * PEAK_BLOCK, j).max(axis=0, initial=NAN_CODE))
+        level = (bj - bi).bit_length() - 1
+        t = self._table[level]
+        return np.maximum(out, np.maximum(t[bi], t[bj - 2 ** level]))
+
+    def max(self, i, j):
+        """Maximum (dB, float32) de chaque colonne sur les lignes [i, j) ; NaN si aucune valeur."""
+        return dequantize(self.max_codes(i, j))
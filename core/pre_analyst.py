@@ -1,14 +1,18 @@
 import pandas as pd
 import numpy as np
+from core.gaps import duplicate_rows
+from core.intervals import sample_mask
 
 class PreAnalyst:
     def __init__(self):
         # Seuils par défaut (seront ajustés par l'opérateur plus tard)
         self.wind_limit_ms = 5.0  # 5 m/s (environ 18 km/h) - Seuil NF S 31-010
 
-    def analyze_dataset(self, df):
+    def analyze_dataset(self, df, include=None, exclude=None):
         """
         Analyse statistique du DataFrame chargé.
+        include / exclude (IntervalSet, optionnels) : statistiques acoustiques limitées aux
+        plages `include` et hors des plages `exclude` (ex. zones Autre / Exclusion).
         Retourne un dictionnaire de résultats.
         """
         results = {
@@ -26,7 +30,12 @@ class PreAnalyst:
         # 1. Analyse Acoustique de base (dBA)
         try:
             # On s'assure que c'est bien du numérique (déjà fait par Loader, mais double sécu)
-            series_dba = pd.to_numeric(df['dBA'], errors='coerce').dropna()
+            series_dba = pd.to_numeric(df['dBA'], errors='coerce')
+            if 'ts' in df.columns:
+                ts = pd.to_numeric(df['ts'], errors='coerce').to_numpy()
+                # ts dupliqués (redémarrage du logger) : une seule mesure par instant
+                series_dba = series_dba[~duplicate_rows(ts) & sample_mask(ts, include, exclude)]
+            series_dba = series_dba.dropna()
             
             if not series_dba.empty:
                 results["min_dba"] = float(series_dba.min())
@@ -0,0 +1,92 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Version du parser : toute évolution du parsing CSV invalide les caches existants
+PARSER_VERSION = 3
+CACHE_SUFFIX = ".prism_cache.npz"
+
+
+def cache_path_for(csv_path):
+    return csv_path + CACHE_SUFFIX
+
+
+def _csv_signature(csv_path):
+    st = os.stat(csv_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "parser": PARSER_VERSION}
+
+
+def load_frame_cache(csv_path):
+    """
+    Recharge le DataFrame typé depuis le cache binaire (.npz) placé à côté du CSV.
+    Retourne (df, metadata_header, ordre complet des colonnes du CSV) ou None si le cache
+    est absent ou périmé.
+    """
+    path = cache_path_for(csv_path)
+    if not os.path.exists(path) or not os.path.exists(csv_path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["__meta__"]))
+            if meta.get("signature") != _csv_signature(csv_path):
+                return None
+
+            data = {}
+            for i, (name, kind) in enumerate(zip(meta["columns"], meta["kinds"])):
+                if kind == "num":
+                    data[name] = npz[f"c{i}"]
+                else:
+                    # Colonnes texte stockées en (codes, valeurs uniques) : compact et rapide
+                    codes = npz[f"c{i}"]
+                    uniques = npz[f"u{i}"].astype(object)
+                    values = np.empty(len(codes), dtype=object)
+                    valid = codes >= 0
+                    values[valid] = uniques[codes[valid]]
+                    values[~valid] = np.nan
+                    data[name] = values
+            df = pd.DataFrame(data, columns=meta["columns"])
+            return df, meta.get("metadata_header", ""), meta.get("all_columns") or meta["columns"]
+    except Exception:
+        return None
+
+
+def store_frame_cache(csv_path, df, metadata_header="", all_columns=None):
+    """
+    Écrit le cache binaire du DataFrame, indexé sur taille + mtime du CSV + version du parser.
+    all_columns : ordre complet des colonnes du CSV si certaines sont stockées ailleurs (niveaux).
+    """
+    path = cache_path_for(csv_path)
+    tmp_path = path + ".tmp"
+    try:
+        arrays = {}
+        kinds = []
+        for i, name in enumerate(df.columns):
+            col = df[name]
+            if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+                arrays[f"c{i}"] = col.to_numpy(dtype=np.float64)
+                kinds.append("num")
+            else:
+                codes, uniques = pd.factorize(col, use_na_sentinel=True)
+                arrays[f"c{i}"] = codes.astype(np.int32)
+                arrays[f"u{i}"] = np.asarray([str(u) for u in uniques], dtype=str)
+                kinds.append("txt")
+
+        meta = {
+            "signature": _csv_signature(csv_path),
+            "columns": [str(c) for c in df.columns],
+            "kinds": kinds,
+            "metadata_header": metadata_header or "",
+            "all_columns": [str(c) for c in (all_columns if all_columns is not None else df.columns)],
+        }
+        arrays["__meta__"] = np.array(json.dumps(meta))
+
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        return True
+    except Exception:
+        if os.path.exists(tmp_path):
+            try: os.remove(tmp_path)
+            except OSError: pass
+        return False
@@ -0,0 +1,363 @@
+import re
+import numpy as np
+import pandas as pd
+from core.level_store import LevelStore, level_columns
+from core.time_grid import TimeGrid
+from core.gaps import GapIndex, duplicate_rows
+from core.energy import EnergyPrefix
+from core.peaks import PeakIndex
+from core.zones import CLASS_NAMES, ZoneIndex, ZoneSpec, class_code
+
+_RE_FREQ = re.compile(r'([0-9]+(?:[.,][0-9]+)?)\s*(k?)hz', re.IGNORECASE)
+
+
+def parse_band_freq(label):
+    """'31.5Hz' -> 31.5 ; '1kHz' -> 1000.0 ; None si ce n'est pas une bande."""
+    m = _RE_FREQ.search(str(label))
+    if not m: return None
+    val = float(m.group(1).replace(',', '.'))
+    return val * 1000.0 if m.group(2) else val
+
+
+def _reserve(buf, n, extra):
+    """Buffer pouvant contenir n + extra éléments (capacité doublée : ajout en O(1) amorti)."""
+    if len(buf) >= n + extra: return buf
+    new = np.empty(max(2 * (n + extra), 1024), dtype=buf.dtype)
+    new[:n] = buf[:n]
+    return new
+
+
+class Session:
+    """
+    Modèle de données typé construit une fois au chargement : tableaux numpy contigus
+    (ts, niveau global, matrice de bandes), référence audio catégorielle et table de notes
+    creuse. Les handlers de l'interface travaillent uniquement sur ces tableaux.
+    """
+    def __init__(self, ts, level_name, levels, band_labels, audio_codes, audio_files, notes):
+        self._n = len(ts)
+        self._ts = ts
+        self.level_name = level_name
+        self.levels = levels
+        self.band_labels = band_labels
+        self.band_freqs = np.array([parse_band_freq(b) for b in band_labels], dtype=float)
+        self._audio_codes = audio_codes
+        self.audio_files = audio_files
+        self._audio_lookup = {f: i for i, f in enumerate(audio_files)}
+        self.notes = notes
+        # Zones typées, analysées une fois ici puis à chaque édition (jamais au dessin)
+        self.zone_specs = {r: ZoneSpec.from_note(n) for r, n in notes.items()}
+        self.dirty_rows = set()
+        # Zones laissées en place par la dernière édition groupée [(ligne, motif)]
+        self.skipped_zones = []
+        self._zones = None
+        # Pyramide min/max du niveau global (tracé), fournie par la table combinée
+        self.lod = None
+
+        # Niveau global précalculé (float32) et masque des points valides
+        if level_name is not None and level_name in levels:
+            self._level = levels.column(level_name)
+        else:
+            self._level = np.full(len(ts), np.nan, dtype=np.float32)
+        self._valid = ~np.isnan(ts) & ~np.isnan(self._level)
+        self._band_cache = {}
+        # Énergies cumulées (Leq en O(1)) : None = niveau global, libellé de bande ou tuple de bandes
+        self._energy = {}
+        # Index de crêtes (max de plage en O(1)) par tuple de bandes
+        self._peaks = {}
+
+        # Grille régulière : ts -> index en O(1) pour toutes les interactions
+        self.grid = TimeGrid.from_ts(ts)
+        # Séquences contiguës (trous, doublons, redémarrages) : coupures de tracé et statistiques
+        self.gaps = GapIndex.from_ts(ts, self.grid.step)
+
+        # Début de chaque fichier audio (ts min par code), calculé une fois
+        self.audio_start = np.full(len(audio_files), np.inf)
+        ok = (audio_codes >= 0) & ~np.isnan(ts)
+        np.minimum.at(self.audio_start, audio_codes[ok], ts[ok])
+
+    def __len__(self):
+        return self._n
+
+    # Vues sur les buffers (plus longs que la session en mode suivi)
+    @property
+    def ts(self):
+        return self._ts[:self._n]
+
+    @property
+    def level(self):
+        return self._level[:self._n]
+
+    @property
+    def valid(self):
+        return self._valid[:self._n]
+
+    @property
+    def audio_codes(self):
+        return self._audio_codes[:self._n]
+
+    @staticmethod
+    def from_table(table):
+        df = table.frame
+        ts_col, note_col, audio_col = table.ts_col, table.note_col, table.audio_col
+        n = len(df)
+        ts = np.ascontiguousarray(pd.to_numeric(df[ts_col], errors='coerce').to_numpy(dtype=np.float64)) if ts_col else np.full(n, np.nan)
+
+        levels = table.levels
+        if levels is None:
+            levels = LevelStore.from_frame(df, level_columns(df.columns, df))
+        band_labels = [c for c in levels.columns if parse_band_freq(c) is not None]
+
+        audio_codes, audio_files = np.full(n, -1, dtype=np.int32), []
+        if audio_col and audio_col in df.columns:
+            codes, uniques = pd.factorize(df[audio_col], use_na_sentinel=True)
+            audio_codes = codes.astype(np.int32)
+            audio_files = [str(u) for u in uniques]
+
+        notes = {}
+        if note_col and note_col in df.columns:
+            col = df[note_col]
+            rows = np.flatnonzero(col.notna().to_numpy())
+            notes = {int(r): str(v) for r, v in zip(rows, col.iloc[rows])}
+
+        session = Session(ts, table.level_col, levels, band_labels, audio_codes, audio_files, notes)
+        session.lod = table.lod
+        return session
+
+    # --- MODE SUIVI ---
+    def append(self, chunk):
+        """
+        Ajoute les lignes d'un bloc lu en fin de fichier. Les niveaux sont ajoutés au store
+        s'ils ne l'ont pas déjà été par la table partagée. Retourne la tranche des nouvelles lignes.
+        """
+        n, k = self._n, len(chunk.frame)
+        if k == 0: return slice(n, n)
+        df = chunk.frame
+        ts = pd.to_numeric(df[chunk.ts_col], errors='coerce').to_numpy(dtype=np.float64) if chunk.ts_col else np.full(k, np.nan)
+        if len(self.levels) < n + k and chunk.levels is not None:
+            self.levels.append(chunk.levels)
+        rows = slice(n, n + k)
+
+        if self.level_name is not None and self.level_name in self.levels:
+            level = self.levels.column(self.level_name, rows)
+        else:
+            level = np.full(k, np.nan, dtype=np.float32)
+
+        codes = np.full(k, -1, dtype=np.int32)
+        audio_col = chunk.audio_col
+        if audio_col and audio_col in df.columns:
+            local, uniques = pd.factorize(df[audio_col], use_na_sentinel=True)
+            remap = np.array([self._audio_code(str(u)) for u in uniques] + [-1], dtype=np.int32)
+            codes = remap[local]
+            ok = (codes >= 0) & ~np.isnan(ts)
+            np.minimum.at(self.audio_start, codes[ok], ts[ok])
+
+        note_col = chunk.note_col
+        if note_col and note_col in df.columns:
+            col = df[note_col]
+            for r in np.flatnonzero(col.notna().to_numpy()):
+                self.notes[n + int(r)] = str(col.iloc[r])
+                self.zone_specs[n + int(r)] = ZoneSpec.from_note(self.notes[n + int(r)])
+                self._zones = None
+
+        self._ts = _reserve(self._ts, n, k)
+        self._level = _reserve(self._level, n, k)
+        self._valid = _reserve(self._valid, n, k)
+        self._audio_codes = _reserve(self._audio_codes, n, k)
+        self._ts[rows] = ts
+        self._level[rows] = level
+        self._valid[rows] = ~np.isnan(ts) & ~np.isnan(level)
+        self._audio_codes[rows] = codes
+        self._n = n + k
+        self._band_cache.clear()
+        if self.lod is not None:
+            ok = self._valid[rows]
+            self.lod = self.lod.extend(ts[ok], level[ok], k)
+        if self._energy:
+            fresh = ~duplicate_rows(self.ts[max(0, n - 1):])[1 if n else 0:]
+            for band, prefix in self._energy.items():
+                prefix.extend(level if band is None else self._energy_values(band, rows), fresh)
+        for index in self._peaks.values():
+            index.extend(n + k)
+        self.grid.extend(self.ts)
+        self.gaps.extend(self.ts)
+        return rows
+
+    def _audio_code(self, name):
+        code = self._audio_lookup.get(name)
+        if code is None:
+            code = self._audio_lookup[name] = len(self.audio_files)
+            self.audio_files.append(name)
+            self.audio_start = np.append(self.audio_start, np.inf)
+        return code
+
+    # --- INDEX ---
+    def nearest_index(self, ts):
+        """Index de l'échantillon le plus proche (grille régulière, sinon recherche binaire)."""
+        return self.grid.nearest_index(ts)
+
+    def searchsorted(self, ts):
+        return self.grid.searchsorted(ts)
+
+    # --- NIVEAUX ---
+    def band(self, label):
+        """Courbe d'une bande (float32), déquantifiée une seule fois puis gardée en cache."""
+        if label not in self._band_cache:
+            self._band_cache[label] = self.levels.column(label) if label in self.levels else None
+        return self._band_cache[label]
+
+    def band_row(self, idx, labels=None):
+        return self.levels.matrix(labels if labels is not None else self.band_labels, rows=idx)[0]
+
+    # --- ÉNERGIE (Leq) ---
+    def _energy_values(self, band, rows=slice(None)):
+        if isinstance(band, tuple): return self.levels.matrix(list(band), rows)
+        return self.levels.column(band, rows)
+
+    def energy(self, band=None):
+        """
+        Énergie cumulée du niveau global, d'une bande ou d'un tuple de bandes (une colonne par
+        bande), construite au premier appel puis prolongée.
+        """
+        if band not in self._energy:
+            if band is None: values = self.level
+            elif isinstance(band, tuple): values = self._energy_values(band)
+            else: values = self.band(band)
+            if values is None: return None
+            # ts dupliqués (redémarrage du logger) comptés une seule fois
+            self._energy[band] = EnergyPrefix.from_levels(values, ~duplicate_rows(self.ts))
+        return self._energy[band]
+
+    def leq(self, t0, t1, band=None):
+        """(Leq énergétique, nombre de mesures) sur [t0, t1[ ; Leq NaN si la plage est vide."""
+        prefix = self.energy(band)
+        if prefix is None: return float('nan'), 0
+        i, j = self.searchsorted(t0), self.searchsorted(t1)
+        return float(prefix.leq(i, j)), int(prefix.count(i, j))
+
+    def peaks(self, labels):
+        """Index des crêtes des bandes `labels` (absentes : NaN), construit au premier appel puis prolongé."""
+        key = tuple(labels)
+        if key not in self._peaks:
+            self._peaks[key] = PeakIndex(self.levels, key, self._n)
+        return self._peaks[key]
+
+    # --- AUDIO ---
+    def audio_file_at(self, idx):
+        code = self.audio_codes[idx]
+        return self.audio_files[code] if code >= 0 else None
+
+    def audio_start_at(self, idx):
+        code = self.audio_codes[idx]
+        return float(self.audio_start[code]) if code >= 0 else None
+
+    # --- NOTES ---
+    @property
+    def zones(self):
+        """Index d'intervalles des zones, reconstruit seulement après une édition."""
+        if self._zones is None:
+            self._zones = ZoneIndex.from_specs(self.zone_specs, self.ts)
+        return self._zones
+
+    def markers(self):
+        """Zones [(ts, note)] triées par centre, sans doublons exacts (ts dupliqués)."""
+        z = self.zones
+        out = []
+        for k in z.by_centre():
+            m = (float(z.centres[k]), self.notes[int(z.rows[k])])
+            if not out or out[-1] != m: out.append(m)
+        return out
+
+    def note_at(self, idx):
+        return self.notes.get(int(idx))
+
+    def set_note(self, idx, note):
+        idx = int(idx)
+        if note is None or (isinstance(note, float) and np.isnan(note)):
+            self.notes.pop(idx, None)
+            self.zone_specs.pop(idx, None)
+        else:
+            self.notes[idx] = note
+            self.zone_specs[idx] = ZoneSpec.from_note(note)
+        self.dirty_rows.add(idx)
+        self._zones = None
+
+    # --- ÉDITION GROUPÉE DES ZONES ---
+    def zone_rows(self, t0=None, t1=None, cls=None):
+        """Lignes des zones qui chevauchent [t0, t1] (bornes optionnelles), filtrées par classe."""
+        z = self.zones
+        pos = z.overlapping(-np.inf if t0 is None else t0, np.inf if t1 is None else t1)
+        if cls is not None:
+            if cls in CLASS_NAMES:
+                pos = pos[z.codes[pos] == CLASS_NAMES.index(cls)]
+            else:
+                pos = [k for k in pos if z.labels[k] == cls]
+        return sorted(int(z.rows[k]) for k in pos)
+
+    def edit_zones(self, rows, label=None, delete=False, shift=0.0):
+        """
+        Applique une même opération à plusieurs zones (suppression, nouveau libellé, décalage
+        de `shift` secondes, recalé sur l'échantillon le plus proche).
+        Un décalage qui sortirait de la plage chargée, tomberait sur une zone qui ne bouge pas
+        ou sur la même ligne qu'une autre zone décalée est refusé : la zone reste en place et
+        figure dans `self.skipped_zones` [(ligne, motif)].
+        Retourne les changements [(ligne, note ou None)] à journaliser.
+        """
+        self.skipped_zones = []
+        changes, notes, plan = {}, {}, {}
+        valid_ts = self.ts[self.valid]
+        t_min, t_max = (float(valid_ts.min()), float(valid_ts.max())) if len(valid_ts) else (np.inf, -np.inf)
+        for r in rows:
+            r = int(r)
+            note = self.notes.get(r)
+            if note is None: continue
+            if delete:
+                changes[r] = None
+                continue
+            if label is not None:
+                note = ZoneSpec(label, self.zone_specs[r].duration, class_code(label)).to_note()
+            notes[r] = note
+            if not shift: continue
+            new_ts = float(self.ts[r]) + shift
+            if not (t_min <= new_ts <= t_max):
+                self.skipped_zones.append((r, "hors de la plage chargée"))
+                continue
+            target = int(self.nearest_index(new_ts))
+            if target != r: plan[r] = target
+
+        # Destinations refusées jusqu'à stabilité : une zone qui reste en place occupe sa ligne
+        while plan:
+            claims = {}
+            for r in sorted(plan):
+                claims.setdefault(plan[r], []).append(r)
+            refused = {}
+            for target, sources in claims.items():
+                if target in self.notes and target not in plan:
+                    refused.update((r, "ligne déjà occupée par une zone") for r in sources)
+                elif len(sources) > 1:
+                    # Même ligne visée par plusieurs zones : seule la première est déplacée
+                    refused.update((r, "même destination qu'une autre zone") for r in sources[1:])
+            if not refused: break
+            for r, reason in refused.items():
+                del plan[r]
+                self.skipped_zones.append((r, reason))
+
+        for r, note in notes.items():
+            changes[r] = None if r in plan else note
+        # Destinations posées après les départs : deux zones décalées ensemble ne s'effacent pas
+        for r, target in plan.items():
+            changes[target] = notes[r]
+        for r, note in changes.items():
+            self.set_note(r, note)
+        return sorted(changes.items())
+
+    def flush_notes(self, frame, note_col='note'):
+        """Reporte dans le DataFrame uniquement les lignes de notes modifiées."""
+        if not self.dirty_rows: return []
+        rows = sorted(self.dirty_rows)
+        if note_col not in frame.columns:
+            frame[note_col] = pd.Series(np.nan, index=frame.index, dtype=object)
+        col = frame.columns.get_loc(note_col)
+        for r in rows:
+            frame.iat[r, col] = self.notes.get(r, np.nan)
+        self.dirty_rows.clear()
+        return rows
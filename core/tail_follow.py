@@ -0,0 +1,106 @@
+import os
+import numpy as np
+import pandas as pd
+from core.onyx_reader import OnyxTable, parse_ts_token, read_onyx_bytes, sniff_layout
+from core.level_store import split_levels
+
+# En dessous de cette fenêtre, la recherche du point de reprise passe au filtrage par ts
+SEARCH_WINDOW = 64 * 1024
+
+
+def _data_start(f, layout):
+    f.seek(0)
+    for _ in range(layout["header_row"] + 1):
+        f.readline()
+    return f.tell()
+
+
+def find_resume_offset(csv_path, layout, last_ts):
+    """
+    Début d'une ligne dont le ts est <= last_ts, proche de la fin des données connues
+    (recherche binaire sur les octets du fichier, sans le relire en entier).
+    """
+    cols = [c.lower() for c in layout["columns"]]
+    ts_idx, sep = cols.index('ts'), layout["sep"]
+    with open(csv_path, 'rb') as f:
+        lo = _data_start(f, layout)
+        if last_ts is None: return lo
+        f.seek(0, os.SEEK_END)
+        hi = f.tell()
+        while hi - lo > SEARCH_WINDOW:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            f.readline()
+            pos = f.tell()
+            if pos >= hi:
+                hi = mid
+                continue
+            tokens = f.readline().decode(layout["encoding"], errors='ignore').split(sep)
+            ts = parse_ts_token(tokens[ts_idx]) if len(tokens) > ts_idx else None
+            # Ligne illisible : on reste prudent et on recule
+            if ts is not None and ts <= last_ts:
+                lo = pos
+            else:
+                hi = mid
+    return lo
+
+
+class TailFollower:
+    """
+    Suit un CSV ONYX encore en cours d'écriture : à chaque poll(), seuls les octets ajoutés
+    depuis le dernier offset connu sont lus (lignes complètes uniquement) et parsés.
+    Seul le premier bloc lu après la reprise est filtré par last_ts ; ensuite, un retour en
+    arrière des ts (logger redémarré) est gardé comme de nouvelles lignes et noté dans
+    `self.backward_jumps` [(dernier ts, ts reçu)] pour ce poll.
+    """
+    def __init__(self, csv_path, last_ts=None, layout=None):
+        self.path = csv_path
+        self.layout = layout or sniff_layout(csv_path)
+        self.last_ts = last_ts
+        self.offset = find_resume_offset(csv_path, self.layout, last_ts)
+        self.resuming = last_ts is not None
+        self.truncated = False
+        self.rows_read = 0
+        self.backward_jumps = []
+
+    def poll(self):
+        """OnyxTable des nouvelles lignes (niveaux en LevelStore), ou None si rien de neuf."""
+        self.backward_jumps = []
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return None
+        if size < self.offset:
+            # Fichier remplacé ou tronqué : l'offset n'a plus de sens
+            self.truncated = True
+            return None
+        if size == self.offset: return None
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        cut = data.rfind(b'\n')
+        if cut < 0: return None
+        self.offset += cut + 1
+
+        table = read_onyx_bytes(data[:cut + 1], self.layout)
+        df = table.frame
+        if table.ts_col:
+            ts = pd.to_numeric(df[table.ts_col], errors='coerce').to_numpy()
+            if self.resuming:
+                # Les lignes déjà connues (reprise avant last_ts) sont écartées
+                self.resuming = False
+                keep = ~(ts <= self.last_ts)
+                if not keep.all():
+                    df, ts = df[keep].reset_index(drop=True), ts[keep]
+            elif len(ts):
+                # Retours en arrière : par rapport au bloc précédent, puis à l'intérieur du bloc
+                prev = np.concatenate(([np.nan if self.last_ts is None else self.last_ts], ts[:-1]))
+                back = np.flatnonzero(ts < prev)
+                self.backward_jumps = [(float(prev[i]), float(ts[i])) for i in back]
+            if len(ts) and not np.isnan(ts).all():
+                self.last_ts = float(np.nanmax(ts)) if self.last_ts is None else max(self.last_ts, float(np.nanmax(ts)))
+        if df.empty: return None
+
+        self.rows_read += len(df)
+        return split_levels(OnyxTable(df, table.layout))
@@ -0,0 +1,117 @@
+import numpy as np
+
+# Écart max (fraction du pas) entre un ts et son créneau pour garder la grille régulière
+MAX_JITTER = 0.45
+# Au-delà de ce nombre de créneaux par ligne (trous trop longs), on garde la recherche binaire
+MAX_SLOTS_PER_ROW = 4
+
+
+def detect_step(ts):
+    """Pas d'échantillonnage réel : médiane des écarts positifs (insensible aux trous et doublons)."""
+    ts = np.asarray(ts, dtype=float)
+    ts = ts[~np.isnan(ts)]
+    if len(ts) < 2: return None
+    d = np.diff(ts)
+    d = d[d > 0]
+    return float(np.median(d)) if len(d) else None
+
+
+class TimeGrid:
+    """
+    Grille régulière t0 + k * step posée sur les ts d'une session.
+    slot_rows[k] = ligne du créneau k (-1 = échantillon manquant) ; prev_row[k] = dernière
+    ligne dont le créneau est <= k. La conversion ts -> index est alors en O(1) ;
+    les fichiers réellement irréguliers retombent sur une recherche binaire.
+    """
+    def __init__(self, ts, t0=None, step=None, row_slots=None):
+        self.ts = ts
+        self.t0 = t0
+        self.step = step
+        self.regular = row_slots is not None
+        self.slot_rows = None
+        self.prev_row = None
+        if self.regular:
+            self._build(row_slots)
+
+    def _build(self, row_slots):
+        n, n_slots = len(row_slots), int(row_slots[-1]) + 1
+        # Doublons de ts : le créneau pointe sur la première ligne, prev_row sur la dernière
+        first = np.r_[True, row_slots[1:] != row_slots[:-1]]
+        last = np.r_[row_slots[1:] != row_slots[:-1], True]
+        self.slot_rows = np.full(n_slots, -1, dtype=np.int32)
+        self.slot_rows[row_slots[first]] = np.flatnonzero(first)
+        prev = np.full(n_slots, -1, dtype=np.int32)
+        prev[row_slots[last]] = np.flatnonzero(last)
+        self.prev_row = np.maximum.accumulate(prev)
+        self.row_slots = row_slots
+
+    @staticmethod
+    def from_ts(ts):
+        ts = np.asarray(ts, dtype=float)
+        step0 = detect_step(ts)
+        if step0 is None or np.isnan(ts).any() or np.any(np.diff(ts) < 0):
+            return TimeGrid(ts, ts[0] if len(ts) else None, step0)
+
+        # Créneaux cumulés écart par écart : robuste à une dérive lente de l'horloge
+        slots = np.concatenate(([0], np.cumsum(np.rint(np.diff(ts) / step0).astype(np.int64))))
+        if slots[-1] + 1 > MAX_SLOTS_PER_ROW * len(ts) + 16:
+            return TimeGrid(ts, ts[0], step0)
+        step, t0 = np.polyfit(slots, ts, 1) if slots[-1] > 0 else (step0, ts[0])
+        if np.abs(ts - (t0 + step * slots)).max() > MAX_JITTER * step:
+            return TimeGrid(ts, ts[0], step0)
+        return TimeGrid(ts, float(t0), float(step), slots)
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def n_holes(self):
+        return int((self.slot_rows < 0).sum()) if self.regular else 0
+
+    def slot_of(self, t):
+        k = int(np.floor((t - self.t0) / self.step + 0.5))
+        return min(max(k, 0), len(self.prev_row) - 1)
+
+    def nearest_index(self, t):
+        """Index de l'échantillon le plus proche de t."""
+        n = len(self.ts)
+        if n == 0: return None
+        # ts triés : le plus proche est la première ligne >= t ou celle qui la précède
+        # (plusieurs mesures décalées peuvent partager un créneau : pas de comparaison par voisins)
+        i = self.searchsorted(t)
+        if i <= 0: return 0
+        if i >= n: return n - 1
+        return i if abs(self.ts[i] - t) < abs(t - self.ts[i - 1]) else i - 1
+
+    def searchsorted(self, t):
+        """Équivalent de np.searchsorted(ts, t) (première ligne dont ts >= t)."""
+        n = len(self.ts)
+        if not self.regular or n == 0:
+            return int(np.searchsorted(self.ts, t))
+        i = int(self.prev_row[self.slot_of(t)])
+        lo, hi = max(0, i - 2), min(n, i + 3)
+        k = lo + int(np.searchsorted(self.ts[lo:hi], t))
+        # Résultat en bord de fenêtre : on ne peut pas conclure localement
+        if (k == lo and lo > 0) or (k == hi and hi < n):
+            return int(np.searchsorted(self.ts, t))
+        return k
+
+    def extend(self, ts):
+        """Mode suivi : ts contient les anciennes lignes suivies des nouvelles."""
+        n_old = len(self.ts)
+        self.ts = ts
+        if not self.regular:
+            if self.step is None: self.step = detect_step(ts)
+            return
+        new = np.asarray(ts[n_old:], dtype=float)
+        if not len(new): return
+        if np.isnan(new).any() or new[0] < ts[n_old - 1] or np.any(np.diff(new) < 0):
+            self.regular = False
+            return
+        inc = np.rint(np.diff(np.concatenate(([ts[n_old - 1]], new))) / self.step).astype(np.int64)
+        slots = self.row_slots[-1] + np.cumsum(inc)
+        if np.abs(new - (self.t0 + self.step * slots)).max() > MAX_JITTER * self.step \
+                or slots[-1] + 1 > MAX_SLOTS_PER_ROW * len(ts) + 16:
+            self.regular = False
+            return
+        self._build(np.concatenate((self.row_slots, slots)))
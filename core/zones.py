@@ -0,0 +1,136 @@
+import re
+import numpy as np
+from core.intervals import IntervalSet
+
+# Durée d'une zone sans {d=...} (même valeur que l'affichage)
+DEFAULT_ZONE_DURATION = 120.0
+
+# Classes de qualification typées (code = position dans la liste, -1 = libellé libre)
+CLASS_NAMES = ["Source +", "Source Std", "Source -", "Résiduel", "Autre"]
+CLASS_COLORS = ['#FF0000', '#FF8C00', '#FFD700', '#00FF00', '#808080']
+UNKNOWN_COLOR = '#AAAAAA'
+# Classes utilisées par les indicateurs (résiduel mesuré, périodes exclues)
+RESIDUAL_CODE = 3
+EXCLUSION_CODE = 4
+
+# Mots-clés reconnus dans les libellés (ordre = priorité)
+_CLASS_KEYS = [("source +", 0), ("source std", 1), ("source -", 2), ("résiduel", 3), ("autre", 4), ("exclusion", 4)]
+
+_RE_DURATION = re.compile(r'\{d=([0-9\.]+)\}')
+
+
+def parse_zone_note(note):
+    """(libellé, durée en s) d'une note ONYX 'Libellé {d=...}'."""
+    label = str(note).split('{')[0].strip()
+    match = _RE_DURATION.search(str(note))
+    return label, float(match.group(1)) if match else DEFAULT_ZONE_DURATION
+
+
+def format_zone_note(label, duration):
+    """Écriture au format historique des notes ONYX : 'Libellé {d=...}'."""
+    return f"{label} {{d={float(duration):.1f}}}"
+
+
+def class_code(label):
+    lbl = label.lower()
+    for key, code in _CLASS_KEYS:
+        if key in lbl: return code
+    return -1
+
+
+def zone_class(label):
+    code = class_code(label)
+    return CLASS_NAMES[code] if code >= 0 else label
+
+
+def zone_color(code):
+    return CLASS_COLORS[code] if code >= 0 else UNKNOWN_COLOR
+
+
+class ZoneSpec:
+    """Zone typée, analysée une seule fois (chargement ou édition) : libellé libre, durée, code de classe."""
+    def __init__(self, label, duration, code):
+        self.label = label
+        self.duration = duration
+        self.code = code
+
+    @staticmethod
+    def from_note(note):
+        label, duration = parse_zone_note(note)
+        return ZoneSpec(label, duration, class_code(label))
+
+    def to_note(self):
+        return format_zone_note(self.label, self.duration)
+
+
+class ZoneIndex:
+    """
+    Zones d'une session triées par début, en colonnes typées : rows / centres / starts / ends,
+    code de classe et libellé libre, plus le maximum cumulé des fins (croissant), ce qui rend
+    la recherche binaire possible pour « zones couvrant t » et « zones visibles dans [t0, t1] ».
+    Reconstruit après une édition, sans analyser de chaîne.
+    """
+    def __init__(self, rows, centres, starts, ends, codes, labels):
+        order = np.lexsort((centres, starts))
+        self.rows = np.asarray(rows, dtype=np.int64)[order]
+        self.centres = np.asarray(centres, dtype=float)[order]
+        self.starts = np.asarray(starts, dtype=float)[order]
+        self.ends = np.asarray(ends, dtype=float)[order]
+        self.codes = np.asarray(codes, dtype=np.int8)[order]
+        self.labels = [labels[k] for k in order]
+        self.max_end = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+        # Ordre par centre (position du marqueur) et accès par identifiant (ligne de la session)
+        self._by_centre = np.argsort(self.centres, kind='stable')
+        self._sorted_centres = self.centres[self._by_centre]
+        # Rang de chaque zone dans l'ordre des centres (étagement stable des étiquettes)
+        self.centre_rank = np.empty(len(self.rows), dtype=np.int64)
+        self.centre_rank[self._by_centre] = np.arange(len(self.rows))
+        self._pos = {int(r): k for k, r in enumerate(self.rows)}
+
+    @staticmethod
+    def from_specs(specs, ts):
+        """specs : {ligne: ZoneSpec} ; le centre de chaque zone est le ts de sa ligne."""
+        rows = sorted(specs)
+        centres = np.asarray(ts, dtype=float)[rows] if rows else np.zeros(0)
+        half = np.array([specs[r].duration / 2.0 for r in rows], dtype=float)
+        codes = [specs[r].code for r in rows]
+        return ZoneIndex(rows, centres, centres - half, centres + half, codes, [specs[r].label for r in rows])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def position(self, row):
+        """Position de la zone d'identifiant `row`, ou None."""
+        return self._pos.get(int(row))
+
+    def overlapping(self, t0, t1):
+        """Positions des zones qui chevauchent [t0, t1] (triées par début)."""
+        lo = int(np.searchsorted(self.max_end, t0, side='left'))
+        hi = int(np.searchsorted(self.starts, t1, side='right'))
+        if hi <= lo: return np.zeros(0, dtype=np.int64)
+        return lo + np.flatnonzero(self.ends[lo:hi] >= t0)
+
+    def covering(self, t):
+        """Positions des zones qui contiennent t."""
+        return self.overlapping(t, t)
+
+    def at_centre(self, t, tol=1e-6):
+        """Position de la zone centrée sur t (marqueur cliqué), ou None."""
+        n = len(self._sorted_centres)
+        if not n: return None
+        i = int(np.searchsorted(self._sorted_centres, t))
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < n and abs(self._sorted_centres[j] - t) <= tol:
+                if best is None or abs(self._sorted_centres[j] - t) < abs(self._sorted_centres[best] - t):
+                    best = j
+        return int(self._by_centre[best]) if best is not None else None
+
+    def by_centre(self):
+        """Positions dans l'ordre des centres."""
+        return self._by_centre
+
+    def intervals(self, *codes):
+        """Plages [début, fin] couvertes par les zones des classes `codes` (toutes si aucune)."""
+        keep = np.isin(self.codes, codes) if codes else np.ones(len(self.codes), dtype=bool)
+        return IntervalSet(self.starts[keep], self.ends[keep])
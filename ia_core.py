@@ -1,6 +1,6 @@
 import sys
 import numpy as np
-import csv
+from core.onyx_reader import read_onyx_csv
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QFileDialog, QSlider, QMessageBox)
 from PyQt6.QtCore import QTimer, Qt, QThread, pyqtSignal, QUrl
@@ -215,53 +215,27 @@ class MainWindow(QMainWindow):
 
         self.onyx_markers = []
         try:
-            # Lecture robuste CSV standard
-            with open(file_name, 'r', encoding='latin1') as f:
-                # Detecter le separateur (Virgule ou Point-Virgule)
-                dialect = csv.Sniffer().sniff(f.read(1024))
-                f.seek(0)
-                reader = csv.reader(f, dialect)
-                
-                rows = list(reader)
-                if not rows: return
-
-                # Trouver les index
-                header = rows[0] # Ou ligne suivante si commentaire...
-                # Onyx met parfois des commentaires au debut. On cherche la ligne headers
-                start_row = 0
-                for i, row in enumerate(rows):
-                    if 'ts' in row or 'ts ' in row:
-                        header = [h.strip() for h in row]
-                        start_row = i + 1
-                        break
-                
-                try:
-                    idx_ts = header.index('ts')
-                    idx_note = header.index('note')
-                except ValueError:
-                    print("Colonnes 'ts' ou 'note' introuvables dans le CSV.")
-                    return
-
-                # Parser les donnees
-                start_ts_val = None
-                count = 0
-                
-                for row in rows[start_row:]:
-                    if len(row) <= idx_note: continue
-                    try:
-                        ts_val = float(row[idx_ts])
-                        note_val = row[idx_note].strip()
-                        
-                        if start_ts_val is None: start_ts_val = ts_val
-                        
-                        # Si note n'est pas vide et pas NaN
-                        if note_val and note_val.lower() != 'nan':
-                            rel_time = ts_val - start_ts_val
-                            self.onyx_markers.append(rel_time)
-                            count += 1
-                            print(f"Tag Onyx: {note_val} à {rel_time:.1f}s")
-                            
-                    except ValueError: continue
+            # Lecture via le lecteur ONYX commun (entête, séparateur et décimale détectés)
+            table = read_onyx_csv(file_name)
+            ts_col, note_col = table.ts_col, table.note_col
+            if ts_col is None or note_col is None:
+                print("Colonnes 'ts' ou 'note' introuvables dans le CSV.")
+                return
+
+            ts_vals = table.frame[ts_col].to_numpy(dtype=float)
+            notes = table.frame[note_col]
+            valid_ts = ts_vals[~np.isnan(ts_vals)]
+            if len(valid_ts) == 0: return
+            start_ts_val = valid_ts[0]
+
+            # Si note n'est pas vide et pas NaN
+            mask_notes = notes.notna() & (notes.astype(str).str.strip() != '') & ~np.isnan(ts_vals)
+            count = 0
+            for ts_val, note_val in zip(ts_vals[mask_notes.to_numpy()], notes[mask_notes]):
+                rel_time = ts_val - start_ts_val
+                self.onyx_markers.append(rel_time)
+                count += 1
+                print(f"Tag Onyx: {str(note_val).strip()} à {rel_time:.1f}s")
                     
             print(f"--- {count} Marqueurs importés ---")
             self.setFocus()
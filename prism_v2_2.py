@@ -1,6 +1,6 @@
 import sys
 import numpy as np
-import pandas as pd
+from core.onyx_reader import read_onyx_csv
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QFileDialog, QSlider)
 from PyQt6.QtCore import QTimer, Qt, QThread, pyqtSignal, QUrl
@@ -157,8 +157,7 @@ class MainWindow(QMainWindow):
         path, _ = QFileDialog.getOpenFileName(self, "CSV", "", "*.csv")
         if not path: return
         try:
-            df = pd.read_csv(path, sep=None, engine='python', comment='#', encoding='latin1')
-            df.columns = df.columns.str.strip()
+            df = read_onyx_csv(path).frame
             df_tags = df[df['note'].notna()]
             start_ts = df['ts'].iloc[0]
             self.onyx_markers = (df_tags['ts'] - start_ts).tolist()
@@ -0,0 +1,66 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.annotation_journal import AnnotationJournal, journal_path_for
+from core.onyx_reader import read_onyx_csv, write_onyx_csv
+
+def run_test():
+    print("--- TEST UNITAIRE : JOURNAL DES ÉDITIONS (REJEU = SAUVEGARDE) ---")
+
+    csv_name = "test_annotation_journal_PRISM.csv"
+    # Logger redémarré à la ligne 60 : ts non triés, les 40 premiers ts reviennent en double
+    ts = 1766178000.0 + np.concatenate([np.arange(60), np.arange(40)]).astype(float)
+    write_onyx_csv(csv_name, pd.DataFrame({"ts": ts, "dBA": 30.0, "note": np.nan}), "# ONYX\n")
+    journal = AnnotationJournal(journal_path_for(csv_name))
+    try:
+        # Éditions de la session : ajout, modification, suppression, lignes décalées depuis
+        # (retrouvées par ts exact, la plus proche de la ligne notée parmi les doublons)
+        edits = [(10, "Source {d=30.0}"), (20, "Résiduel (Calme) {d=60.0}"), (10, "Vent {d=30.0}"),
+                 (20, None), (30, "Trafic Routier {d=10.0}"), (75, "Chantier {d=5.0}")]
+        for row, note in edits:
+            journal.append(ts[row], note, row + 5 if row == 30 else row + 2 if row == 75 else row)
+        # Échantillon disparu du fichier : compté, pas appliqué
+        journal.append(ts.max() + 500.0, "Fantôme {d=1.0}", 3)
+        # Trois éditions écrites sur disque, deux encore en mémoire, dernière ligne tronquée (arrêt brutal)
+        journal.write(journal.buffer[:3])
+        del journal.buffer[:3]
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"op": "set", "ts": 17661')
+
+        # Sauvegarde de référence : mêmes éditions appliquées directement à la table
+        saved = read_onyx_csv(csv_name).frame
+        saved["note"] = saved["note"].astype(object)
+        for row, note in edits:
+            saved.iat[row, saved.columns.get_loc("note")] = np.nan if note is None else note
+
+        # Rechargement : CSV sur disque + rejeu du journal
+        replayed = read_onyx_csv(csv_name)
+        n = journal.replay(replayed)
+        # Compactage : la table rejouée est réécrite, le journal vidé ; relue, elle ne change pas
+        write_onyx_csv(csv_name, replayed.frame, replayed.metadata_header)
+        journal.buffer = []
+        journal.clear()
+        compacted = read_onyx_csv(csv_name).frame
+
+        same = lambda a, b: a["note"].fillna("").tolist() == b["note"].fillna("").tolist()
+        print(f"Éditions rejouées : {n}/{len(edits)} | introuvables : {len(journal.unmatched)} | Notes : {replayed.frame['note'].dropna().tolist()}")
+        ok = (
+            n == len(edits) and [e["note"] for e in journal.unmatched] == ["Fantôme {d=1.0}"]
+            and same(replayed.frame, saved) and same(compacted, saved)
+            and not journal.pending and len(journal) == 0
+        )
+        if ok:
+            print("\n[SUCCÈS] Le rejeu du journal redonne exactement la table sauvegardée.")
+        else:
+            print("\n[ÉCHEC] Rejeu du journal différent de la sauvegarde.")
+    finally:
+        journal.clear()
+        if os.path.exists(csv_name): os.remove(csv_name)
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,56 @@
+import sys
+import os
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.annotation_store import AnnotationStore, project_name
+
+def run_test():
+    print("--- TEST UNITAIRE : BASE D'ANNOTATIONS ---")
+
+    test_db_name = "test_annotation_store.db"
+    test_csv_name = "test_store_PRISM.csv"
+    with open(test_csv_name, "w", encoding="utf-8") as f:
+        f.write("ts;dBA;note\n")
+        f.write("1766178000.0;30,5;Source + (PAC) {d=60.0}\n")
+        f.write("1766178001.0;31,5;\n")
+        f.write("1766178002.0;32,5;Résiduel (Calme)\n")
+
+    try:
+        store = AnnotationStore(test_db_name, author="test")
+        imported = store.import_prism_csv(test_csv_name, "site_A")
+        # Éditions du Dashboard (format du journal) sur un autre site
+        store.apply("site_B", [
+            {"op": "set", "ts": 1766200000.0, "note": "Source + {d=10.0}"},
+            {"op": "set", "ts": 1766200100.0, "note": "Source - {d=10.0}"},
+            {"op": "del", "ts": 1766200100.0},
+        ])
+        sources = store.query(cls="Source +")
+        window = store.query(t0=1766178020.0, t1=1766178030.0)
+
+        # Dossiers de campagne homonymes sur deux sites : projets distincts
+        site_a, site_b = os.path.join("siteA", "2025-01"), os.path.join("siteB", "2025-01")
+        homonyms = project_name(site_a) != project_name(site_b) and project_name(site_a).startswith("2025-01")
+        stable = project_name(site_a) == project_name(os.path.abspath(site_a) + os.sep)
+
+        print(f"Importées : {imported} | Source + : {len(sources)} | Fenêtre : {len(window)}")
+        print(f"Projets homonymes : {project_name(site_a)} / {project_name(site_b)}")
+        ok = (
+            imported == 2
+            and sorted(sources["project"]) == ["site_A", "site_B"]
+            # La zone de 60 s centrée sur le 1er échantillon couvre la fenêtre ; le résiduel (120 s) aussi
+            and len(window) == 2
+            and store.projects() == ["site_A", "site_B"]
+            and homonyms and stable
+        )
+        if ok:
+            print("\n[SUCCÈS] Zones importées et interrogées sans charger les mesures.")
+        else:
+            print("\n[ÉCHEC] Contenu de la base incorrect.")
+    finally:
+        for name in (test_db_name, test_db_name + "-wal", test_db_name + "-shm", test_csv_name):
+            if os.path.exists(name): os.remove(name)
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,48 @@
+import sys
+import os
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.onyx_reader import read_onyx_csv
+from core.session import Session
+from core.audio_index import AudioIndex
+
+def run_test():
+    print("--- TEST UNITAIRE : INDEX AUDIO ---")
+
+    # Deux fichiers audio d'une heure, un trou entre 23h00 et 23h30
+    csv_content = """ts;h;dBA;Audio_Ref
+1766178000.0;22:00:00;27,9;A_22h00.flac
+1766181599.0;22:59:59;26,6;A_22h00.flac
+1766183400.0;23:30:00;30,1;A_23h30.flac
+1766187000.0;00:30:00;31,0;A_23h30.flac
+"""
+    test_csv_name = "test_audio_index.csv"
+    with open(test_csv_name, "w", encoding="utf-8") as f:
+        f.write(csv_content)
+
+    try:
+        session = Session.from_table(read_onyx_csv(test_csv_name))
+        index = AudioIndex.from_session(session, current_dir)
+        print(index.to_frame()[["name", "t_start", "t_end", "exists"]])
+
+        seg1, off1 = index.locate(1766178000.0 + 600)
+        seg2, off2 = index.locate(1766183400.0 + 60)
+        seg3, _ = index.locate(1766183000.0)    # dans le trou, plus proche du 2e fichier
+        ok = (
+            len(index) == 2
+            and seg1.name == "A_22h00.flac" and abs(off1 - 600) < 1e-6
+            and seg2.name == "A_23h30.flac" and abs(off2 - 60) < 1e-6
+            and seg3.name == "A_23h30.flac"
+            and not seg1.exists
+        )
+        if ok:
+            print("\n[SUCCÈS] Clic résolu en fichier + offset.")
+        else:
+            print("\n[ÉCHEC] Résolution audio incorrecte.")
+    finally:
+        if os.path.exists(test_csv_name): os.remove(test_csv_name)
+
+if __name__ == "__main__":
+    run_test()
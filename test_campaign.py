@@ -0,0 +1,66 @@
+import sys
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.campaign import Campaign
+from core.onyx_reader import read_onyx_csv, write_onyx_csv
+
+def run_test():
+    print("--- TEST UNITAIRE : CAMPAGNE (SEGMENTS À LA DEMANDE) ---")
+
+    folder = "test_campaign_data"
+    os.makedirs(folder, exist_ok=True)
+    t0 = 1766178000.0
+    try:
+        # Trois jours de mesures, un CSV par jour (écrits dans le désordre)
+        for day in (2, 0, 1):
+            ts = t0 + day * 86400 + np.arange(500, dtype=float)
+            frame = pd.DataFrame({"ts": ts, "dBA": 30.0 + day, "note": np.nan})
+            write_onyx_csv(os.path.join(folder, f"2025-12-{19 + day}_ONYX.csv"), frame, "# ONYX\n")
+
+        campaign = Campaign(folder)
+        seg0, seg1, seg2 = campaign.segments
+        for seg in campaign.segments:
+            campaign.attach(seg, read_onyx_csv(seg.path))
+        # Budget de deux segments et demi : la vue sur les jours 1 et 2 libère le jour 0
+        campaign.ram_budget = int(2.5 * seg0.nbytes)
+        view = (seg1.t_start, seg2.t_end)
+        evicted = campaign.evict_for_view(*view)
+
+        table, slices = campaign.combine([(s, s.table) for s in campaign.resident_segments()])
+        campaign.set_slices(slices)
+        # Zone posée sur la 11e ligne du jour 2 : journal du bon segment, puis compactage
+        row = slices[1][1] + 10
+        note_col = table.frame.columns.get_loc("note")
+        table.frame["note"] = table.frame["note"].astype(object)
+        table.frame.iat[row, note_col] = "Source {d=30.0}"
+        touched = campaign.record_note(row, float(table.frame["ts"].iloc[row]), "Source {d=30.0}")
+        saved = campaign.write_back(table)
+
+        reopened = Campaign(folder)
+        prism = read_onyx_csv(reopened.segments[2].path)
+        print(f"Segments : {len(campaign)} | Libérés : {[s.base_name for s in evicted]} | Sauvegardés : {[s.base_name for s in saved]}")
+        ok = (
+            [s.t_start for s in campaign.segments] == sorted(s.t_start for s in campaign.segments)
+            and evicted == [seg0] and not seg0.is_resident and seg1.is_resident and seg2.is_resident
+            and set(campaign.wanted_segments(*view)) == {seg1, seg2} and campaign.missing_segments(*view) == []
+            and touched is seg2 and saved == [seg2] and not seg2.dirty
+            and len(table) == 1000 and slices == [(seg1, 0, 500), (seg2, 500, 1000)]
+            and reopened.segments[2].path.endswith("_PRISM.csv") and reopened.segments[0].path.endswith("_ONYX.csv")
+            and prism.frame["note"].iloc[10] == "Source {d=30.0}" and prism.frame["note"].notna().sum() == 1
+            and not os.path.exists(seg2.journal.path)
+        )
+        if ok:
+            print("\n[SUCCÈS] Segments chargés, libérés hors vue et compactés dans leur copie _PRISM.")
+        else:
+            print("\n[ÉCHEC] Gestion des segments incorrecte.")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,53 @@
+import sys
+import os
+import numpy as np
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.energy import EnergyPrefix, ENERGY_BLOCK
+
+def run_test():
+    print("--- TEST UNITAIRE : LEQ PAR SOMMES CUMULÉES ---")
+
+    rng = np.random.default_rng(0)
+    levels = rng.uniform(25.0, 95.0, 3 * ENERGY_BLOCK + 100)
+    levels[10] = np.nan
+
+    prefix = EnergyPrefix.from_levels(levels)
+    # Construction en deux fois (mode suivi) : mêmes sommes
+    split = EnergyPrefix.from_levels(levels[:5000])
+    split.extend(levels[5000:])
+
+    def reference(i, j):
+        v = levels[i:j]
+        v = v[~np.isnan(v)]
+        return 10 * np.log10(np.mean(10 ** (v / 10)))
+
+    # Matrice de bandes (même validité) : un Leq par colonne, un seul compteur par ligne
+    matrix = EnergyPrefix.from_levels(np.c_[levels, levels - 10.0])
+
+    windows = [(0, 20), (ENERGY_BLOCK - 3, ENERGY_BLOCK + 3), (100, 3 * ENERGY_BLOCK + 50)]
+    errors = [abs(float(prefix.leq(i, j)) - reference(i, j)) for i, j in windows]
+    # Deux mesures à 30 dB et 40 dB : Leq énergétique 37.4 dB (moyenne arithmétique : 35)
+    pair = float(EnergyPrefix.from_levels([30.0, 40.0]).leq(0, 2))
+
+    matrix_errors = [np.abs(matrix.leq(i, j) - [reference(i, j), reference(i, j) - 10.0]).max() for i, j in windows]
+
+    print(f"Écart max au calcul direct : {max(errors + matrix_errors):.2e} dB | Leq(30, 40) (Attendu 37.4) : {pair:.1f}")
+    ok = (
+        # Cumuls locaux en float32 : écart négligeable devant la résolution affichée (0.1 dB)
+        max(errors + matrix_errors) < 1e-3
+        and matrix.counts.ndim == 1 and matrix.leq([0, 100], [20, 200]).shape == (2, 2)
+        and round(pair, 1) == 37.4
+        and int(prefix.count(0, 20)) == 19
+        and np.isnan(prefix.leq(10, 11))
+        and np.allclose(split.local, prefix.local) and (split.counts == prefix.counts).all()
+    )
+    if ok:
+        print("\n[SUCCÈS] Leq énergétique précis sur toute fenêtre, bandes comprises.")
+    else:
+        print("\n[ÉCHEC] Sommes d'énergie incorrectes.")
+
+if __name__ == "__main__":
+    run_test()
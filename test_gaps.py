@@ -0,0 +1,38 @@
+import sys
+import os
+import numpy as np
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.gaps import GapIndex, duplicate_rows
+
+def run_test():
+    print("--- TEST UNITAIRE : SÉQUENCES CONTIGUËS (TROUS, DOUBLONS, REDÉMARRAGES) ---")
+
+    # Pas de 1 s : trou de 10 s après la ligne 4, ts dupliqué en 7, retour en arrière en 9
+    ts = 1766178000.0 + np.array([0, 1, 2, 3, 4, 14, 15, 16, 16, 5, 6, 7], dtype=float)
+    gaps = GapIndex.from_ts(ts)
+    connect = gaps.connect()
+
+    # Mode suivi : mêmes séquences qu'un index construit d'un coup
+    split = GapIndex.from_ts(ts[:7])
+    split.extend(ts)
+
+    print(f"Séquences : {list(zip(gaps.starts.tolist(), gaps.stops.tolist()))} | Trous : {len(gaps.gaps(ts))}")
+    ok = (
+        list(gaps.starts) == [0, 5, 8, 9] and list(gaps.stops) == [5, 8, 9, 12]
+        and list(duplicate_rows(ts)) == [False] * 8 + [True] + [False] * 3
+        and connect.tolist() == [True] * 4 + [False] + [True, True, False, False, True, True, False]
+        and gaps.gaps(ts)[0] == (ts[4], ts[5])
+        # Points tracés (niveaux valides) : la coupure suit la ligne masquée
+        and gaps.connect(np.r_[[True] * 4, False, [True] * 7]).tolist()[:4] == [True, True, True, False]
+        and list(split.starts) == list(gaps.starts) and list(split.stops) == list(gaps.stops)
+    )
+    if ok:
+        print("\n[SUCCÈS] Coupures de tracé aux trous, doublons et redémarrages.")
+    else:
+        print("\n[ÉCHEC] Index des séquences incorrect.")
+
+if __name__ == "__main__":
+    run_test()
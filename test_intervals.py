@@ -0,0 +1,42 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.intervals import IntervalSet
+from core.pre_analyst import PreAnalyst
+
+def run_test():
+    print("--- TEST UNITAIRE : ALGÈBRE D'INTERVALLES ---")
+
+    a = IntervalSet([0, 5, 20], [10, 8, 30])
+    b = IntervalSet([9, 25], [21, 26])
+    inter = a.intersect(b)
+    diff = a.subtract(b)
+
+    # Indicateurs hors zone d'exclusion : le pic à 80 dB (t=1003) est écarté
+    df = pd.DataFrame({'ts': [1000, 1001, 1002, 1003, 1004], 'dBA': [30.0, 31.0, 32.0, 80.0, 33.0]})
+    res = PreAnalyst().analyze_dataset(df, exclude=IntervalSet([1002.5], [1003.5]))
+    res_in = PreAnalyst().analyze_dataset(df, include=IntervalSet([1001], [1002]))
+
+    print(f"A ∩ B : {list(zip(inter.starts.tolist(), inter.ends.tolist()))} | A - B : {list(zip(diff.starts.tolist(), diff.ends.tolist()))}")
+    print(f"Max hors exclusion (Attendu 33.0) : {res['max_dba']} | Moyenne dans [1001, 1002] (Attendu 31.5) : {res_in['avg_dba']}")
+    ok = (
+        # Chevauchements fusionnés à la construction
+        list(a.starts) == [0, 20] and list(a.ends) == [10, 30]
+        and list(inter.starts) == [9, 20, 25] and list(inter.ends) == [10, 21, 26]
+        and list(diff.starts) == [0, 21, 26] and list(diff.ends) == [9, 25, 30]
+        and a.union(b).total() == 30.0
+        and list(a.mask([-1, 0, 10, 15, np.nan])) == [False, True, True, False, False]
+        and res['max_dba'] == 33.0 and res_in['avg_dba'] == 31.5
+    )
+    if ok:
+        print("\n[SUCCÈS] Union, intersection, soustraction et masques conformes.")
+    else:
+        print("\n[ÉCHEC] Algèbre d'intervalles incorrecte.")
+
+if __name__ == "__main__":
+    run_test()
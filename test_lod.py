@@ -0,0 +1,42 @@
+import sys
+import os
+import numpy as np
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.lod import LodPyramid
+
+def run_test():
+    print("--- TEST UNITAIRE : PYRAMIDE MIN/MAX ---")
+
+    # 1 journée au pas de 1 s, un pic isolé à 95 dB et un trou d'une heure au milieu
+    ts = 1766178000.0 + np.arange(86400, dtype=float)
+    ts[43200:] += 3600
+    y = (35 + 5 * np.sin(np.arange(86400) / 600.0)).astype(np.float32)
+    y[12345] = 95.0
+
+    lod = LodPyramid.build(ts, y)
+    # Vue complète sur ~1000 pixels
+    k = lod.level_for((ts[-1] - ts[0]) / 1000.0)
+    x, yy, connect = lod.window(k, ts[0], ts[-1])
+    # Deux segments construits séparément puis concaténés : même tracé
+    split = LodPyramid.concat([LodPyramid.build(ts[:50000], y[:50000], 1.0), LodPyramid.build(ts[50000:], y[50000:], 1.0)])
+    x2, yy2, _ = split.window(k, ts[0], ts[-1])
+
+    print(f"Niveau {k} : {len(x)} points pour {len(ts)} mesures | Max (Attendu 95.0) : {yy.max()} | Coupures : {(~connect[:-1]).sum()}")
+    ok = (
+        len(x) <= 2 * 1000 + 2
+        and yy.max() == 95.0 and yy.min() == y.min()
+        # Le trou n'est pas relié par un trait
+        and (~connect[:-1]).sum() == 1
+        and lod.level_for(0.5) is None
+        and split.n_rows == len(ts) and yy2.max() == 95.0 and abs(len(x2) - len(x)) <= 2
+    )
+    if ok:
+        print("\n[SUCCÈS] Pics conservés et nombre de points borné par la largeur d'écran.")
+    else:
+        print("\n[ÉCHEC] Pyramide min/max incorrecte.")
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,72 @@
+import sys
+import os
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+import pandas as pd
+from core.onyx_reader import read_onyx_csv, iter_onyx_chunks
+from core.level_store import split_levels
+
+def run_test():
+    print("--- TEST UNITAIRE : LECTEUR ONYX ---")
+
+    # Entête de métadonnées '#', ts avec point, niveaux avec virgule, note vide au début
+    csv_content = """# ONYX v3 - Site test
+ts;h;dBA;50Hz;note;Audio_Ref
+1766178003.985;22:00:03;27,9;20,1;;2025-12-19_22h00_Audio.flac
+1766178006.995;22:00:06;26,6;21,0;Source + (PAC) {d=120.0};2025-12-19_22h00_Audio.flac
+"""
+    test_csv_name = "test_onyx_reader.csv"
+    with open(test_csv_name, "w", encoding="utf-8") as f:
+        f.write(csv_content)
+    # Jeton "OVL" (surcharge) hors de l'échantillon d'analyse : seule sa cellule devient NaN
+    ovl_csv_name = "test_onyx_reader_ovl.csv"
+    with open(ovl_csv_name, "w", encoding="utf-8") as f:
+        f.write("ts;dBA;note\n")
+        for i in range(40):
+            f.write(f"{1766178000 + i};{'OVL' if i == 30 else '30,5'};\n")
+    # Jeton "OVL" dans l'échantillon d'analyse (3e ligne) : la colonne reste un niveau
+    sampled_csv_name = "test_onyx_reader_ovl_sample.csv"
+    with open(sampled_csv_name, "w", encoding="utf-8") as f:
+        f.write("ts;dBA;63Hz;note\n")
+        for i in range(40):
+            f.write(f"{1766178000 + i};{'OVL' if i == 2 else '30,5'};21,5;\n")
+
+    try:
+        table = read_onyx_csv(test_csv_name)
+        df = table.frame
+        print(f"Colonnes : {list(df.columns)}")
+        print(f"Types : ts={df['ts'].dtype} dBA={df['dBA'].dtype}")
+        ovl = read_onyx_csv(ovl_csv_name).frame['dBA']
+        # Lecture par blocs : le bloc fautif est relu sans types, les autres ne sont pas perdus
+        chunked = pd.concat([t.frame for t, _ in iter_onyx_chunks(ovl_csv_name, chunksize=8)], ignore_index=True)
+        print(f"Fichier avec OVL : {ovl.notna().sum()}/40 valeurs lues (Attendu 39) | par blocs : {chunked['dBA'].notna().sum()}/{len(chunked)}")
+        sampled = read_onyx_csv(sampled_csv_name)
+        sampled_levels = split_levels(sampled)
+        sampled_dba = sampled_levels.values('dBA')
+        print(f"OVL échantillonné : type {sampled.layout['kinds']['dBA']} | {int((sampled_dba == 30.5).sum())}/40 valeurs (Attendu 39)"
+              f" | values() hors store : {int((sampled.values('dBA') == 30.5).sum())}")
+
+        ok = (
+            table.metadata_header.startswith("# ONYX")
+            and abs(df['ts'].iloc[0] - 1766178003.985) < 1e-6
+            and abs(df['dBA'].iloc[0] - 27.9) < 1e-9
+            and table.note_col == 'note' and table.level_col == 'dBA'
+            and df['note'].notna().sum() == 1
+            and ovl.notna().sum() == 39 and ovl.iloc[0] == 30.5 and ovl.isna().iloc[30]
+            and len(chunked) == 40 and chunked['dBA'].equals(ovl) and chunked['ts'].is_monotonic_increasing
+            and sampled.layout['kinds']['dBA'] != "text" and 'dBA' in sampled_levels.levels
+            and (sampled_dba == 30.5).sum() == 39 and pd.isna(sampled_dba[2])
+            and (sampled.values('dBA') == 30.5).sum() == 39
+        )
+        if ok:
+            print("\n[SUCCÈS] Entête, séparateurs et types détectés correctement.")
+        else:
+            print("\n[ÉCHEC] Lecture incorrecte.")
+    finally:
+        for name in (test_csv_name, ovl_csv_name, sampled_csv_name):
+            if os.path.exists(name): os.remove(name)
+
+if __name__ == "__main__":
+    run_test()
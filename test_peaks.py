@@ -0,0 +1,53 @@
+import sys
+import os
+import numpy as np
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.level_store import LevelStore, quantize, dequantize
+from core.peaks import PeakIndex, PEAK_BLOCK
+
+def run_test():
+    print("--- TEST UNITAIRE : CRÊTES GLISSANTES (INDEX DE MAXIMA) ---")
+
+    rng = np.random.default_rng(0)
+    n = 40 * PEAK_BLOCK + 17
+    values = rng.uniform(20.0, 90.0, (n, 2))
+    values[5:300, 1] = np.nan
+    store = LevelStore(["40Hz", "50Hz"], quantize(values))
+    index = PeakIndex(store, ["40Hz", "50Hz", "63Hz"])
+    # Construction en deux fois (mode suivi) : mêmes maxima
+    split = PeakIndex(store, ["40Hz", "50Hz", "63Hz"], n_rows=1000)
+    split.extend()
+    # Suivi ligne à ligne ou par petits blocs : tables identiques à une construction complète
+    follow = PeakIndex(store, ["40Hz", "50Hz", "63Hz"], n_rows=1)
+    while len(follow) < n:
+        follow.extend(min(n, len(follow) + int(rng.integers(1, 3 * PEAK_BLOCK))))
+    same_tables = len(follow.table) == len(index.table) and all(np.array_equal(a, b) for a, b in zip(follow.table, index.table))
+
+    reference = np.c_[dequantize(quantize(values)), np.full(n, np.nan)]
+    windows = [(0, 1), (3, 60), (PEAK_BLOCK - 1, 3 * PEAK_BLOCK + 2), (10, n), (n - 5, n + 50)]
+    errors = 0
+    with np.errstate(all='ignore'):
+        for i, j in windows:
+            # Calcul direct (NaN : colonne sans aucune valeur dans la fenêtre)
+            expected = np.array([np.nanmax(c) if (~np.isnan(c)).any() else np.nan for c in reference[i:j].T])
+            errors += not np.array_equal(index.max(i, j), expected.astype(np.float32), equal_nan=True)
+
+    print(f"Fenêtres vérifiées : {len(windows)} | Erreurs : {errors} | Crête [10, 300[ de la bande absente : {index.max(10, 300)[1]}")
+    print(f"Tables du suivi incrémental identiques : {same_tables}")
+    ok = (
+        errors == 0
+        and np.isnan(index.max(10, 300)[1])
+        and np.isnan(index.max(7, 7)).all()
+        and len(split) == n and same_tables
+        and all((split.max_codes(i, j) == index.max_codes(i, j)).all() for i, j in windows)
+    )
+    if ok:
+        print("\n[SUCCÈS] Crêtes exactes sur toute fenêtre, mesures absentes ignorées.")
+    else:
+        print("\n[ÉCHEC] Index de crêtes incorrect.")
+
+if __name__ == "__main__":
+    run_test()
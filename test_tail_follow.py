@@ -0,0 +1,55 @@
+import sys
+import os
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.tail_follow import TailFollower
+
+def run_test():
+    print("--- TEST UNITAIRE : SUIVI FIN DE FICHIER ---")
+
+    header = "ts;h;dBA;Audio_Ref\n"
+    rows = [f"{1766178000 + i}.0;22:00:00;{30 + i % 5},5;A.flac\n" for i in range(10)]
+    test_csv_name = "test_tail_follow.csv"
+    with open(test_csv_name, "w", encoding="utf-8") as f:
+        f.write(header + "".join(rows[:6]))
+
+    try:
+        # Reprise après la 6e ligne déjà chargée
+        follower = TailFollower(test_csv_name, last_ts=1766178005.0)
+        first = follower.poll()
+
+        # Le logger écrit 3 lignes dont la dernière incomplète
+        with open(test_csv_name, "a", encoding="utf-8") as f:
+            f.write(rows[6] + rows[7] + rows[8][:8])
+        second = follower.poll()
+        with open(test_csv_name, "a", encoding="utf-8") as f:
+            f.write(rows[8][8:] + rows[9])
+        third = follower.poll()
+
+        # Logger redémarré avec une heure en retard : lignes gardées, saut signalé
+        restart = [f"{1766177000 + i}.0;21:43:20;40,0;B.flac\n" for i in range(3)]
+        with open(test_csv_name, "a", encoding="utf-8") as f:
+            f.write("".join(restart))
+        fourth = follower.poll()
+
+        print(f"Blocs : {first}, {len(second)} lignes, {len(third)} lignes, {len(fourth)} lignes après redémarrage")
+        print(f"Retours en arrière : {follower.backward_jumps}")
+        ok = (
+            first is None
+            and len(second) == 2 and len(third) == 2
+            and third.levels.column('dBA')[0] == 33.5
+            and len(fourth) == 3
+            and follower.backward_jumps == [(1766178009.0, 1766177000.0)]
+            and follower.last_ts == 1766178009.0
+        )
+        if ok:
+            print("\n[SUCCÈS] Seules les lignes complètes ajoutées sont lues, y compris après un recul de l'heure.")
+        else:
+            print("\n[ÉCHEC] Lecture incrémentale incorrecte.")
+    finally:
+        if os.path.exists(test_csv_name): os.remove(test_csv_name)
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,46 @@
+import sys
+import os
+import numpy as np
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.time_grid import TimeGrid
+
+def run_test():
+    print("--- TEST UNITAIRE : GRILLE TEMPORELLE ---")
+
+    rng = np.random.default_rng(0)
+    # Pas de 1 s légèrement bruité, un trou de 20 s et des mesures supplémentaires dans certains créneaux
+    base = 1766178000.0 + np.r_[np.arange(300), np.arange(320, 600)] + rng.uniform(-0.05, 0.05, 580)
+    extra = base[rng.choice(580, 40, replace=False)] + rng.uniform(0.2, 0.4, 40)
+    ts = np.sort(np.r_[base, extra])
+    grid = TimeGrid.from_ts(ts)
+
+    queries = rng.uniform(ts[0] - 5, ts[-1] + 5, 5000)
+    sorted_ok = all(grid.searchsorted(t) == np.searchsorted(ts, t) for t in queries)
+    nearest_errors = 0
+    for t in queries:
+        i = np.searchsorted(ts, t)
+        best = min(abs(ts[c] - t) for c in (i - 1, i) if 0 <= c < len(ts))
+        nearest_errors += abs(ts[grid.nearest_index(t)] - t) > best
+
+    # Mode suivi : grille prolongée identique à une grille construite d'un coup
+    split = TimeGrid.from_ts(ts[:400])
+    split.extend(ts)
+
+    print(f"Grille régulière : {grid.regular} (pas {grid.step:.3f} s, créneaux vides {grid.n_holes}) | Erreurs du plus proche : {nearest_errors}")
+    ok = (
+        grid.regular and abs(grid.step - 1.0) < 0.01 and grid.n_holes >= 19
+        and sorted_ok and nearest_errors == 0
+        and split.regular and (split.prev_row == grid.prev_row).all()
+        # Série qui recule (redémarrage du logger) : recherche binaire, sans grille
+        and not TimeGrid.from_ts(np.r_[ts[:10], ts[:10]]).regular
+    )
+    if ok:
+        print("\n[SUCCÈS] Conversion ts -> index exacte, trous et créneaux partagés compris.")
+    else:
+        print("\n[ÉCHEC] Grille temporelle incorrecte.")
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,65 @@
+import sys
+import os
+import numpy as np
+
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+
+from core.zones import ZoneIndex, ZoneSpec
+from core.level_store import LevelStore
+from core.session import Session
+
+def run_test():
+    print("--- TEST UNITAIRE : ZONES TYPÉES ---")
+
+    notes = {
+        10: "Source + (PAC) {d=60.0}",
+        40: "Résiduel (Calme) {d=20}",
+        70: "Commentaire libre",
+    }
+    ts = 1766178000.0 + np.arange(100, dtype=float)
+    specs = {r: ZoneSpec.from_note(n) for r, n in notes.items()}
+    zones = ZoneIndex.from_specs(specs, ts)
+
+    covering = sorted(int(zones.rows[k]) for k in zones.covering(ts[35]))
+    visible = sorted(int(zones.rows[k]) for k in zones.overlapping(ts[55], ts[60]))
+    k = zones.at_centre(ts[40])
+
+    # Décalages groupés : aucune zone écrasée ni perdue
+    def session():
+        n = 1000
+        levels = LevelStore(["dBA"], np.full((n, 1), 3000, dtype=np.int16))
+        return Session(1766178000.0 + np.arange(n, dtype=float), "dBA", levels, [], np.full(n, -1, dtype=np.int32), [],
+                       {100: "Source {d=10.0}", 130: "Résiduel (Calme) {d=10.0}", 500: "Source {d=10.0}"})
+    s1 = session()
+    s1.edit_zones([100], shift=30.0)
+    s2 = session()
+    s2.edit_zones([130, 500], shift=5000.0)
+    s3 = session()
+    s3.edit_zones([100, 130], shift=30.0)
+    s4 = session()
+    s4.edit_zones([100, 130], shift=870.0)
+
+    print(f"Couvrant t=35 : {covering} | Visibles [55, 60] : {visible} | Centre 40 : {zones.labels[k]}")
+    ok = (
+        # La zone 70 sans durée prend 120 s par défaut
+        covering == [10, 40, 70]
+        and visible == [70]
+        and zones.labels[k] == "Résiduel (Calme)" and zones.codes[k] == 3
+        and specs[70].code == -1 and specs[70].duration == 120.0
+        # Écriture rétrocompatible : la note relue donne la même zone
+        and ZoneSpec.from_note(specs[40].to_note()).duration == 20.0
+        and specs[10].to_note() == "Source + (PAC) {d=60.0}"
+        and sorted(s1.notes) == [100, 130, 500] and s1.notes[130].startswith("Résiduel") and len(s1.skipped_zones) == 1
+        and sorted(s2.notes) == [100, 130, 500] and len(s2.skipped_zones) == 2
+        and sorted(s3.notes) == [130, 160, 500] and s3.notes[160].startswith("Résiduel")
+        # 130 + 870 s sort de la plage : 130 reste en place, 100 est décalée
+        and sorted(s4.notes) == [130, 500, 970] and s4.skipped_zones == [(130, "hors de la plage chargée")]
+    )
+    if ok:
+        print("\n[SUCCÈS] Zones indexées et réécrites au format {d=...}.")
+    else:
+        print("\n[ÉCHEC] Index ou format des zones incorrect.")
+
+if __name__ == "__main__":
+    run_test()
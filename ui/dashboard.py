@@ -1,16 +1,30 @@
 import os
-import shutil
-import pandas as pd
+from datetime import datetime
 import numpy as np
-import re
 import pyqtgraph as pg
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, 
                              QLabel, QMessageBox, QTextEdit, QInputDialog, QComboBox, QDialog, 
-                             QMenu, QAction, QSplitter, QCheckBox)
+                             QMenu, QAction, QSplitter, QCheckBox, QProgressBar)
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 from PyQt5.QtCore import QUrl, Qt, QTimer
-from PyQt5.QtGui import QPainterPath, QColor, QCursor, QFont
+from PyQt5.QtGui import QPainterPath, QCursor
 from utils.logger import log
+from core.campaign import Campaign
+from core.tail_follow import TailFollower
+from core.annotation_store import AnnotationStore, project_name
+from core.zones import EXCLUSION_CODE, RESIDUAL_CODE, class_code, format_zone_note, zone_color
+from ui.load_worker import ProjectLoadWorker
+from ui.save_worker import ProjectSaveWorker
+from ui.marker_layer import MarkerLayer
+from ui.frame_scheduler import FrameScheduler
+from utils.perf import LatencyProbe
+
+# Délai de regroupement des éditions avant sauvegarde (ms)
+SAVE_DEBOUNCE_MS = 1500
+# Compactage des journaux dans les CSV _PRISM toutes les N éditions enregistrées
+COMPACT_EVERY_EDITS = 200
+# Marge tracée de part et d'autre de la vue (en largeurs de vue) : un déplacement court ne retrace pas la courbe
+CURVE_MARGIN = 1.0
 
 def h_bar_path():
     p = QPainterPath()
@@ -34,23 +48,6 @@ class LearningDialog(QDialog):
         self.layout.addWidget(self.btn_ok)
     def get_label(self): return self.combo.currentText()
 
-# --- Etiquette Graphique ---
-class ClickableTextItem(pg.TextItem):
-    def __init__(self, text, ts_val, parent_dashboard, color_hex, **kwargs):
-        super().__init__(text=text, **kwargs)
-        self.ts_val = ts_val
-        self.dash = parent_dashboard
-        self.setColor(QColor(255, 255, 255)) 
-        self.setFont(QFont("Arial", 11, QFont.Bold))
-        self.fill = pg.mkBrush(color_hex)
-        self.setAcceptedMouseButtons(Qt.LeftButton)
-        # Z=20 : Toujours tout devant pour être lisible
-        self.setZValue(20) 
-    
-    def mouseClickEvent(self, ev):
-        if ev.button() == Qt.LeftButton:
-            self.dash.open_marker_menu(self.ts_val, ev.screenPos())
-
 # --- DASHBOARD V10.2 (Gestion des Calques Graphiques) ---
 class Dashboard(QWidget):
     def __init__(self, ia_interface=None):
@@ -68,6 +65,36 @@ class Dashboard(QWidget):
         self.btn_load.clicked.connect(self.select_folder)
         self.toolbar_layout.addWidget(self.btn_load)
 
+        self.btn_cancel_load = QPushButton("⛔ ANNULER")
+        self.btn_cancel_load.setStyleSheet(btn_style + "background-color: #8B0000;")
+        self.btn_cancel_load.clicked.connect(self.cancel_load)
+        self.btn_cancel_load.setEnabled(False)
+        self.toolbar_layout.addWidget(self.btn_cancel_load)
+
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 100)
+        self.load_progress.setMaximumWidth(200)
+        self.load_progress.setVisible(False)
+        self.toolbar_layout.addWidget(self.load_progress)
+
+        self.btn_follow = QPushButton("📡 SUIVI")
+        self.btn_follow.setStyleSheet(btn_style + "background-color: #1E5631;")
+        self.btn_follow.setCheckable(True)
+        self.btn_follow.toggled.connect(self.toggle_follow)
+        self.toolbar_layout.addWidget(self.btn_follow)
+
+        # Sélection de zones (bande déplaçable sur le graphe) et actions groupées
+        self.btn_select = QPushButton("▭ SÉLECTION")
+        self.btn_select.setStyleSheet(btn_style + "background-color: #1F4E79;")
+        self.btn_select.setCheckable(True)
+        self.btn_select.toggled.connect(self.toggle_selection)
+        self.toolbar_layout.addWidget(self.btn_select)
+
+        self.btn_bulk = QPushButton("⚙ ZONES")
+        self.btn_bulk.setStyleSheet(btn_style + "background-color: #444;")
+        self.btn_bulk.clicked.connect(self.open_bulk_menu)
+        self.toolbar_layout.addWidget(self.btn_bulk)
+
         self.toolbar_layout.addStretch()
         self.main_layout.addLayout(self.toolbar_layout)
 
@@ -91,11 +118,15 @@ class Dashboard(QWidget):
         for f in self.filters_config:
             cb = QCheckBox(f["label"])
             cb.setStyleSheet(f"color: {f['color']}; font-weight: bold; font-size: 10px;")
-            cb.stateChanged.connect(self.update_main_curves)
+            cb.stateChanged.connect(lambda state, key=f["col_match"]: self.toggle_overlay(key, state == Qt.Checked))
             self.filter_layout.addWidget(cb)
             self.checkboxes[f["col_match"]] = cb
         
         self.filter_layout.addStretch()
+        # Leq énergétique de la vue et de la sélection (mis à jour en continu)
+        self.lbl_leq = QLabel("")
+        self.lbl_leq.setStyleSheet("color: #00ff00; font-size: 11px; font-weight: bold;")
+        self.filter_layout.addWidget(self.lbl_leq)
         self.main_layout.addLayout(self.filter_layout)
 
         # 3. VISUALISATION
@@ -114,6 +145,8 @@ class Dashboard(QWidget):
         
         self.graph_time.scene().sigMouseMoved.connect(self.on_mouse_move)
         self.graph_time.scene().sigMouseClicked.connect(self.on_graph_click)
+        # Calque des zones : items conservés par identifiant, mis à jour par différence
+        self.marker_layer = MarkerLayer(self.graph_time, self)
         self.splitter.addWidget(self.graph_time)
 
         # B. Graphique Spectre
@@ -139,13 +172,17 @@ class Dashboard(QWidget):
         self.player.positionChanged.connect(self.on_audio_tick)
         
         self.current_folder = None
-        self.current_csv_path = None
+        self.campaign = None
         self.df_global = None
         self.ts_data = None
-        self.freq_data_matrix = None
+        self.project_table = None
+        self.session = None
+        self.audio_index = None
+        self.audio_path = None
+        self.band_cols = []
+        self.overlay_cols = {}
         self.metadata_header = "" 
         self.onyx_markers = [] 
-        self.marker_items = [] 
         self.last_hover_ts = 0
         self.min_val_display = 20
         self.max_val_display = 100 
@@ -153,6 +190,63 @@ class Dashboard(QWidget):
         self.temp_line_item = None
         self.rta_freqs = ["20Hz", "25Hz", "31.5Hz", "40Hz", "50Hz", "63Hz", "80Hz", "100Hz", "125Hz", "160Hz", "200Hz", "250Hz", "315Hz", "400Hz"]
         self.bg_item = None 
+        self.load_worker = None
+        self.preview_curve = None
+        self.preview_ts = []
+        self.preview_y = []
+        self.autorange_pending = False
+        self.perf = LatencyProbe()
+        self.main_curve = None
+        self.overlay_curves = {}
+        # Abscisses et coupures des courbes (lignes valides), calculées une fois par session
+        self.curve_x = None
+        self.curve_y = None
+        self.curve_reach = None
+        self.curve_connect = None
+        # Plage tracée de la courbe globale : (niveau de la pyramide ou None = brut, début, fin)
+        self.curve_window = None
+        self.selection_region = None
+        self.selected_rows = []
+        # Plages Résiduel du dernier calcul des résiduels (recalcul seulement si elles changent)
+        self.residual_ranges = None
+
+        # Mode suivi : le dernier fichier de la campagne est relu en fin de fichier
+        self.follower = None
+        self.follow_segment = None
+        self.follow_pending = False
+        self.follow_timer = QTimer(self)
+        self.follow_timer.setInterval(2000)
+        self.follow_timer.timeout.connect(self.on_follow_tick)
+
+        # Sauvegarde différée : les éditions rapprochées sont regroupées puis écrites dans un thread
+        self.save_worker = None
+        # Base SQLite des zones partagée entre projets (None si indisponible)
+        self.annotation_store = AnnotationStore.open_default()
+        self.compact_requested = False
+        self.edits_since_compaction = 0
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DEBOUNCE_MS)
+        self.save_timer.timeout.connect(self.start_background_save)
+
+        # Zones matérialisées pour la vue courante : mise à jour regroupée pendant un zoom / déplacement
+        self.marker_timer = QTimer(self)
+        self.marker_timer.setSingleShot(True)
+        self.marker_timer.setInterval(30)
+        self.marker_timer.timeout.connect(self.refresh_markers)
+        self.marker_timer.timeout.connect(self.update_leq_readout)
+
+        # Survol, tête de lecture et vue : état regroupé, appliqué au plus une fois par image
+        self.frame_scheduler = FrameScheduler(self, self.apply_frame)
+
+        # Chargement des segments de campagne quand la vue se stabilise
+        self.view_timer = QTimer(self)
+        self.view_timer.setSingleShot(True)
+        self.view_timer.setInterval(300)
+        self.view_timer.timeout.connect(self.ensure_view_segments)
+        self.graph_time.sigXRangeChanged.connect(self.on_view_range_changed)
+        # Largeur en pixels modifiée : le niveau de détail de la courbe est revu
+        self.graph_time.getPlotItem().vb.sigResized.connect(lambda *args: self.refresh_main_curve())
         
         self.init_spectrum_graph()
 
@@ -160,6 +254,10 @@ class Dashboard(QWidget):
         self.log_console.append(f"> {msg}")
         log.info(msg)
 
+    def closeEvent(self, event):
+        self.save_changes_to_disk()
+        super().closeEvent(event)
+
     # --- CLAVIER ---
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Space:
@@ -174,6 +272,13 @@ class Dashboard(QWidget):
             pos = self.player.position() - 60000
             if pos < 0: pos = 0
             self.player.setPosition(pos)
+        elif event.key() == Qt.Key_S and event.modifiers() & Qt.ControlModifier:
+            self.request_save(compact=True, now=True)
+        elif event.key() == Qt.Key_Delete and self.selected_rows:
+            self.apply_zone_edit(self.selected_rows, delete=True)
+        elif event.key() == Qt.Key_P:
+            # Latences mesurées des interactions
+            for line in self.perf.summary() + self.frame_scheduler.summary(): self.log_message(f"⏱ {line}")
         else:
             super().keyPressEvent(event)
 
@@ -183,168 +288,505 @@ class Dashboard(QWidget):
         if folder: self.process_folder(folder)
 
     def process_folder(self, folder_path):
+        # Le dossier est traité comme une campagne : un segment par CSV, chargés à la demande
+        campaign = Campaign(folder_path)
+        if not len(campaign): return
+        self.cancel_load()
+        self.btn_follow.setChecked(False)
+        # Éditions de l'ancien dossier écrites avant de le quitter
+        self.save_changes_to_disk()
         self.current_folder = folder_path
-        all_csvs = [f for f in os.listdir(folder_path) if f.lower().endswith('.csv')]
-        data_csvs = [f for f in all_csvs if "knowledge" not in f.lower()]
-        if not data_csvs: return
+        self.campaign = campaign
 
-        prism_file = next((f for f in data_csvs if "_PRISM" in f), None)
-        original_file = next((f for f in data_csvs if "_PRISM" not in f), None)
-        
-        target_file = None
-        if prism_file:
-            self.log_message(f"Reprise : {prism_file}")
-            target_file = prism_file
-        elif original_file:
-            self.log_message(f"Nouveau projet depuis : {original_file}")
-            src = os.path.join(folder_path, original_file)
-            base_name = original_file.replace(".csv", "")
-            new_name = f"{base_name}_PRISM.csv"
-            dst = os.path.join(folder_path, new_name)
-            try:
-                shutil.copy2(src, dst)
-                target_file = new_name
-            except Exception as e:
-                self.log_message(f"Err copie : {e}")
-                target_file = original_file 
-        
-        if target_file:
-            self.current_csv_path = os.path.join(folder_path, target_file)
-            self._internal_load()
+        if len(campaign) == 1:
+            seg = campaign.segments[0]
+            if os.path.exists(seg.prism_path):
+                self.log_message(f"Reprise : {os.path.basename(seg.prism_path)}")
+            else:
+                self.log_message(f"Nouveau projet depuis : {os.path.basename(seg.path)}")
+        else:
+            d0 = datetime.fromtimestamp(campaign.t_start).strftime("%d/%m/%Y")
+            d1 = datetime.fromtimestamp(campaign.t_end).strftime("%d/%m/%Y")
+            self.log_message(f"Campagne : {len(campaign)} fichiers du {d0} au {d1}")
 
-    def _internal_load(self):
-        try:
-            header_row = 0
-            self.metadata_header = ""
-            with open(self.current_csv_path, 'r', encoding='utf-8-sig') as f:
-                first_line = f.readline()
-                if first_line.startswith('#'):
-                    self.metadata_header = first_line
-                    header_row = 1 
-                else:
-                    header_row = 0
-
-            self.df_global = pd.read_csv(self.current_csv_path, sep=';', decimal=',', header=header_row, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
-            self.df_global.columns = self.df_global.columns.str.strip()
-            
-            cols = self.df_global.columns
-            ts_col = next((c for c in cols if 'ts' == c.lower()), None)
-            
+        first = campaign.segments[0]
+        self._internal_load([first], reset=True)
+
+    def _internal_load(self, segments, reset=False):
+        # Chargement dans un thread : l'interface reste fluide et l'aperçu s'affiche au fil de l'eau
+        self.cancel_load()
+        if self.project_table is not None and not reset:
+            # Notes de la session et lignes du mode suivi recopiées dans les segments avant l'instantané du worker
+            self.session.flush_notes(self.project_table.frame, self.project_table.note_col or 'note')
+            self.campaign.refresh_tables(self.project_table)
+        if reset:
+            self.df_global = None
+            self.ts_data = None
+            self.project_table = None
+            self.session = None
+            self.lbl_leq.setText("")
+            self.band_cols = []
             self.onyx_markers = []
-            note_col = next((c for c in cols if 'note' in c.lower()), None)
-            if ts_col and note_col:
-                mask_notes = self.df_global[note_col].notna()
-                if mask_notes.any():
-                    markers_df = self.df_global[mask_notes]
-                    t_notes = markers_df[ts_col].tolist()
-                    l_notes = markers_df[note_col].astype(str).tolist()
-                    self.onyx_markers = list(zip(t_notes, l_notes))
-                    # Nettoyage des doublons exacts
-                    self.onyx_markers = list(set(self.onyx_markers))
-                    self.onyx_markers.sort(key=lambda x: x[0])
-                    self.log_message(f"Zones chargées : {len(self.onyx_markers)}")
-
-            if ts_col:
-                self.ts_data = pd.to_numeric(self.df_global[ts_col], errors='coerce').to_numpy()
-                freq_list = []
-                for f_name in self.rta_freqs:
-                    col = next((c for c in cols if f_name.lower() in c.lower()), None)
-                    if col:
-                        freq_list.append(pd.to_numeric(self.df_global[col], errors='coerce').to_numpy())
-                    else:
-                        freq_list.append(np.zeros(len(self.df_global)))
-                self.freq_data_matrix = np.column_stack(freq_list)
+            self.selected_rows = []
+            self.residual_ranges = None
+            self.frame_scheduler.clear()
+            self.graph_time.clear()
+            self.marker_layer.detach()
+            # Courbes retirées avec la scène : recréées pour la nouvelle session
+            self.main_curve = None
+            self.overlay_curves = {}
+            self.curve_x = None
+            self.graph_time.addItem(self.playhead)
+            if self.selection_region is not None: self.graph_time.addItem(self.selection_region)
+            self.preview_ts, self.preview_y = [], []
+            self.preview_curve = self.graph_time.plot([], [], pen=pg.mkPen('#007700', width=1))
+            self.autorange_pending = True
 
+        self.load_worker = ProjectLoadWorker(self.campaign, segments, store=self.annotation_store, parent=self)
+        self.load_worker.progress.connect(self.load_progress.setValue)
+        self.load_worker.preview.connect(self.on_load_preview)
+        self.load_worker.loaded.connect(self.on_load_finished)
+        self.load_worker.failed.connect(self.on_load_failed)
+        self.load_worker.finished.connect(self._on_load_thread_done)
+        self.load_progress.setValue(0)
+        self.load_progress.setVisible(True)
+        self.btn_cancel_load.setEnabled(True)
+        self.load_worker.start()
+
+    def cancel_load(self):
+        if self.load_worker is None: return
+        worker = self.load_worker
+        self.load_worker = None
+        for sig in (worker.progress, worker.preview, worker.loaded, worker.failed, worker.finished):
+            try: sig.disconnect()
+            except TypeError: pass
+        worker.requestInterruption()
+        worker.finished.connect(worker.deleteLater)
+        self.btn_cancel_load.setEnabled(False)
+        self.load_progress.setVisible(False)
+        if self.sender() is self.btn_cancel_load:
+            self.log_message("Chargement annulé.")
+
+    def on_load_preview(self, ts, y):
+        # Aperçu grossier : on complète la courbe au fur et à mesure des blocs lus
+        if self.preview_curve is None or len(ts) == 0: return
+        self.preview_ts.append(ts)
+        self.preview_y.append(y)
+        self.preview_curve.setData(np.concatenate(self.preview_ts), np.concatenate(self.preview_y))
+        if len(self.preview_ts) == 1:
+            self.graph_time.getPlotItem().enableAutoRange()
+
+    def on_load_finished(self, result):
+        try:
+            if result["generation"] != self.campaign.generation:
+                # Zones modifiées pendant le chargement : on recommence avec l'état à jour
+                self.view_timer.start()
+                return
+            for seg, table in result["new_tables"]:
+                self.campaign.attach(seg, table)
+            self.campaign.set_slices(result["slices"])
+
+            table, session = result["table"], result["session"]
+            self.project_table = table
+            self.session = session
+            self.audio_index = result["audio"]
+            self.df_global = table.frame
+            self.metadata_header = table.metadata_header
+            if self.load_worker is not None and self.load_worker.from_cache:
+                self.log_message("Cache binaire utilisé.")
+            if self.load_worker is not None and self.load_worker.store_error:
+                self.log_message(f"Base d'annotations : {self.load_worker.store_error}")
+            if self.load_worker is not None and self.load_worker.replayed:
+                self.log_message(f"Éditions rejouées depuis le journal : {self.load_worker.replayed}")
+            if self.load_worker is not None and self.load_worker.unmatched:
+                self.log_message(f"Éditions du journal ignorées (échantillon introuvable) : {self.load_worker.unmatched}")
+
+            self.onyx_markers = session.markers()
+            if self.onyx_markers:
+                self.log_message(f"Zones chargées : {len(self.onyx_markers)}")
+            self.ts_data = session.ts
+            if len(session.gaps) > 1:
+                self.log_message(f"Discontinuités (trous / redémarrages) : {len(session.gaps) - 1}")
+            # Correspondances colonnes résolues une seule fois par session
+            self.band_cols = [table.band_col(f) for f in self.rta_freqs]
+            self.overlay_cols = {cfg["col_match"]: next((c for c in session.band_labels if cfg["col_match"] in c.lower()), None)
+                                 for cfg in self.filters_config}
+            if len(self.campaign) > 1:
+                self.log_message(f"Segments en mémoire : {len(result['slices'])}/{len(self.campaign)} ({self.campaign.resident_bytes / 1e6:.0f} Mo)")
+
+            # La courbe d'aperçu est retirée avec les autres courbes
+            self.preview_ts, self.preview_y = [], []
             self.update_main_curves()
+            self.refresh_residuals()
+            if self.follow_pending:
+                self.follow_pending = False
+                self.start_follow()
         except Exception as e: self.log_message(f"Err Load: {e}")
 
+    def on_load_failed(self, msg):
+        self.log_message(f"Err Load: {msg}")
+
+    def _on_load_thread_done(self):
+        worker = self.sender()
+        if worker is self.load_worker:
+            self.load_worker = None
+            self.btn_cancel_load.setEnabled(False)
+            self.load_progress.setVisible(False)
+            # La vue a pu bouger pendant le chargement
+            self.view_timer.start()
+        if worker is not None: worker.deleteLater()
+
+    # --- CAMPAGNE : SEGMENTS À LA DEMANDE ---
+    def on_view_range_changed(self, *args):
+        self.frame_scheduler.post("view", tuple(self.graph_time.viewRange()[0]))
+        if self.session is not None and not self.marker_timer.isActive():
+            self.marker_timer.start()
+        if self.campaign is not None and len(self.campaign) > 1:
+            self.view_timer.start()
+
+    def ensure_view_segments(self):
+        if self.campaign is None or len(self.campaign) < 2 or self.load_worker is not None: return
+        # Un compactage peut réécrire un segment libéré : on attend sa fin (la vue est revérifiée)
+        if self.save_worker is not None and self.save_worker.job.compact: return
+        if self.df_global is None: return
+        t0, t1 = self.graph_time.viewRange()[0]
+        missing = self.campaign.missing_segments(t0, t1)
+        if not missing: return
+        evicted = self.campaign.evict_for_view(t0, t1, incoming=missing)
+        if evicted:
+            self.log_message(f"Segments libérés : {len(evicted)}")
+        self._internal_load(missing)
+
+    def set_note(self, idx, note):
+        """Écrit une note dans la session et l'ajoute au journal de son segment ; l'écriture disque est différée."""
+        self.session.set_note(idx, note)
+        self.campaign.record_note(idx, float(self.session.ts[idx]), note)
+        self.request_save()
+
+    # --- SAUVEGARDE ---
+    def request_save(self, compact=False, now=False):
+        """Programme une sauvegarde ; chaque nouvelle édition repousse l'échéance (regroupement)."""
+        self.compact_requested = self.compact_requested or compact
+        if now:
+            self.save_timer.stop()
+            self.start_background_save()
+        else:
+            self.save_timer.start()
+
+    def start_background_save(self):
+        if self.campaign is None or self.project_table is None: return
+        compact = self.compact_requested or self.edits_since_compaction >= COMPACT_EVERY_EDITS
+        # Une seule sauvegarde à la fois ; un compactage attend aussi la fin d'un chargement
+        if self.save_worker is not None or (compact and self.load_worker is not None):
+            self.save_timer.start()
+            return
+        try:
+            if compact:
+                if not any(s.dirty for s in self.campaign.segments): compact = False
+                else:
+                    self.df_global = self.project_table.frame
+                    self.session.flush_notes(self.df_global, self.project_table.note_col or 'note')
+            job = self.campaign.snapshot_save(self.project_table, compact)
+        except Exception as e:
+            self.log_message(f"Err Save : {e}")
+            return
+        self.compact_requested = False
+        if job.empty: return
+        self.save_worker = ProjectSaveWorker(self.campaign, job, store=self.annotation_store, parent=self)
+        self.save_worker.finished.connect(self._on_save_thread_done)
+        self.save_worker.start()
+
+    def _on_save_thread_done(self, worker=None):
+        worker = worker or self.sender()
+        if worker is None or worker is not self.save_worker: return
+        self.save_worker = None
+        worker.deleteLater()
+        job = worker.job
+        if job.error:
+            # Rien n'est retiré des buffers : nouvel essai à la prochaine échéance
+            self.log_message(f"Err Save : {job.error}")
+            return
+        saved = self.campaign.commit_save(job)
+        if worker.store_error:
+            self.log_message(f"Base d'annotations : {worker.store_error}")
+        self.perf.record("save", job.elapsed_ms)
+        if job.unmatched:
+            self.log_message(f"Éditions du journal ignorées au compactage (échantillon introuvable) : {job.unmatched}")
+        for seg in job.created:
+            self.log_message(f"Copie de travail créée : {os.path.basename(seg.prism_path)}")
+        if job.compact:
+            self.edits_since_compaction = 0
+            self.log_message(f"Sauvegardé : {len(saved)} segment(s) compacté(s) ({job.elapsed_ms:.0f} ms)")
+        else:
+            self.edits_since_compaction += job.n_edits
+            self.log_message(f"Journal : {job.n_edits} édition(s) enregistrée(s) ({job.elapsed_ms:.0f} ms)")
+        if any(s.journal.buffer for s in self.campaign.segments) or self.compact_requested:
+            self.save_timer.start()
+        if job.compact: self.view_timer.start()
+
     def save_changes_to_disk(self):
-        if self.df_global is None or not self.current_csv_path: return
+        """Sauvegarde synchrone (fermeture, changement de dossier) : attend le thread puis compacte."""
+        self.save_timer.stop()
+        worker = self.save_worker
+        if worker is not None:
+            try: worker.finished.disconnect()
+            except TypeError: pass
+            worker.wait()
+            self._on_save_thread_done(worker)
+        if self.df_global is None or self.campaign is None: return
+        if not any(s.dirty for s in self.campaign.segments): return
         try:
-            with open(self.current_csv_path, 'w', encoding='utf-8-sig') as f:
-                if self.metadata_header: f.write(self.metadata_header)
-                self.df_global.to_csv(f, sep=';', decimal=',', index=False)
+            # Table relue : inclut les lignes ajoutées en mode suivi
+            self.df_global = self.project_table.frame
+            self.session.flush_notes(self.df_global, self.project_table.note_col or 'note')
+            pending = [list(s.journal.buffer) for s in self.campaign.segments if s.journal.buffer]
+            self.campaign.write_back(self.project_table)
+            self.edits_since_compaction = 0
+            if self.annotation_store is not None:
+                project = project_name(self.campaign.folder)
+                for entries in pending: self.annotation_store.apply(project, entries)
             self.log_message("Sauvegardé.")
         except Exception as e:
             self.log_message(f"Err Save : {e}")
 
     def update_main_curves(self):
-        if self.df_global is None: return
-        self.graph_time.clear()
-        self.marker_items = [] 
-        self.graph_time.addItem(self.playhead)
+        if self.session is None: return
+        with self.perf.measure("update_main_curves"):
+            self._update_main_curves()
+
+    def _update_main_curves(self):
+        # Seules les courbes sont retirées : zones, tête de lecture et sélection restent dans la scène
+        for item in [self.main_curve, self.preview_curve] + list(self.overlay_curves.values()):
+            if item is not None: self.graph_time.removeItem(item)
+        self.main_curve = None
+        self.preview_curve = None
+        self.overlay_curves = {}
+        self.curve_x = None
 
-        cols = self.df_global.columns
-        y_col = next((c for c in cols if 'leq' in c.lower() or 'dba' in c.lower()), None)
-        if not y_col and len(cols)>2: y_col = cols[2]
-
-        if self.ts_data is not None and y_col:
-            y_data = pd.to_numeric(self.df_global[y_col], errors='coerce').to_numpy()
-            mask = ~np.isnan(self.ts_data) & ~np.isnan(y_data)
-            
-            if np.any(mask):
-                valid_y = y_data[mask]
-                self.min_val_display = np.min(valid_y)
-                self.max_val_display = np.max(valid_y)
+        # Tableaux précalculés par la session (aucune conversion pandas ici)
+        y_col = self.session.level_name
+        ts = self.session.ts
+
+        if y_col:
+            self._set_curve_arrays()
+            if np.any(self.session.valid):
+                self.min_val_display = np.min(self.curve_y)
+                self.max_val_display = np.max(self.curve_y)
                 
-                # COURBE VERTE : Z=10 (DEVANT LES ZONES)
-                curve = self.graph_time.plot(self.ts_data[mask], valid_y, pen=pg.mkPen('#00ff00', width=1))
+                # COURBE VERTE : Z=10 (DEVANT LES ZONES) ; seule la partie visible est tracée
+                curve = self.graph_time.plot([], [], pen=pg.mkPen('#00ff00', width=1))
                 curve.setZValue(10)
+                self.main_curve = curve
+                # Avant le cadrage automatique, toute la série (au niveau d'un pixel) est tracée
+                full = (float(np.min(self.curve_x)), float(np.max(self.curve_x))) if self.autorange_pending else None
+                self.refresh_main_curve(full)
                 
                 self.graph_time.setTitle(f"Signal Global : {y_col}")
 
             for cfg in self.filters_config:
-                cb = self.checkboxes[cfg["col_match"]]
-                if cb.isChecked():
-                    col_name = next((c for c in cols if cfg["col_match"] in c.lower()), None)
-                    if col_name:
-                        y_freq = pd.to_numeric(self.df_global[col_name], errors='coerce').to_numpy()
-                        c_filt = self.graph_time.plot(self.ts_data[mask], y_freq[mask], pen=pg.mkPen(cfg["color"], width=1))
-                        c_filt.setZValue(10)
+                if self.checkboxes[cfg["col_match"]].isChecked():
+                    self.toggle_overlay(cfg["col_match"], True)
         
-        self.redraw_markers()
-        if self.ts_data is not None and len(self.ts_data) > 0:
+        self.refresh_markers()
+        if self.autorange_pending and len(ts) > 0:
+            self.autorange_pending = False
             self.graph_time.getPlotItem().autoRange()
 
+    def _set_curve_arrays(self):
+        mask = self.session.valid
+        self.curve_x = self.session.ts[mask]
+        self.curve_y = self.session.level[mask]
+        self.curve_reach = np.maximum.accumulate(self.curve_x) if len(self.curve_x) else self.curve_x
+        # Pas de trait à travers les trous ni les redémarrages du logger
+        self.curve_connect = self.session.gaps.connect(mask)
+        self.curve_window = None
+
+    def refresh_main_curve(self, view=None):
+        """
+        Courbe globale limitée à la vue (plus une marge) : seaux min/max de la pyramide au niveau
+        d'un pixel en vue large, mesures brutes en zoom fort. Rien n'est retracé tant que la vue
+        reste dans la plage déjà tracée au même niveau.
+        """
+        if self.main_curve is None or self.curve_x is None: return
+        x0, x1 = view or self.graph_time.viewRange()[0]
+        lod = self.session.lod
+        pixels = max(1.0, float(self.graph_time.getPlotItem().vb.width()))
+        k = lod.level_for((x1 - x0) / pixels) if lod is not None else None
+        window = self.curve_window
+        if window is not None and window[0] == k and window[1] <= x0 and x1 <= window[2]: return
+        margin = (x1 - x0) * CURVE_MARGIN
+        lo, hi = x0 - margin, x1 + margin
+        if k is None:
+            i0 = int(np.searchsorted(self.curve_reach, lo, side='left'))
+            i1 = int(np.searchsorted(self.curve_reach, hi, side='right'))
+            x, y, connect = self.curve_x[i0:i1], self.curve_y[i0:i1], self.curve_connect[i0:i1]
+        else:
+            x, y, connect = lod.window(k, lo, hi)
+        self.main_curve.setData(x, y, connect=connect)
+        self.curve_window = (k, lo, hi)
+
+    def toggle_overlay(self, key, visible):
+        """
+        Superposition d'une bande : la courbe est créée au premier affichage puis gardée pour
+        la session ; cocher / décocher ne fait que l'afficher ou la masquer.
+        """
+        if self.session is None or self.curve_x is None: return
+        col_name = self.overlay_cols.get(key)
+        if not col_name: return
+        curve = self.overlay_curves.get(col_name)
+        if curve is None:
+            if not visible: return
+            color = next(cfg["color"] for cfg in self.filters_config if cfg["col_match"] == key)
+            y_freq = self.session.band(col_name)
+            curve = self.graph_time.plot(self.curve_x, y_freq[self.session.valid], pen=pg.mkPen(color, width=1), connect=self.curve_connect)
+            curve.setZValue(10)
+            self.overlay_curves[col_name] = curve
+        curve.setVisible(visible)
+
+    # --- MODE SUIVI (fichier en cours d'écriture) ---
+    def toggle_follow(self, checked):
+        if not checked:
+            self.follow_timer.stop()
+            self.follow_pending = False
+            if self.follower is not None:
+                self.log_message(f"Suivi arrêté ({self.follower.rows_read} lignes ajoutées).")
+            self.follower = None
+            self.follow_segment = None
+            return
+        if self.campaign is None or not len(self.campaign):
+            self.btn_follow.setChecked(False)
+            return
+        seg = self.campaign.segments[-1]
+        if not self.campaign.slices or self.campaign.slices[-1][0] is not seg:
+            # Le fichier en cours d'écriture doit d'abord être en mémoire
+            self.follow_pending = True
+            self.graph_time.setXRange(seg.t_start, seg.t_end, padding=0)
+            self._internal_load([seg])
+            return
+        self.start_follow()
+
+    def start_follow(self):
+        if self.session is None or not self.btn_follow.isChecked(): return
+        seg, start, stop = self.campaign.slices[-1]
+        last = self.session.ts[start:stop]
+        last_ts = float(np.nanmax(last)) if len(last) and not np.isnan(last).all() else None
+        try:
+            # Le logger écrit dans l'original, jamais dans la copie _PRISM
+            self.follower = TailFollower(seg.original_path or seg.path, last_ts)
+        except Exception as e:
+            self.log_message(f"Err Suivi : {e}")
+            self.btn_follow.setChecked(False)
+            return
+        self.follow_segment = seg
+        self.follow_timer.start()
+        self.log_message(f"Suivi actif : {os.path.basename(self.follower.path)}")
+
+    def on_follow_tick(self):
+        if self.follower is None or self.session is None or self.load_worker is not None: return
+        with self.perf.measure("follow_tick"):
+            try:
+                chunk = self.follower.poll()
+            except Exception as e:
+                self.log_message(f"Err Suivi : {e}")
+                return
+            if self.follower.truncated:
+                self.log_message("Fichier suivi réinitialisé : rechargez le dossier.")
+                self.btn_follow.setChecked(False)
+                return
+            for before, after in self.follower.backward_jumps:
+                # Logger redémarré : les lignes sont gardées, la courbe est coupée au saut (GapIndex)
+                t0, t1 = (datetime.fromtimestamp(t).strftime("%d/%m %H:%M:%S") for t in (before, after))
+                msg = f"Suivi : l'heure du logger recule ({t0} -> {t1}), lignes ajoutées à la suite"
+                self.log_console.append(f"> {msg}")
+                log.warning(msg)
+            if chunk is None: return
+            self.append_rows(chunk)
+
+    def append_rows(self, chunk):
+        """Ajoute un bloc de lignes à la table, à la session et aux courbes, sans tout recharger."""
+        ts_before = self.session.ts
+        live_edge = len(ts_before) > 0 and self.graph_time.viewRange()[0][1] >= ts_before[-1]
+        self.project_table.append(chunk)
+        n_notes = len(self.session.notes)
+        rows = self.session.append(chunk)
+        n_new = rows.stop - rows.start
+        self.campaign.extend_segment(self.follow_segment, n_new, self.follower.last_ts)
+        if self.audio_index is not None:
+            self.audio_index.update(self.session, rows, self.campaign.folder)
+        self.ts_data = self.session.ts
+
+        # Courbes existantes prolongées (pas de clear / replot de la scène)
+        ts, mask = self.session.ts, self.session.valid
+        if self.main_curve is None:
+            self.update_main_curves()
+        else:
+            self._set_curve_arrays()
+            self.refresh_main_curve()
+            # Courbes masquées comprises : elles restent à jour pour un réaffichage immédiat
+            for col_name, curve in self.overlay_curves.items():
+                curve.setData(self.curve_x, self.session.band(col_name)[mask], connect=self.curve_connect)
+        self.update_leq_readout()
+        if len(self.session.notes) > n_notes:
+            self.onyx_markers = self.session.markers()
+            self.refresh_markers()
+
+        # Vue calée sur la fin des données : elle suit les nouvelles lignes
+        if live_edge:
+            x0, x1 = self.graph_time.viewRange()[0]
+            shift = self.follower.last_ts - x1
+            if shift > 0: self.graph_time.setXRange(x0 + shift, x1 + shift, padding=0)
+
     def get_marker_color(self, label):
-        lbl = label.lower()
-        if "source +" in lbl: return '#FF0000'
-        if "source std" in lbl: return '#FF8C00'
-        if "source -" in lbl: return '#FFD700'
-        if "résiduel" in lbl: return '#00FF00'
-        if "autre" in lbl or "exclusion" in lbl: return '#808080'
-        return '#AAAAAA'
-
-    def redraw_markers(self):
-        for i, (ts, full_label) in enumerate(self.onyx_markers):
-            label_clean = full_label.split('{')[0].strip()
-            duration = 120.0 
-            match = re.search(r'\{d=([0-9\.]+)\}', full_label)
-            if match: duration = float(match.group(1))
-            
-            color_hex = self.get_marker_color(label_clean)
-            
-            half = duration / 2.0
-            region = pg.LinearRegionItem(values=[ts-half, ts+half], orientation=pg.LinearRegionItem.Vertical)
-            c = QColor(color_hex)
-            c.setAlpha(60) # Opacité réduite (23%)
-            region.setBrush(c)
-            for l in region.lines: l.setPen(pg.mkPen(color_hex))
-            region.setMovable(False)
-            
-            # ZONES : Z=-10 (ARRIÈRE PLAN)
-            region.setZValue(-10)
-            
-            self.graph_time.addItem(region)
-            
-            t_item = ClickableTextItem(
-                text=label_clean, ts_val=ts, parent_dashboard=self, color_hex=color_hex, anchor=(0.5, 1)
-            )
-            y_pos = self.max_val_display + (self.max_val_display - self.min_val_display) * 0.1 * (1 + (i % 3))
-            t_item.setPos(ts, y_pos)
-            self.graph_time.addItem(t_item)
-            self.marker_items.append(region)
-            self.marker_items.append(t_item)
+        return zone_color(class_code(label))
+
+    def refresh_markers(self):
+        """Met à jour le calque des zones (seules les zones modifiées sont touchées)."""
+        if self.session is None: return
+        with self.perf.measure("refresh_markers"):
+            self.marker_layer.update(self.session.zones, self.selected_rows, self.min_val_display,
+                                     self.max_val_display, view=self.graph_time.viewRange()[0])
+
+    def refresh_residuals(self):
+        """Résiduels jour / nuit recalculés sur les zones Résiduel de l'expert dès qu'elles changent."""
+        if self.session is None or not hasattr(self.ia, "calculer_residuels_jour_nuit"): return
+        zones = self.session.zones
+        ranges = zones.intervals(RESIDUAL_CODE)
+        previous = self.residual_ranges
+        if previous is not None and np.array_equal(previous.starts, ranges.starts) and np.array_equal(previous.ends, ranges.ends):
+            return
+        self.residual_ranges = ranges
+        if not len(ranges):
+            # Dernière zone Résiduel supprimée ou reclassée : retour au L90 global (sinon rien à faire)
+            if previous is None or not len(previous): return
+            with self.perf.measure("residuals"):
+                self.ia.calculer_residuels_jour_nuit(self.session.ts, self.session.level,
+                                                     exclure=zones.intervals(EXCLUSION_CODE), zones_residuel=None)
+            parts = [f"{periode} L90 {detail['l90']:.1f}" for periode, detail in self.ia.detail_residuels.items()]
+            self.log_message("Plus de zone Résiduel : résiduel global" + (" (" + " | ".join(parts) + ")" if parts else ""))
+            return
+        with self.perf.measure("residuals"):
+            self.ia.calculer_residuels_jour_nuit(self.session.ts, self.session.level,
+                                                 exclure=zones.intervals(EXCLUSION_CODE), zones_residuel=ranges)
+        parts = []
+        for periode, detail in self.ia.detail_residuels.items():
+            if detail["source"] == "zones":
+                parts.append(f"{periode} L90 {detail['l90']:.1f} / Leq {detail['leq']:.1f}")
+        if parts: self.log_message("Résiduel (zones) : " + " | ".join(parts))
+
+    def update_leq_readout(self):
+        """Leq de la vue et de la bande de sélection : sommes d'énergie cumulées, coût constant."""
+        if self.session is None or not self.session.level_name:
+            self.lbl_leq.setText("")
+            return
+        with self.perf.measure("leq_readout"):
+            x0, x1 = self.graph_time.viewRange()[0]
+            leq, n = self.session.leq(x0, x1)
+            text = f"Leq vue : {leq:.1f} dB" if n else "Leq vue : --"
+            if self.selection_region is not None:
+                s0, s1 = self.selection_region.getRegion()
+                leq, n = self.session.leq(s0, s1)
+                text += f"  |  Leq sélection : {leq:.1f} dB ({n} mesures)" if n else "  |  Leq sélection : --"
+            self.lbl_leq.setText(text)
 
     # --- MENU CONTEXTUEL ---
     def open_marker_menu(self, ts, screen_pos):
@@ -352,8 +794,8 @@ class Dashboard(QWidget):
         menu = QMenu(self)
         menu.setStyleSheet("QMenu { background-color: #FFF; color: #000; } QMenu::item:selected { background-color: #007AFF; color: white; }")
 
-        current = next(((t, l) for t, l in self.onyx_markers if t == ts), None)
-        lbl_clean = current[1].split('{')[0].strip() if current else "??"
+        k = self.session.zones.at_centre(ts) if self.session is not None else None
+        lbl_clean = self.session.zones.labels[k] if k is not None else "??"
         
         menu.addAction(f"Éditer : {lbl_clean}").setEnabled(False)
         menu.addSeparator()
@@ -367,25 +809,102 @@ class Dashboard(QWidget):
         menu.exec_(qpoint)
 
     def modify_marker(self, ts, action):
+        with self.perf.measure("modify_marker"):
+            self._modify_marker(ts, action)
+
+    def _modify_marker(self, ts, action):
+        if self.session is None: return
+        idx = self.session.nearest_index(ts)
         if action == "DELETE":
-            self.onyx_markers = [m for m in self.onyx_markers if m[0] != ts]
-            new_note = np.nan
+            self.apply_zone_edit([idx], delete=True, quiet=True)
             self.log_message("Zone supprimée.")
         else:
-            old_note = next((l for t, l in self.onyx_markers if t == ts), "")
-            duration_part = " {d=120}" 
-            match = re.search(r'\{d=([0-9\.]+)\}', old_note)
-            if match: duration_part = f" {{d={match.group(1)}}}"
-            
-            new_note = f"{action}{duration_part}"
-            self.onyx_markers = [(t, new_note) if t == ts else (t, l) for t, l in self.onyx_markers]
+            self.apply_zone_edit([idx], label=action, quiet=True)
             self.log_message(f"Modifié : {action}")
-        
-        if self.ts_data is not None:
-            idx = (np.abs(self.ts_data - ts)).argmin()
-            self.df_global.loc[idx, 'note'] = new_note
-            self.save_changes_to_disk()
-        self.update_main_curves()
+
+    # --- ÉDITION GROUPÉE DES ZONES ---
+    def apply_zone_edit(self, rows, label=None, delete=False, shift=0.0, quiet=False):
+        """
+        Une opération sur plusieurs zones : notes de la session modifiées en une passe,
+        éditions ajoutées au journal, une seule mise à jour des zones et une seule sauvegarde.
+        """
+        if self.session is None or not len(rows): return
+        with self.perf.measure("bulk_edit"):
+            changes = self.session.edit_zones(rows, label=label, delete=delete, shift=shift)
+            for r, note in changes:
+                self.campaign.record_note(r, float(self.session.ts[r]), note)
+            self.onyx_markers = self.session.markers()
+            # Les zones éditées restent sélectionnées (décalages successifs)
+            self.selected_rows = [r for r, note in changes if note is not None] if self.selected_rows else []
+            self.refresh_markers()
+            self.request_save()
+        self.refresh_residuals()
+        # Zones laissées en place (destination occupée ou hors plage) : toujours signalées
+        for r, reason in self.session.skipped_zones:
+            when = datetime.fromtimestamp(float(self.session.ts[r])).strftime("%d/%m %H:%M:%S")
+            self.log_message(f"Zone non décalée ({reason}) : {self.session.note_at(r)} à {when}")
+        if quiet: return
+        if delete:
+            self.log_message(f"Zones supprimées : {len(changes)}")
+        elif shift:
+            self.log_message(f"Zones décalées de {shift:+.1f} s : {len(rows) - len(self.session.skipped_zones)}")
+        else:
+            self.log_message(f"Zones modifiées en {label} : {len(changes)}")
+
+    def toggle_selection(self, checked):
+        if self.selection_region is not None:
+            self.graph_time.removeItem(self.selection_region)
+            self.selection_region = None
+        if checked:
+            x0, x1 = self.graph_time.viewRange()[0]
+            span = x1 - x0
+            self.selection_region = pg.LinearRegionItem(values=[x0 + span / 3, x1 - span / 3],
+                                                        brush=pg.mkBrush(0, 122, 255, 40))
+            self.selection_region.setZValue(-5)
+            self.selection_region.sigRegionChangeFinished.connect(lambda *_: self.select_zones())
+            self.selection_region.sigRegionChanged.connect(lambda *_: self.update_leq_readout())
+            self.graph_time.addItem(self.selection_region)
+            self.select_zones()
+        else:
+            self.selected_rows = []
+            self.refresh_markers()
+        self.update_leq_readout()
+
+    def select_zones(self, cls=None):
+        """Zones de la bande de sélection (à défaut, de la vue courante), éventuellement d'une seule classe."""
+        if self.session is None: return
+        region = self.selection_region.getRegion() if self.selection_region is not None else self.graph_time.viewRange()[0]
+        self.selected_rows = self.session.zone_rows(region[0], region[1], cls)
+        self.refresh_markers()
+        self.log_message(f"Sélection : {len(self.selected_rows)} zone(s)")
+
+    def open_bulk_menu(self):
+        if self.session is None: return
+        menu = QMenu(self)
+        menu.setStyleSheet("QMenu { background-color: #FFF; color: #000; } QMenu::item:selected { background-color: #007AFF; color: white; }")
+        rows = list(self.selected_rows)
+
+        menu.addAction(f"Sélection : {len(rows)} zone(s)").setEnabled(False)
+        menu.addSeparator()
+        menu.addAction("Tout sélectionner").triggered.connect(lambda: self.select_zones())
+        by_class = menu.addMenu("Sélectionner la classe")
+        for cls in ["Source +", "Source Std", "Source -", "Résiduel", "Autre"]:
+            by_class.addAction(cls).triggered.connect(lambda c, k=cls: self.select_zones(k))
+        menu.addSeparator()
+
+        types = ["Source + (PAC)", "Source Std", "Source -", "Résiduel (Calme)", "Autre (Exclusion)"]
+        for t in types:
+            menu.addAction(f"Changer en : {t}").triggered.connect(lambda c, new_l=t: self.apply_zone_edit(rows, label=new_l))
+        menu.addAction("↔ Décaler...").triggered.connect(lambda: self.shift_selection(rows))
+        menu.addAction("❌ Supprimer la sélection").triggered.connect(lambda: self.apply_zone_edit(rows, delete=True))
+        for action in menu.actions()[-len(types) - 2:]:
+            action.setEnabled(bool(rows))
+        menu.exec_(QCursor.pos())
+
+    def shift_selection(self, rows):
+        shift, ok = QInputDialog.getDouble(self, "Décaler les zones", "Décalage (s) :", 0.0, -86400.0, 86400.0, 1)
+        if ok and shift:
+            self.apply_zone_edit(rows, shift=shift)
 
     def init_spectrum_graph(self):
         self.graph_spectrum.clear()
@@ -395,29 +914,37 @@ class Dashboard(QWidget):
         self.graph_spectrum.addItem(self.bg_item)
 
     def update_spectrum(self, ts):
-        if self.freq_data_matrix is None: return
+        if self.project_table is None or self.project_table.levels is None: return
         try:
-            idx = np.searchsorted(self.ts_data, ts)
-            if idx >= len(self.ts_data): idx = len(self.ts_data)-1
-            if idx < 0: idx = 0
-            start = max(0, idx-1)
-            window = self.freq_data_matrix[start:idx+1, :]
-            if len(window) > 0:
-                vals = window[-1, :]
-                self.bg_item.setOpts(height=vals)
+            idx = self.session.searchsorted(ts)
+            if idx >= len(self.session): idx = len(self.session)-1
+            vals = self.project_table.levels.matrix(self.band_cols, rows=idx)[0]
+            self.bg_item.setOpts(height=np.nan_to_num(vals))
         except: pass
 
     def on_mouse_move(self, pos):
         mouse_point = self.graph_time.plotItem.vb.mapSceneToView(pos)
         self.last_hover_ts = mouse_point.x()
-        self.update_spectrum(self.last_hover_ts)
+        self.frame_scheduler.post("cursor", self.last_hover_ts)
 
     def on_audio_tick(self, position_ms):
         if self.player.state() != QMediaPlayer.PlayingState: return
         if self.last_clicked_ts is None: return
-        current_ts = self.audio_start_ts + (position_ms / 1000.0)
+        self.frame_scheduler.post("playhead", self.audio_start_ts + (position_ms / 1000.0))
+
+    # --- BOUCLE DE RENDU (une mise à jour par image) ---
+    def apply_frame(self, dirty):
+        with self.perf.measure("frame"):
+            if "view" in dirty:
+                self.refresh_main_curve()
+            if "playhead" in dirty:
+                self.move_playhead(dirty["playhead"])
+            # Un seul spectre par image, à la position la plus récente (survol ou lecture)
+            spectrum_ts = [ts for key, ts in dirty.items() if key in ("cursor", "playhead")]
+            if spectrum_ts: self.update_spectrum(spectrum_ts[-1])
+
+    def move_playhead(self, current_ts):
         self.playhead.setPos(current_ts)
-        self.update_spectrum(current_ts)
         view_x = self.graph_time.viewRange()[0]
         if current_ts < view_x[0] or current_ts > view_x[1]:
             span = view_x[1] - view_x[0]
@@ -437,8 +964,8 @@ class Dashboard(QWidget):
                     self.log_message("🚩 Début défini. Maj+Clic pour Fin.")
                 else:
                     raw_start, raw_end = min(self.temp_start_ts, clicked_ts), max(self.temp_start_ts, clicked_ts)
-                    idx_s = (np.abs(self.ts_data - raw_start)).argmin()
-                    idx_e = (np.abs(self.ts_data - raw_end)).argmin()
+                    idx_s = self.session.nearest_index(raw_start)
+                    idx_e = self.session.nearest_index(raw_end)
                     real_s, real_e = self.ts_data[idx_s], self.ts_data[idx_e]
                     
                     if real_s == real_e:
@@ -455,14 +982,13 @@ class Dashboard(QWidget):
                     d = LearningDialog(self)
                     if d.exec_():
                         lbl = d.get_label()
-                        nt = f"{lbl} {{d={dur:.1f}}}"
-                        idx_c = (np.abs(self.ts_data - center)).argmin()
-                        real_c = self.ts_data[idx_c]
-                        self.df_global.loc[idx_c, 'note'] = nt
-                        self.save_changes_to_disk()
-                        self.onyx_markers.append((real_c, nt))
-                        self.redraw_markers()
+                        nt = format_zone_note(lbl, dur)
+                        idx_c = self.session.nearest_index(center)
+                        self.set_note(idx_c, nt)
+                        self.onyx_markers = self.session.markers()
+                        self.refresh_markers()
                         self.log_message(f"➕ Zone : {lbl}")
+                        self.refresh_residuals()
                     else:
                         self.log_message("Annulé.")
             else:
@@ -476,25 +1002,25 @@ class Dashboard(QWidget):
         except: pass
 
     def play_audio_at(self, ts):
-        if self.df_global is None: return
+        if self.session is None: return
+        with self.perf.measure("play_audio_at"):
+            self._play_audio_at(ts)
+
+    def _play_audio_at(self, ts):
         self.last_clicked_ts = ts
-        ts_col = next((c for c in self.df_global.columns if 'ts' == c.lower()), None)
-        idx = (self.df_global[ts_col] - ts).abs().idxmin()
-        row = self.df_global.iloc[idx]
-        fname = row.get('Audio_Ref', '')
-        if pd.isna(fname): return
-        
-        full_path = os.path.join(self.current_folder, str(fname))
-        if not os.path.exists(full_path):
+        if self.audio_index is None: return
+        seg, offset = self.audio_index.locate(ts)
+        if seg is None: return
+        if not seg.exists:
              self.log_message(f"Audio introuvable.")
              return
 
-        file_data = self.df_global[self.df_global['Audio_Ref'] == fname]
-        self.audio_start_ts = file_data[ts_col].min()
-        offset_ms = int((ts - self.audio_start_ts) * 1000)
-        if offset_ms < 0: offset_ms = 0
+        self.audio_start_ts = seg.t_start
+        offset_ms = int(offset * 1000)
         self.playhead.setPos(ts)
-        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(full_path)))
+        if seg.path != self.audio_path:
+            self.player.setMedia(QMediaContent(QUrl.fromLocalFile(seg.path)))
+            self.audio_path = seg.path
         self.player.setPosition(offset_ms)
         self.player.play()
         self.setFocus()
@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 import numpy as np
 import pyqtgraph as pg
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, 
@@ -8,6 +7,17 @@ from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 from PyQt5.QtCore import QUrl, Qt, QTimer
 from PyQt5.QtGui import QPainterPath
 from utils.logger import log
+from utils.perf import LatencyProbe
+from core.onyx_reader import read_onyx_csv
+from core.session import Session
+from core.zones import EXCLUSION_CODE, RESIDUAL_CODE
+from core.audio_index import AudioIndex
+from core.tail_follow import TailFollower
+from ui.frame_scheduler import FrameScheduler
+
+# Durées proposées pour la fenêtre glissante du spectre (s, libellé)
+RTA_WINDOWS = [(1, "1s"), (5, "5s"), (30, "30s"), (60, "1min"), (300, "5min"), (900, "15min"), (3600, "1h")]
+RTA_DEFAULT_WINDOW = 5
 
 # --- Fenêtre Apprentissage ---
 class LearningDialog(QDialog):
@@ -61,6 +71,12 @@ class Dashboard(QWidget):
         self.btn_learn.clicked.connect(self.teach_ai)
         self.toolbar_layout.addWidget(self.btn_learn)
 
+        self.btn_follow = QPushButton("4. SUIVI LIVE")
+        self.btn_follow.setStyleSheet(btn_style + "background-color: #1E5631;")
+        self.btn_follow.setCheckable(True)
+        self.btn_follow.toggled.connect(self.toggle_follow)
+        self.toolbar_layout.addWidget(self.btn_follow)
+
         self.main_layout.addLayout(self.toolbar_layout)
 
         # 2. FILTRES HAUT
@@ -90,23 +106,33 @@ class Dashboard(QWidget):
         self.filter_layout.addStretch()
         self.main_layout.addLayout(self.filter_layout)
 
-        # 3. FILTRES BAS (Glissant 5s)
+        # 3. FILTRES BAS (Fenêtre glissante réglable, 1s à 1h)
+        self.rta_window_s = float(RTA_DEFAULT_WINDOW)
         self.rta_controls = QHBoxLayout()
-        self.lbl_rta = QLabel("Bas (Spectre - Rolling 5s) :")
+        self.lbl_rta = QLabel("Bas (Spectre - Rolling) :")
         self.lbl_rta.setStyleSheet("color: #AAA; font-size: 11px;")
         self.rta_controls.addWidget(self.lbl_rta)
 
-        self.cb_rta_avg = QCheckBox("Moyenne 5s (Vert)")
+        self.combo_rta_window = QComboBox()
+        for seconds, label in RTA_WINDOWS:
+            self.combo_rta_window.addItem(label, seconds)
+        self.combo_rta_window.setCurrentIndex([w for w, _ in RTA_WINDOWS].index(RTA_DEFAULT_WINDOW))
+        self.combo_rta_window.setStyleSheet("font-size: 10px;")
+        self.combo_rta_window.currentIndexChanged.connect(self.on_rta_window_changed)
+        self.rta_controls.addWidget(self.combo_rta_window)
+
+        self.cb_rta_avg = QCheckBox()
         self.cb_rta_avg.setStyleSheet("color: #00FF00; font-weight: bold; font-size: 10px;")
         self.cb_rta_avg.setChecked(True)
         self.cb_rta_avg.stateChanged.connect(lambda: self.update_spectrum(self.last_hover_ts))
         self.rta_controls.addWidget(self.cb_rta_avg)
 
-        self.cb_rta_peak = QCheckBox("Crêtes 5s (Cyan)")
+        self.cb_rta_peak = QCheckBox()
         self.cb_rta_peak.setStyleSheet("color: cyan; font-weight: bold; font-size: 10px;")
         self.cb_rta_peak.setChecked(True)
         self.cb_rta_peak.stateChanged.connect(lambda: self.update_spectrum(self.last_hover_ts))
         self.rta_controls.addWidget(self.cb_rta_peak)
+        self.set_rta_labels()
 
         self.rta_controls.addStretch()
         self.main_layout.addLayout(self.rta_controls)
@@ -142,7 +168,7 @@ class Dashboard(QWidget):
         self.log_console.setReadOnly(True)
         self.log_console.setStyleSheet("background-color: #000; color: #0f0; font-family: monospace; font-size: 10px;")
         self.log_console.setMaximumHeight(80)
-        self.log_console.setText("--- PRISM V9.1 (Rolling Window 5s) ---")
+        self.log_console.setText("--- PRISM V9.1 (Rolling Window) ---")
         self.main_layout.addWidget(self.log_console)
 
         # VARIABLES
@@ -151,8 +177,27 @@ class Dashboard(QWidget):
         
         self.current_folder = None
         self.df_global = None
+        self.project_table = None
+        self.csv_path = None
+        self.session = None
+        self.audio_index = None
+        self.overlay_cols = {}
         self.ts_data = None
-        self.freq_data_matrix = None # Optimisation V9
+        self.band_cols = []
+        self.perf = LatencyProbe()
+        self.main_curve = None
+        self.overlay_curves = {}
+        self.event_items = []
+        self.threshold_items = []
+
+        # Mode suivi : relecture de la fin du CSV toutes les 2 s
+        self.follower = None
+        self.follow_timer = QTimer(self)
+        self.follow_timer.setInterval(2000)
+        self.follow_timer.timeout.connect(self.on_follow_tick)
+
+        # Survol et tête de lecture : état regroupé, appliqué au plus une fois par image
+        self.frame_scheduler = FrameScheduler(self, self.apply_frame)
         
         self.detected_events = []
         self.current_event_idx = -1
@@ -179,28 +224,29 @@ class Dashboard(QWidget):
         self.current_folder = folder_path
         csvs = [f for f in os.listdir(folder_path) if f.lower().endswith('.csv')]
         if not csvs: return
+        self.btn_follow.setChecked(False)
+        self.frame_scheduler.clear()
         try:
             path = os.path.join(folder_path, csvs[0])
-            self.df_global = pd.read_csv(path, sep=';', decimal=',', header=1, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
-            self.df_global.columns = self.df_global.columns.str.strip()
-            
-            # OPTIMISATION V9 : Matrice Numpy pour le calcul temps réel
-            cols = self.df_global.columns
-            ts_col = next((c for c in cols if 'ts' == c.lower()), None)
-            if ts_col:
-                self.ts_data = pd.to_numeric(self.df_global[ts_col], errors='coerce').to_numpy()
-                
-                # On prépare la matrice [Temps x Fréquences]
-                freq_list = []
-                for f_name in self.rta_freqs:
-                    col = next((c for c in cols if f_name.lower() in c.lower()), None)
-                    if col:
-                        freq_list.append(pd.to_numeric(self.df_global[col], errors='coerce').to_numpy())
-                    else:
-                        freq_list.append(np.zeros(len(self.df_global)))
-                
-                # Transposition pour avoir [Lignes, Cols]
-                self.freq_data_matrix = np.column_stack(freq_list)
+            table = read_onyx_csv(path)
+            self.csv_path = path
+            self.project_table = table
+            self.df_global = table.frame
+
+            # Session typée : tableaux numpy construits une seule fois
+            self.session = Session.from_table(table)
+            self.audio_index = AudioIndex.from_session(self.session, folder_path)
+            self.ts_data = self.session.ts
+            if len(self.session.gaps) > 1:
+                self.log_message(f"Discontinuités (trous / redémarrages) : {len(self.session.gaps) - 1}")
+            if table.ts_col:
+                # Colonnes du spectre résolues une fois ; la fenêtre glissante lit le store de niveaux
+                self.band_cols = [table.band_col(f_name) for f_name in self.rta_freqs]
+                # Sommes d'énergie et index de crêtes du spectre construits au chargement (survol instantané)
+                self.session.energy(tuple(self.band_cols))
+                self.session.peaks(self.band_cols)
+                self.overlay_cols = {cfg["col_match"]: next((c for c in self.session.band_labels if cfg["col_match"] in c.lower()), None)
+                                     for cfg in self.filters_config}
 
             self.res_jour = None
             self.res_nuit = None
@@ -212,43 +258,51 @@ class Dashboard(QWidget):
 
     # --- TEMPOREL ---
     def update_main_curves(self):
-        if self.df_global is None: return
+        if self.session is None: return
+        with self.perf.measure("update_main_curves"):
+            self._update_main_curves()
+
+    def _update_main_curves(self):
         self.graph_time.clear()
         self.graph_time.addItem(self.playhead)
+        self.main_curve = None
+        self.overlay_curves = {}
 
-        cols = self.df_global.columns
-        y_col = next((c for c in cols if 'leq' in c.lower() or 'dba' in c.lower()), None)
-        if not y_col and len(cols)>2: y_col = cols[2]
+        y_col = self.session.level_name
+        ts = self.session.ts
 
-        if self.ts_data is not None and y_col:
-            y_data = pd.to_numeric(self.df_global[y_col], errors='coerce').to_numpy()
-            mask = ~np.isnan(self.ts_data) & ~np.isnan(y_data)
-            
+        if y_col:
+            mask = self.session.valid
+            # Pas de trait à travers les trous ni les redémarrages du logger
+            connect = self.session.gaps.connect(mask)
             if np.any(mask):
-                valid_y = y_data[mask]
+                valid_y = self.session.level[mask]
                 self.min_val_display = np.min(valid_y) if len(valid_y) > 0 else 20
-                self.graph_time.plot(self.ts_data[mask], valid_y, pen=pg.mkPen('#00ff00', width=1))
+                self.main_curve = self.graph_time.plot(ts[mask], valid_y, pen=pg.mkPen('#00ff00', width=1), connect=connect)
                 self.graph_time.setTitle(f"Signal Global : {y_col}")
 
             for cfg in self.filters_config:
                 cb = self.checkboxes[cfg["col_match"]]
                 if cb.isChecked():
-                    col_name = next((c for c in cols if cfg["col_match"] in c.lower()), None)
+                    col_name = self.overlay_cols.get(cfg["col_match"])
                     if col_name:
-                        y_freq = pd.to_numeric(self.df_global[col_name], errors='coerce').to_numpy()
-                        self.graph_time.plot(self.ts_data[mask], y_freq[mask], pen=pg.mkPen(cfg["color"], width=1))
+                        y_freq = self.session.band(col_name)
+                        self.overlay_curves[col_name] = self.graph_time.plot(ts[mask], y_freq[mask], pen=pg.mkPen(cfg["color"], width=1), connect=connect)
         
         self.redraw_events()
         self.redraw_thresholds()
         
-        if self.ts_data is not None and len(self.ts_data) > 0:
+        if len(ts) > 0:
             self.graph_time.getPlotItem().autoRange()
 
     def redraw_thresholds(self):
+        for item in self.threshold_items: self.graph_time.removeItem(item)
+        self.threshold_items = []
         if self.res_jour is not None:
-            self.graph_time.addItem(pg.InfiniteLine(pos=self.res_jour, angle=0, pen=pg.mkPen('c', style=Qt.DashLine), label=f"Jour {self.res_jour:.1f}"))
+            self.threshold_items.append(pg.InfiniteLine(pos=self.res_jour, angle=0, pen=pg.mkPen('c', style=Qt.DashLine), label=f"Jour {self.res_jour:.1f}"))
         if self.res_nuit is not None:
-            self.graph_time.addItem(pg.InfiniteLine(pos=self.res_nuit, angle=0, pen=pg.mkPen('#00008B', style=Qt.DashLine), label=f"Nuit {self.res_nuit:.1f}"))
+            self.threshold_items.append(pg.InfiniteLine(pos=self.res_nuit, angle=0, pen=pg.mkPen('#00008B', style=Qt.DashLine), label=f"Nuit {self.res_nuit:.1f}"))
+        for item in self.threshold_items: self.graph_time.addItem(item)
 
     # --- SPECTRE (V9.1 Glissant) ---
     def init_spectrum_graph(self):
@@ -265,11 +319,11 @@ class Dashboard(QWidget):
         h_bar.moveTo(-0.4, 0) 
         h_bar.lineTo(0.4, 0)
 
-        # 2. Moyenne 5s (VERT)
+        # 2. Leq de la fenêtre (VERT)
         self.avg_item = pg.ScatterPlotItem(x=[], y=[], pen=pg.mkPen('#00FF00', width=3), brush=None, symbol=h_bar, size=1, pxMode=False)
         self.graph_spectrum.addItem(self.avg_item)
 
-        # 3. Crêtes 5s (CYAN)
+        # 3. Crêtes de la fenêtre (CYAN)
         self.peak_item = pg.ScatterPlotItem(x=[], y=[], pen=pg.mkPen('c', width=3), brush=None, symbol=h_bar, size=1, pxMode=False)
         self.graph_spectrum.addItem(self.peak_item)
         
@@ -279,34 +333,35 @@ class Dashboard(QWidget):
         if self.avg_item: self.avg_item.setVisible(self.cb_rta_avg.isChecked())
         if self.peak_item: self.peak_item.setVisible(self.cb_rta_peak.isChecked())
 
+    def set_rta_labels(self):
+        label = self.combo_rta_window.currentText()
+        self.cb_rta_avg.setText(f"Leq {label} (Vert)")
+        self.cb_rta_peak.setText(f"Crêtes {label} (Cyan)")
+
+    def on_rta_window_changed(self, index):
+        self.rta_window_s = float(self.combo_rta_window.itemData(index))
+        self.set_rta_labels()
+        self.update_spectrum(self.last_hover_ts)
+
     def update_spectrum(self, ts):
-        if self.freq_data_matrix is None: return
+        if self.session is None or not self.band_cols: return
         
         try:
-            # 1. Index fin (instant T)
-            # searchsorted est très rapide sur des tableaux triés
-            idx_end = np.searchsorted(self.ts_data, ts)
-            if idx_end >= len(self.ts_data): idx_end = len(self.ts_data) - 1
+            # 1. Index fin (instant T) : conversion O(1) via la grille temporelle
+            idx_end = self.session.searchsorted(ts)
+            if idx_end >= len(self.session): idx_end = len(self.session) - 1
             
-            # 2. Index début (T - 5 secondes)
-            ts_start = ts - 5.0
-            idx_start = np.searchsorted(self.ts_data, ts_start)
-            if idx_start < 0: idx_start = 0
-            
-            # 3. Extraction fenêtre (Slicing)
-            # matrix[lignes, colonnes]
-            window = self.freq_data_matrix[idx_start:idx_end+1, :]
+            # 2. Index début (T - durée de la fenêtre)
+            idx_start = self.session.searchsorted(ts - self.rta_window_s)
             
             # Valeur instantanée (dernière ligne)
-            current_vals = window[-1, :] if len(window) > 0 else np.zeros(len(self.rta_freqs))
+            current_vals = np.nan_to_num(self.session.band_row(idx_end, self.band_cols))
             
-            # CALCULS STATISTIQUES GLISSANTS (V9.1)
-            if len(window) > 0:
-                avg_vals = np.mean(window, axis=0) # Moyenne verticale
-                peak_vals = np.max(window, axis=0) # Max vertical
-            else:
-                avg_vals = np.zeros(len(self.rta_freqs))
-                peak_vals = np.zeros(len(self.rta_freqs))
+            # CALCULS STATISTIQUES GLISSANTS : sommes d'énergie cumulées et index de crêtes,
+            # coût constant quelle que soit la durée de la fenêtre
+            bands = tuple(self.band_cols)
+            avg_vals = np.nan_to_num(self.session.energy(bands).leq(idx_start, idx_end + 1))
+            peak_vals = np.nan_to_num(self.session.peaks(bands).max(idx_start, idx_end + 1))
 
             # Mise à jour graphique
             if self.bg_item: 
@@ -327,13 +382,26 @@ class Dashboard(QWidget):
         mouse_point = self.graph_time.plotItem.vb.mapSceneToView(pos)
         ts = mouse_point.x()
         self.last_hover_ts = ts
-        self.update_spectrum(ts)
+        self.frame_scheduler.post("cursor", ts)
 
     def on_audio_tick(self, position_ms):
         if self.last_clicked_ts is None: return
-        current_ts = self.audio_start_ts + (position_ms / 1000.0)
-        self.playhead.setPos(current_ts)
-        self.update_spectrum(current_ts)
+        self.frame_scheduler.post("playhead", self.audio_start_ts + (position_ms / 1000.0))
+
+    def apply_frame(self, dirty):
+        with self.perf.measure("frame"):
+            if "playhead" in dirty:
+                self.playhead.setPos(dirty["playhead"])
+            # Un seul spectre par image, à la position la plus récente (survol ou lecture)
+            spectrum_ts = [ts for key, ts in dirty.items() if key in ("cursor", "playhead")]
+            if spectrum_ts: self.update_spectrum(spectrum_ts[-1])
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_P:
+            # Latences mesurées et compteurs de la boucle de rendu
+            for line in self.perf.summary() + self.frame_scheduler.summary(): self.log_message(f"⏱ {line}")
+        else:
+            super().keyPressEvent(event)
 
     def on_graph_click(self, event):
         if self.df_global is None: return
@@ -344,67 +412,145 @@ class Dashboard(QWidget):
         except: pass
 
     def play_audio_at(self, ts):
-        if self.df_global is None: return
-        self.last_clicked_ts = ts
-        ts_col = next((c for c in self.df_global.columns if 'ts' == c.lower()), None)
-        idx = (self.df_global[ts_col] - ts).abs().idxmin()
-        row = self.df_global.iloc[idx]
-        
-        fname = row.get('Audio_Ref', '')
-        if pd.isna(fname): return
+        if self.session is None: return
+        with self.perf.measure("play_audio_at"):
+            self._play_audio_at(ts)
 
-        full_path = os.path.join(self.current_folder, str(fname))
-        if not os.path.exists(full_path): 
+    def _play_audio_at(self, ts):
+        self.last_clicked_ts = ts
+        seg, offset = self.audio_index.locate(ts)
+        if seg is None: return
+        if not seg.exists: 
             self.log_message("Audio manquant.")
             return
 
-        file_data = self.df_global[self.df_global['Audio_Ref'] == fname]
-        self.audio_start_ts = file_data[ts_col].min()
-        offset_ms = int((ts - self.audio_start_ts) * 1000)
-        if offset_ms < 0: offset_ms = 0
+        self.audio_start_ts = seg.t_start
+        offset_ms = int(offset * 1000)
         
         self.playhead.setPos(ts)
-        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(full_path)))
+        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(seg.path)))
         self.player.setPosition(offset_ms)
         self.player.play()
 
     # --- SCAN EXPERT ---
     def run_auto_scan(self):
-        if self.df_global is None or not self.ia: return
-        self.log_message("⏳ Scan EXPERT...")
-        cols = self.df_global.columns
-        y_col = next((c for c in cols if 'leq' in c.lower() or 'dba' in c.lower()), None)
-        ts_col = next((c for c in cols if 'ts' == c.lower()), None)
-        if not y_col: y_col = cols[2]
-        t = pd.to_numeric(self.df_global[ts_col], errors='coerce').tolist()
-        v = pd.to_numeric(self.df_global[y_col], errors='coerce').tolist()
+        if self.session is None or not self.ia: return
+        with self.perf.measure("run_auto_scan"):
+            self._run_auto_scan()
 
-        (res_j, res_n), points = self.ia.scanner_emergences(t, v)
-        self.log_message(f"Résiduels : J {res_j:.1f} | N {res_n:.1f}")
+    def _run_auto_scan(self):
+        self.log_message("⏳ Scan EXPERT...")
+        # Vues numpy de la session (pas de conversion en listes Python)
+        t = self.session.ts
+        v = self.session.level
+
+        plages = self._plages_residuel()
+        (res_j, res_n), points = self.ia.scanner_emergences(t, v, **plages)
+        self.log_message(f"Résiduels : J {res_j:.1f} | N {res_n:.1f}" + (f" (hors {len(plages['exclure'])} plage(s) exclue(s))" if len(plages['exclure']) else ""))
+        detail = self.ia.detail_residuels
+        for periode in ("jour", "nuit"):
+            if detail[periode]["source"] == "zones":
+                self.log_message(f"Résiduel {periode} (zones Résiduel) : L90 {detail[periode]['l90']:.1f} | Leq {detail[periode]['leq']:.1f} ({detail[periode]['n']} mesures)")
 
         self.res_jour = res_j
         self.res_nuit = res_n
+        self.detected_events = self._grouper_evenements(points)
+        if self.follower is not None:
+            # En suivi, l'IA repart de cet état et n'intègre ensuite que les nouvelles lignes
+            self.ia.demarrer_suivi(t, v, **plages)
 
-        self.detected_events = []
+        self.log_message(f"Trouvé {len(self.detected_events)} événements.")
+        self.redraw_events()
+        self.redraw_thresholds()
+        self.current_event_idx = -1
+
+    def _plages_residuel(self):
+        """Zones de l'expert prises en compte : Autre / Exclusion écartées, Résiduel prioritaires."""
+        zones = self.session.zones
+        return {"exclure": zones.intervals(EXCLUSION_CODE), "zones_residuel": zones.intervals(RESIDUAL_CODE)}
+
+    def _grouper_evenements(self, points):
+        events = []
         if points:
             zone_start = points[0][0]
             last_ts = points[0][0]
             for i in range(1, len(points)):
                 ts = points[i][0]
                 if ts - last_ts > 120:
-                    self.detected_events.append((zone_start, last_ts))
+                    events.append((zone_start, last_ts))
                     zone_start = ts
                 last_ts = ts
-            self.detected_events.append((zone_start, last_ts))
-
-        self.log_message(f"Trouvé {len(self.detected_events)} événements.")
-        self.redraw_events()
-        self.redraw_thresholds()
-        self.current_event_idx = -1
+            events.append((zone_start, last_ts))
+        return events
 
     def redraw_events(self):
+        for item in self.event_items: self.graph_time.removeItem(item)
+        self.event_items = []
         for start, end in self.detected_events:
-            self.graph_time.plot([start, end], [self.min_val_display, self.min_val_display], pen=pg.mkPen('r', width=3))
+            self.event_items.append(self.graph_time.plot([start, end], [self.min_val_display, self.min_val_display], pen=pg.mkPen('r', width=3)))
+
+    # --- SUIVI LIVE (fichier en cours d'écriture) ---
+    def toggle_follow(self, checked):
+        if not checked:
+            self.follow_timer.stop()
+            if self.follower is not None:
+                self.log_message(f"Suivi arrêté ({self.follower.rows_read} lignes ajoutées).")
+            self.follower = None
+            return
+        if self.session is None or self.csv_path is None:
+            self.btn_follow.setChecked(False)
+            return
+        ts = self.session.ts
+        last_ts = float(np.nanmax(ts)) if len(ts) and not np.isnan(ts).all() else None
+        try:
+            self.follower = TailFollower(self.csv_path, last_ts)
+        except Exception as e:
+            self.log_message(f"Err Suivi : {e}")
+            self.btn_follow.setChecked(False)
+            return
+        if self.ia and self.res_jour is not None:
+            self.ia.demarrer_suivi(self.session.ts, self.session.level, **self._plages_residuel())
+        self.follow_timer.start()
+        self.log_message(f"Suivi actif : {os.path.basename(self.csv_path)}")
+
+    def on_follow_tick(self):
+        if self.follower is None or self.session is None: return
+        with self.perf.measure("follow_tick"):
+            try:
+                chunk = self.follower.poll()
+            except Exception as e:
+                self.log_message(f"Err Suivi : {e}")
+                return
+            if self.follower.truncated:
+                self.log_message("Fichier suivi réinitialisé : rechargez le dossier.")
+                self.btn_follow.setChecked(False)
+                return
+            if chunk is None: return
+            self.append_rows(chunk)
+
+    def append_rows(self, chunk):
+        """Nouvelles lignes : session, courbes et résultats IA mis à jour sans tout recalculer."""
+        self.project_table.append(chunk)
+        rows = self.session.append(chunk)
+        self.ts_data = self.session.ts
+        if self.audio_index is not None:
+            self.audio_index.update(self.session, rows, self.current_folder)
+
+        ts, mask = self.session.ts, self.session.valid
+        connect = self.session.gaps.connect(mask)
+        if self.main_curve is None:
+            self.update_main_curves()
+        else:
+            self.main_curve.setData(ts[mask], self.session.level[mask], connect=connect)
+            for col_name, curve in self.overlay_curves.items():
+                curve.setData(ts[mask], self.session.band(col_name)[mask], connect=connect)
+
+        if self.ia and self.res_jour is not None:
+            (res_j, res_n), points = self.ia.suivre(self.session.ts, self.session.level, rows.start)
+            self.res_jour, self.res_nuit = res_j, res_n
+            self.detected_events = self._grouper_evenements(points)
+            self.redraw_events()
+            self.redraw_thresholds()
 
     def prev_event(self):
         if self.current_event_idx > 0:
@@ -428,9 +574,8 @@ class Dashboard(QWidget):
         if not self.ia: return
         d = LearningDialog(self)
         if d.exec_():
-            idx = (np.abs(self.ts_data - self.last_clicked_ts)).argmin()
-            row = self.df_global.iloc[idx]
-            cols_hz = [c for c in self.df_global.columns if 'hz' in c.lower()]
-            spectre = {c: float(row[c]) for c in cols_hz if pd.notna(row[c])}
+            idx = self.session.nearest_index(self.last_clicked_ts)
+            row = self.session.band_row(idx)
+            spectre = {c: float(v) for c, v in zip(self.session.band_labels, row) if not np.isnan(v)}
             res = self.ia.save_example(spectre, d.get_label())
             self.log_message(res)
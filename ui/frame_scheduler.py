@@ -0,0 +1,65 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QApplication
+
+# Cadence utilisée quand l'écran ne donne pas sa fréquence de rafraîchissement (Hz)
+DEFAULT_FRAME_RATE = 60.0
+
+
+class FrameScheduler:
+    """
+    Boucle de rendu à l'image : les handlers (survol, audio, vue) ne dessinent plus, ils
+    déposent un état « sale » (clé -> dernière valeur). Au plus une fois par image écran,
+    `apply(dirty)` reçoit les clés modifiées depuis l'image précédente, dans l'ordre de leur
+    dernière modification. Une valeur remplacée avant d'être appliquée est comptée comme
+    fusionnée ; une valeur identique à celle déjà affichée est ignorée sans réveiller la boucle.
+    """
+    def __init__(self, parent, apply):
+        self.apply = apply
+        self.pending = {}
+        self.applied = {}
+        self.posted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.frames = 0
+        self.timer = QTimer(parent)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(self._frame_ms())
+        self.timer.timeout.connect(self.flush)
+
+    @staticmethod
+    def _frame_ms():
+        screen = QApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 0.0
+        return max(1, int(round(1000.0 / (rate if rate > 1.0 else DEFAULT_FRAME_RATE))))
+
+    def post(self, key, value=None):
+        self.posted += 1
+        if key in self.pending:
+            # Valeur jamais affichée : remplacée et replacée en fin d'ordre (la plus récente)
+            self.coalesced += 1
+            del self.pending[key]
+        elif key in self.applied and self.applied[key] == value:
+            self.dropped += 1
+            return
+        self.pending[key] = value
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Applique l'état sale accumulé (appelé par la boucle ; peut être forcé)."""
+        self.timer.stop()
+        if not self.pending: return
+        dirty, self.pending = self.pending, {}
+        self.applied.update(dirty)
+        self.frames += 1
+        self.apply(dirty)
+
+    def clear(self):
+        """Nouvelle session : rien en attente, aucune valeur considérée comme déjà affichée."""
+        self.timer.stop()
+        self.pending = {}
+        self.applied = {}
+
+    def summary(self):
+        return [f"images : {self.frames} | évènements : {self.posted} | fusionnés : {self.coalesced} | ignorés (inchangés) : {self.dropped}"]
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QThread, pyqtSignal
+from core.onyx_reader import OnyxTable, iter_onyx_chunks
+from core.project_cache import load_frame_cache, store_frame_cache
+from core.level_store import open_level_store, save_level_store, split_levels
+from core.lod import table_pyramid
+from core.session import Session
+from core.audio_index import AudioIndex
+from core.annotation_store import project_name
+
+# Nombre de points max envoyés par bloc pour l'aperçu grossier de la courbe
+PREVIEW_POINTS_PER_CHUNK = 2000
+
+
+class ProjectLoadWorker(QThread):
+    """
+    Chargement de segments de campagne en arrière-plan : lecture par blocs, progression,
+    aperçu grossier de la courbe au fil de l'eau, annulation via requestInterruption().
+    Les segments déjà résidents sont seulement recombinés avec les nouveaux.
+    """
+    progress = pyqtSignal(int)
+    preview = pyqtSignal(object, object)
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, campaign, to_load, chunksize=200000, store=None, parent=None):
+        super().__init__(parent)
+        self.campaign = campaign
+        self.to_load = [(seg, seg.path) for seg in to_load]
+        # Instantané des segments résidents (lecture seule dans le thread)
+        self.resident = [(seg, seg.table) for seg in campaign.resident_segments()]
+        self.generation = campaign.generation
+        self.chunksize = chunksize
+        self.from_cache = 0
+        self.replayed = 0
+        self.unmatched = 0
+        self.store = store
+        self.store_error = None
+
+    def run(self):
+        try:
+            new_tables = []
+            n = max(1, len(self.to_load))
+            for k, (seg, path) in enumerate(self.to_load):
+                table = self._load_one(path, k, n)
+                if table is None: return
+                # Éditions de zones non compactées : rejouées depuis le journal du segment
+                self.replayed += seg.journal.replay(table)
+                self.unmatched += len(seg.journal.unmatched)
+                new_tables.append((seg, table))
+                self._sync_store(table)
+
+            if self.isInterruptionRequested(): return
+            table, slices = self.campaign.combine(self.resident + new_tables)
+            if table is None:
+                self.failed.emit("Aucune donnée.")
+                return
+            # Modèle typé construit hors du thread graphique
+            session = Session.from_table(table)
+            audio = AudioIndex.from_session(session, self.campaign.folder)
+            if self.isInterruptionRequested(): return
+            self.progress.emit(100)
+            self.loaded.emit({
+                "new_tables": new_tables, "table": table, "slices": slices,
+                "session": session, "audio": audio, "generation": self.generation,
+            })
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def _sync_store(self, table):
+        # Base d'annotations partagée : zones du segment synchronisées (optionnel, hors thread graphique)
+        if self.store is None: return
+        try:
+            self.store.sync_table(project_name(self.campaign.folder), table)
+        except Exception as e:
+            self.store_error = str(e)
+
+    def _load_one(self, path, k, n):
+        cached = load_frame_cache(path)
+        levels = open_level_store(path)
+        if cached is not None and levels is not None and len(levels) == len(cached[0]):
+            df, metadata_header, all_columns = cached
+            self.from_cache += 1
+            self.progress.emit(int((k + 1) * 100 / n))
+            table = OnyxTable(df, {"metadata_header": metadata_header, "columns": all_columns}, levels)
+            table.lod = table_pyramid(path, table)
+            return table
+
+        chunks, layout = [], None
+        for chunk, frac in iter_onyx_chunks(path, self.chunksize):
+            if self.isInterruptionRequested(): return None
+            chunks.append(chunk.frame)
+            layout = chunk.layout
+            self._emit_preview(chunk)
+            self.progress.emit(int((k + frac) * 100 / n))
+        if not chunks:
+            return OnyxTable(pd.DataFrame(), {"metadata_header": ""})
+
+        # Niveaux quantifiés (int16 centi-dB) sur disque puis mappés ; le reste en cache .npz
+        table = split_levels(OnyxTable(pd.concat(chunks, ignore_index=True), layout))
+        levels = save_level_store(path, table.levels)
+        store_frame_cache(path, table.frame, table.metadata_header, table.layout["columns"])
+        table = OnyxTable(table.frame, table.layout, levels)
+        # Pyramide min/max du tracé, construite une fois et gardée à côté du CSV
+        table.lod = table_pyramid(path, table)
+        return table
+
+    def _emit_preview(self, chunk):
+        ts_col, y_col = chunk.ts_col, chunk.level_col
+        if not ts_col or not y_col: return
+        ts = pd.to_numeric(chunk.frame[ts_col], errors='coerce').to_numpy()
+        y = pd.to_numeric(chunk.frame[y_col], errors='coerce').to_numpy()
+        step = max(1, len(ts) // PREVIEW_POINTS_PER_CHUNK)
+        ts, y = ts[::step], y[::step]
+        mask = ~np.isnan(ts) & ~np.isnan(y)
+        self.preview.emit(ts[mask], y[mask])
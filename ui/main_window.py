@@ -26,3 +26,9 @@ class MainWindow(QMainWindow):
             log.info(f"MainWindow : Cerveau '{self.ia.nom}' transmis au Dashboard.")
 
         log.info("MainWindow V2.6 initialisée.")
+
+    def closeEvent(self, event):
+        # Compactage des journaux d'annotations avant de quitter
+        if hasattr(self, "dashboard"):
+            self.dashboard.save_changes_to_disk()
+        super().closeEvent(event)
@@ -0,0 +1,181 @@
+import pyqtgraph as pg
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QFont
+import numpy as np
+from core.zones import CLASS_NAMES, zone_color
+
+# Marge matérialisée de part et d'autre de la vue (fraction de la largeur visible)
+VIEW_MARGIN = 0.5
+# Au-delà de ce nombre de zones visibles, les zones voisines d'une même classe sont regroupées
+MAX_DETAILED_ZONES = 150
+# Hystérésis : une fois regroupées, les zones ne redeviennent détaillées que sous ce seuil
+MIN_GROUPED_ZONES = 100
+# Écart max (fraction de la largeur visible) entre deux zones regroupées dans une même bande
+MERGE_GAP = 1.0 / 150
+
+
+# --- Etiquette Graphique ---
+class ClickableTextItem(pg.TextItem):
+    def __init__(self, text, ts_val, parent_dashboard, color_hex, **kwargs):
+        super().__init__(text=text, **kwargs)
+        self.ts_val = ts_val
+        self.dash = parent_dashboard
+        self.setColor(QColor(255, 255, 255))
+        self.setFont(QFont("Arial", 11, QFont.Bold))
+        self.fill = pg.mkBrush(color_hex)
+        self.setAcceptedMouseButtons(Qt.LeftButton)
+        # Bande regroupée (vue large) : un clic zoome sur sa plage au lieu d'ouvrir le menu
+        self.span = None
+        # Z=20 : Toujours tout devant pour être lisible
+        self.setZValue(20)
+
+    def mouseClickEvent(self, ev):
+        if ev.button() == Qt.LeftButton:
+            if self.span is not None:
+                self.dash.graph_time.setXRange(*self.span)
+            else:
+                self.dash.open_marker_menu(self.ts_val, ev.screenPos())
+
+
+class MarkerLayer:
+    """
+    Calque des zones en mode retenu : chaque zone (clé = identifiant, ligne de la session)
+    possède sa bande et son étiquette. update() compare l'état voulu à l'état affiché et
+    n'ajoute, ne retire ou ne restyle que les zones qui ont changé ; courbes et autres zones
+    ne sont pas touchées. Seules les zones de la vue (plus une marge) sont matérialisées ;
+    en vue large, les zones voisines d'une même classe deviennent une bande avec un compte.
+    """
+    def __init__(self, plot, dashboard):
+        self.plot = plot
+        self.dash = dashboard
+        # clé -> [bande, étiquette, style, position de l'étiquette]
+        self.items = {}
+        self.grouped = False
+
+    def __len__(self):
+        return len(self.items)
+
+    def update(self, zones, selected=(), y_min=0.0, y_max=100.0, view=None):
+        """
+        Synchronise le calque avec l'index de zones pour la plage visible `view` (x0, x1)
+        (toutes les zones si None). Retourne (ajoutées, retirées, restylées).
+        """
+        selected = set(selected)
+        wanted = {}
+        for key, style, rank in self._wanted(zones, selected, view):
+            # Étiquettes étagées sur 3 niveaux (rang global : stable pendant un déplacement de vue)
+            pos = (style[2], y_max + (y_max - y_min) * 0.1 * (1 + (rank % 3)))
+            wanted[key] = (style, pos)
+
+        removed = [key for key in self.items if key not in wanted]
+        for key in removed:
+            self._remove(key)
+        added = restyled = 0
+        for key, (style, pos) in wanted.items():
+            entry = self.items.get(key)
+            if entry is None:
+                self._add(key, style, pos)
+                added += 1
+                continue
+            if entry[2] != style:
+                self._restyle(entry, style)
+                restyled += 1
+            if entry[3] != pos:
+                entry[1].setPos(*pos)
+                entry[3] = pos
+        return added, len(removed), restyled
+
+    def _wanted(self, zones, selected, view):
+        """[(clé, style, rang)] : zones visibles, ou bandes regroupées si elles sont trop nombreuses."""
+        if view is None:
+            pos = np.arange(len(zones))
+        else:
+            x0, x1 = view
+            margin = (x1 - x0) * VIEW_MARGIN
+            pos = zones.overlapping(x0 - margin, x1 + margin)
+        # Pas de bascule détail / regroupement à chaque pas autour du seuil
+        limit = MIN_GROUPED_ZONES if self.grouped else MAX_DETAILED_ZONES
+        self.grouped = view is not None and len(pos) > limit
+        if not self.grouped:
+            return [self._zone_entry(zones, k, selected) for k in pos]
+
+        out = []
+        gap = (view[1] - view[0]) * MERGE_GAP
+        for code in np.unique(zones.codes[pos]):
+            p = pos[zones.codes[pos] == code]
+            # Nouvelle bande quand une zone commence après la fin des précédentes (+ écart toléré)
+            reach = np.maximum.accumulate(zones.ends[p])
+            cuts = np.flatnonzero(zones.starts[p][1:] > reach[:-1] + gap) + 1
+            for group in np.split(p, cuts):
+                if len(group) == 1:
+                    out.append(self._zone_entry(zones, group[0], selected))
+                    continue
+                rows = zones.rows[group]
+                start, end = float(zones.starts[group].min()), float(zones.ends[group].max())
+                name = CLASS_NAMES[code] if code >= 0 else "Zones"
+                style = (start, end, (start + end) / 2.0, int(code), f"{name} ×{len(group)}",
+                         any(int(r) in selected for r in rows), True)
+                key = ("bande", int(code), int(rows.min()), int(rows.max()), len(group))
+                out.append((key, style, int(zones.centre_rank[group].min())))
+        return out
+
+    def _zone_entry(self, zones, k, selected):
+        key = int(zones.rows[k])
+        style = (float(zones.starts[k]), float(zones.ends[k]), float(zones.centres[k]),
+                 int(zones.codes[k]), zones.labels[k], key in selected, False)
+        return key, style, int(zones.centre_rank[k])
+
+    def clear(self):
+        for key in list(self.items):
+            self._remove(key)
+
+    def detach(self):
+        """La scène a été vidée par ailleurs (plot.clear()) : on oublie les items sans les retirer."""
+        self.items = {}
+
+    # --- ITEMS ---
+    def _add(self, key, style, pos):
+        start, end, centre, code, label, is_selected, is_band = style
+        color_hex = zone_color(code)
+        region = pg.LinearRegionItem(values=[start, end], orientation=pg.LinearRegionItem.Vertical)
+        region.setMovable(False)
+        # ZONES : Z=-10 (ARRIÈRE PLAN)
+        region.setZValue(-10)
+        self._style_region(region, color_hex, is_selected)
+        self.plot.addItem(region)
+
+        t_item = ClickableTextItem(
+            text=label, ts_val=centre, parent_dashboard=self.dash, color_hex=color_hex, anchor=(0.5, 1)
+        )
+        if is_band: t_item.span = (start, end)
+        t_item.setPos(*pos)
+        self.plot.addItem(t_item)
+        self.items[key] = [region, t_item, style, pos]
+
+    def _restyle(self, entry, style):
+        region, t_item, old, _ = entry
+        start, end, centre, code, label, is_selected, is_band = style
+        color_hex = zone_color(code)
+        if old[:2] != style[:2]:
+            region.setRegion([start, end])
+        if old[3] != code or old[5] != is_selected:
+            self._style_region(region, color_hex, is_selected)
+            t_item.fill = pg.mkBrush(color_hex)
+            t_item.update()
+        if old[4] != label:
+            t_item.setText(label)
+        t_item.ts_val = centre
+        t_item.span = (start, end) if is_band else None
+        entry[2] = style
+
+    def _style_region(self, region, color_hex, is_selected):
+        c = QColor(color_hex)
+        # Opacité réduite (23%), renforcée pour les zones sélectionnées
+        c.setAlpha(140 if is_selected else 60)
+        region.setBrush(c)
+        for l in region.lines: l.setPen(pg.mkPen(color_hex, width=3 if is_selected else 1))
+
+    def _remove(self, key):
+        region, t_item, _, _ = self.items.pop(key)
+        self.plot.removeItem(region)
+        self.plot.removeItem(t_item)
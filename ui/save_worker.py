@@ -0,0 +1,34 @@
+import time
+from PyQt5.QtCore import QThread
+from core.annotation_store import project_name
+
+
+class ProjectSaveWorker(QThread):
+    """
+    Sauvegarde en arrière-plan d'un instantané (SaveJob) : journaux complétés avec fsync,
+    compactage atomique des CSV _PRISM. Le thread graphique ne touche pas au disque ;
+    le résultat (durée, erreur) est lu sur le job à la fin du thread.
+    Les éditions sont aussi reportées dans la base d'annotations partagée si elle est active.
+    """
+    def __init__(self, campaign, job, store=None, parent=None):
+        super().__init__(parent)
+        self.campaign = campaign
+        self.job = job
+        self.store = store
+        self.store_error = None
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            self.campaign.run_save(self.job)
+        except Exception as e:
+            self.job.error = str(e)
+        if self.store is not None and self.job.error is None:
+            try:
+                project = project_name(self.campaign.folder)
+                for _, entries in self.job.journals:
+                    self.store.apply(project, entries)
+            except Exception as e:
+                # Base optionnelle : une erreur n'invalide pas la sauvegarde du projet
+                self.store_error = str(e)
+        self.job.elapsed_ms = (time.perf_counter() - t0) * 1000.0
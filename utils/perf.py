@@ -0,0 +1,34 @@
+import time
+from contextlib import contextmanager
+from utils.logger import log
+
+
+class LatencyProbe:
+    """
+    Mesure la latence des interactions (clic, survol, édition de zone...).
+    Garde le dernier temps et un cumul par interaction, consultables dans la console.
+    """
+    def __init__(self):
+        self.stats = {}
+
+    @contextmanager
+    def measure(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000.0)
+
+    def record(self, name, ms):
+        count, total, last = self.stats.get(name, (0, 0.0, 0.0))
+        self.stats[name] = (count + 1, total + ms, ms)
+        log.debug(f"[PERF] {name} : {ms:.2f} ms")
+
+    def last(self, name):
+        return self.stats.get(name, (0, 0.0, 0.0))[2]
+
+    def summary(self):
+        lines = []
+        for name, (count, total, last) in sorted(self.stats.items()):
+            lines.append(f"{name} : dernier {last:.1f} ms | moyen {total / count:.1f} ms ({count}x)")
+        return lines